@@ -13,6 +13,7 @@ Forest vs OLS).
 from __future__ import annotations
 
 from pathlib import Path
+import argparse
 import warnings
 
 import numpy as np
@@ -27,7 +28,9 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
 
-from config_paths import FINAL_DATA_DIR, FIGURES_DIR, TABLES_DIR
+from config_paths import FINAL_DATA_DIR, FIGURES_DIR, TABLES_DIR, REPORTS_DIR
+from compact_panel import compact_frame, expand_frame, memory_report
+from metrics import instrumented
 
 # linearmodels is required by milestone instructions; fallback is included so the
 # script still runs if linearmodels is temporarily unavailable in an environment.
@@ -47,12 +50,16 @@ def ensure_output_dirs() -> None:
     TABLES_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_data() -> pd.DataFrame:
-    panel_path = FINAL_DATA_DIR / "merged_analysis_panel.csv"
-    if not panel_path.exists():
-        raise FileNotFoundError(f"Expected final panel at: {panel_path}")
-
-    df = pd.read_csv(panel_path)
+def load_data(panel: pd.DataFrame | None = None) -> pd.DataFrame:
+    # A merged panel handed over in memory (date index, as built by
+    # clean_and_merge.py) is used as is instead of re-reading the CSV.
+    if panel is not None:
+        df = panel.reset_index()
+    else:
+        panel_path = FINAL_DATA_DIR / "merged_analysis_panel.csv"
+        if not panel_path.exists():
+            raise FileNotFoundError(f"Expected final panel at: {panel_path}")
+        df = pd.read_csv(panel_path)
     df["date"] = pd.to_datetime(df["date"])
     df = df.sort_values("date").reset_index(drop=True)
     return df
@@ -86,6 +93,7 @@ def build_m2_consistent_features(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
+@instrumented
 def build_asset_panel(df: pd.DataFrame) -> pd.DataFrame:
     panel = df[[
         "date",
@@ -155,18 +163,29 @@ def build_asset_panel(df: pd.DataFrame) -> pd.DataFrame:
 # Section 3: Model A - Fixed Effects regression
 # -----------------------------------------------------------------------------
 
-def fit_model_a_fe(long_df: pd.DataFrame):
-    use_cols = [
-        "asset_return_pct",
-        "asset",
-        "date",
-        "policy_exposure_term_12",
-        "vix_exposure_term",
-        "ret_lag1",
-        "ret_mom3",
-    ]
+# Columns shared by Model A and its robustness specifications
+MODEL_A_COLUMNS = [
+    "asset_return_pct",
+    "asset",
+    "date",
+    "policy_exposure_term_12",
+    "vix_exposure_term",
+    "ret_lag1",
+    "ret_mom3",
+]
 
-    fe_df = long_df[use_cols].dropna().copy()
+
+def model_a_frame(long_df: pd.DataFrame) -> pd.DataFrame:
+    # Expanded from a compact panel once and reused by every Model A fit.
+    return expand_frame(long_df[MODEL_A_COLUMNS])
+
+
+@instrumented
+def fit_model_a_fe(long_df: pd.DataFrame, base: pd.DataFrame | None = None):
+    if base is None:
+        base = model_a_frame(long_df)
+
+    fe_df = base.dropna()
     fe_df = fe_df.set_index(["asset", "date"]).sort_index()
 
     y = fe_df["asset_return_pct"]
@@ -208,6 +227,7 @@ def fit_model_a_fe(long_df: pd.DataFrame):
 # Section 4: Model B - ML comparison (Random Forest vs OLS)
 # -----------------------------------------------------------------------------
 
+@instrumented
 def fit_model_b_ml(long_df: pd.DataFrame):
     ml_cols = [
         "date",
@@ -222,7 +242,7 @@ def fit_model_b_ml(long_df: pd.DataFrame):
         "ret_mom3",
     ]
 
-    ml_df = long_df[ml_cols].dropna().copy()
+    ml_df = expand_frame(long_df[ml_cols]).dropna()
     ml_df = pd.get_dummies(ml_df, columns=["asset"], drop_first=True)
     ml_df = ml_df.sort_values("date").reset_index(drop=True)
 
@@ -276,6 +296,7 @@ def fit_model_b_ml(long_df: pd.DataFrame):
 # Section 5: Diagnostics (heteroskedasticity, VIF, residual plots)
 # -----------------------------------------------------------------------------
 
+@instrumented
 def diagnostics_model_a(fe_df: pd.DataFrame, fe_model) -> tuple[pd.DataFrame, pd.DataFrame]:
     base_predictors = ["policy_exposure_term_12", "vix_exposure_term", "ret_lag1", "ret_mom3"]
 
@@ -328,9 +349,12 @@ def diagnostics_model_a(fe_df: pd.DataFrame, fe_model) -> tuple[pd.DataFrame, pd
 # Section 6: Robustness checks (robust SEs, alternative lags, placebo tests)
 # -----------------------------------------------------------------------------
 
-def robustness_checks(long_df: pd.DataFrame) -> pd.DataFrame:
+@instrumented
+def robustness_checks(long_df: pd.DataFrame, base: pd.DataFrame | None = None) -> pd.DataFrame:
     checks = []
 
+    if base is None:
+        base = model_a_frame(long_df)
     base_cols = ["asset_return_pct", "asset", "date", "ret_lag1", "ret_mom3", "vix_exposure_term"]
 
     for label, term in [
@@ -339,7 +363,11 @@ def robustness_checks(long_df: pd.DataFrame) -> pd.DataFrame:
         ("Lag3", "policy_exposure_term_3"),
         ("PlaceboLead12", "policy_placebo_term"),
     ]:
-        tmp = long_df[base_cols + [term]].dropna().copy()
+        # Only the policy term differs between specifications
+        if term in base.columns:
+            tmp = base[base_cols + [term]].dropna()
+        else:
+            tmp = base[base_cols].assign(**{term: expand_frame(long_df[[term]])[term]}).dropna()
         tmp = tmp.set_index(["asset", "date"]).sort_index()
 
         y = tmp["asset_return_pct"]
@@ -376,16 +404,13 @@ def robustness_checks(long_df: pd.DataFrame) -> pd.DataFrame:
     covid_start = pd.Timestamp("2020-03-01")
     covid_end = pd.Timestamp("2020-05-31")
 
-    no_crisis = long_df[
+    tmp = base.dropna()
+    tmp = tmp[
         ~(
-            ((long_df["date"] >= crisis_start) & (long_df["date"] <= crisis_end))
-            | ((long_df["date"] >= covid_start) & (long_df["date"] <= covid_end))
+            ((tmp["date"] >= crisis_start) & (tmp["date"] <= crisis_end))
+            | ((tmp["date"] >= covid_start) & (tmp["date"] <= covid_end))
         )
-    ].copy()
-
-    tmp = no_crisis[
-        ["asset_return_pct", "asset", "date", "ret_lag1", "ret_mom3", "vix_exposure_term", "policy_exposure_term_12"]
-    ].dropna().copy()
+    ]
     tmp = tmp.set_index(["asset", "date"]).sort_index()
     y = tmp["asset_return_pct"]
     X = tmp[["policy_exposure_term_12", "vix_exposure_term", "ret_lag1", "ret_mom3"]]
@@ -417,10 +442,10 @@ def robustness_checks(long_df: pd.DataFrame) -> pd.DataFrame:
     )
 
     # Robustness check: Group subsamples by asset class.
+    subsample_cols = ["asset_return_pct", "date", "fed_funds_rate_lag12", "vix_index", "ret_lag1", "ret_mom3"]
+    subsamples = base.join(expand_frame(long_df[[c for c in subsample_cols if c not in base.columns]]))
     for asset in ["SP500", "HomePrice", "Gold"]:
-        g = long_df[
-            long_df["asset"] == asset
-        ][["asset_return_pct", "date", "fed_funds_rate_lag12", "vix_index", "ret_lag1", "ret_mom3"]].dropna().copy()
+        g = subsamples.loc[subsamples["asset"] == asset, subsample_cols].dropna()
 
         if len(g) < 40:
             continue
@@ -438,16 +463,7 @@ def robustness_checks(long_df: pd.DataFrame) -> pd.DataFrame:
         )
 
     # Robustness check: Compare different robust standard error specifications (HC0, HC1, HC2, HC3).
-    use_cols = [
-        "asset_return_pct",
-        "asset",
-        "date",
-        "policy_exposure_term_12",
-        "vix_exposure_term",
-        "ret_lag1",
-        "ret_mom3",
-    ]
-    fe_df_se = long_df[use_cols].dropna().copy()
+    fe_df_se = base.dropna()
     fe_df_se = fe_df_se.set_index(["asset", "date"]).sort_index()
 
     y_se = fe_df_se["asset_return_pct"]
@@ -783,6 +799,25 @@ def plot_robust_se_comparison(robustness_df: pd.DataFrame) -> None:
     plt.close(fig)
 
 
+# Every file run_models() writes (the pipeline runner records these to skip
+# the models when the merged panel and this script are unchanged)
+OUTPUT_FILES = [
+    TABLES_DIR / "M3_modelA_regression_table.csv",
+    TABLES_DIR / "M3_regression_table.csv",
+    TABLES_DIR / "M3_modelB_ml_comparison.csv",
+    TABLES_DIR / "M3_modelB_rf_feature_importance.csv",
+    TABLES_DIR / "M3_modelA_breusch_pagan.csv",
+    TABLES_DIR / "M3_modelA_vif.csv",
+    TABLES_DIR / "M3_modelA_robustness_checks.csv",
+    TABLES_DIR / "M3_run_summary.txt",
+    FIGURES_DIR / "M3_residuals_vs_fitted.png",
+    FIGURES_DIR / "M3_qq_plot.png",
+    FIGURES_DIR / "M3_modelB_rf_feature_importance_top10.png",
+    FIGURES_DIR / "M3_modelA_robust_se_comparison.png",
+    REPORTS_DIR / "M3_interpretation.md",
+]
+
+
 def save_outputs(
     fe_standard,
     fe_clustered,
@@ -851,17 +886,47 @@ def save_outputs(
         f.write("- M3_modelA_robust_se_comparison.png\n")
 
 
-def main() -> None:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Estimate the Milestone 3 models.")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="hold the long asset panel as float32 / categorical asset / int-coded dates",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="with --compact, print the memory saved (builds an extra copy of each panel)",
+    )
+    return parser.parse_args(argv)
+
+
+def run_models(raw: pd.DataFrame, compact: bool = False, report_memory: bool = False) -> None:
     ensure_output_dirs()
 
-    raw = load_data()
     feat = build_m2_consistent_features(raw)
     panel_long = build_asset_panel(feat)
-
-    fe_df, fe_standard, fe_clustered, fe_robust = fit_model_a_fe(panel_long)
+    del feat
+
+    # Features are derived in float64 first; the long panel is narrowed as
+    # soon as it is built and the float64 frame dropped. The report needs
+    # both at once (and a compact copy of the merged panel), so it is opt-in.
+    if compact:
+        compact_long = compact_frame(panel_long)
+        if report_memory:
+            print(memory_report(raw, compact_frame(raw), "Merged panel"))
+            print(memory_report(panel_long, compact_long, "Long asset panel"))
+        panel_long = compact_long
+        del compact_long
+
+    # Model A's columns are expanded back to float64 once, for all its fits;
+    # Model B expands its own columns (see compact_panel.py).
+    model_a_base = model_a_frame(panel_long)
+    fe_df, fe_standard, fe_clustered, fe_robust = fit_model_a_fe(panel_long, model_a_base)
     bp_df, vif_df = diagnostics_model_a(fe_df, fe_clustered)
 
-    robustness_df = robustness_checks(panel_long)
+    robustness_df = robustness_checks(panel_long, model_a_base)
+    del model_a_base
     ml_results, rf_importance = fit_model_b_ml(panel_long)
 
     save_outputs(
@@ -890,5 +955,10 @@ def main() -> None:
     print(f"Figures saved to: {FIGURES_DIR}")
 
 
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    run_models(load_data(), compact=args.compact, report_memory=args.memory_report)
+
+
 if __name__ == "__main__":
     main()
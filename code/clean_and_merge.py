@@ -10,39 +10,135 @@ Key features:
 - Extends date range back to February 2001 (start of gold data)
 - Handles Bitcoin missing values (didn't exist before 2014)
 - Saves both processed individual files and final merged dataset
+- Skips the run entirely when no raw input has changed since the last one,
+  and only rewrites output files whose content changed (see manifest.py)
+- Optionally streams each raw file in chunks straight into monthly
+  aggregates, so memory stays bounded however long the daily history is
+- Optionally cleans the datasets in parallel worker processes
+- Optionally updates incrementally: only changed raw files are reloaded and
+  each output is patched from its first changed row
+- Checks every panel for gaps, stale runs, outliers, unit jumps and coverage
+  before writing it, saves a JSON/Parquet report to results/reports/ and
+  stops if a check fails (see data_quality.py)
+- Optionally aligns out of core: each series is filled straight into a
+  memory-mapped column store and the panels are written from it in row
+  chunks, so very wide panels are never held in memory whole
+- Optionally builds weekly (Friday) and business-daily panels alongside the
+  monthly one, using each series' registry frequency and upsample rule
 
 Usage:
-    python code/create_final_dataset.py
+    python code/clean_and_merge.py [--force] [--incremental] [--stream [--chunk-rows N]] [--jobs N]
+                                [--frequencies ME W D] [--out-of-core] [--no-quality-gate]
+
+Options:
+    --force         Rebuild even if the raw inputs are unchanged
+    --incremental   Reload only the raw files that changed since the last run
+                    and patch the processed files and merged panel in place
+                    (falls back to a full rebuild if the code or registry
+                    changed, or an output was edited since)
+    --stream        Resample each raw file while reading it in chunks
+                    (identical output, bounded memory)
+    --chunk-rows N  Rows per chunk when streaming (default: 100000)
+    --jobs N        Clean and resample N datasets at a time in worker
+                    processes (default: 1; 0 = one per CPU core)
+    --frequencies F Panels to build: ME (monthly, default), W (weekly) and/or
+                    D (business-daily). The weekly and daily panels are
+                    written next to the monthly one and always rebuilt in full
+    --out-of-core   Align into memory-mapped column stores under
+                    data/panel_store/ (one per frequency) and write the
+                    panels from them in row chunks (identical output)
+    --no-quality-gate
+                    Write the panels even if a data-quality check fails
 """
 
+import io
+import os
 import sys
+import time
+import pickle
+import argparse
+import contextlib
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
-from config_paths import RAW_DATA_DIR, PROCESSED_DATA_DIR, FINAL_DATA_DIR
+from concurrent.futures import ProcessPoolExecutor
+from config_paths import (PROJECT_ROOT, CODE_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, FINAL_DATA_DIR,
+                          PANEL_STATE_PATH, PANEL_STORE_DIR)
+from raw_storage import DEFAULT_CHUNK_ROWS, read_raw, iter_raw, find_raw, raw_path
+from manifest import get_manifest, write_if_changed, frame_hash, manifest_key
+from column_store import ColumnStore
+from data_quality import DataQualityError, run_quality_checks, report_stem
+from metrics import get_metrics, instrumented
+from series_registry import clean_datasets, fill_policy, frequency_rules, raw_date_format
+
+STAGE_NAME = 'clean_and_merge'
+MERGED_PANEL_FILE = FINAL_DATA_DIR / "merged_analysis_panel.csv"
+PANEL_STATE_VERSION = 1
+
+# Code besides this script that decides what the panels contain: the
+# registry and the modules imported above, plus compact_panel.py
+STAGE_MODULES = (
+    'series_registry.py',
+    'config_paths.py',
+    'raw_storage.py',
+    'manifest.py',
+    'column_store.py',
+    'data_quality.py',
+    'metrics.py',
+    'compact_panel.py',
+)
+
+# Panel frequencies (--frequencies): pandas grid frequency, unit for the logs
+# and output file. Weeks end on Friday and days are business days, matching
+# the market series.
+PANEL_FREQUENCIES = {
+    'ME': ('ME', 'months', MERGED_PANEL_FILE),
+    'W': ('W-FRI', 'weeks', FINAL_DATA_DIR / "merged_analysis_panel_weekly.csv"),
+    'D': ('B', 'business days', FINAL_DATA_DIR / "merged_analysis_panel_daily.csv"),
+}
+
+# Native and panel frequencies from finest to coarsest
+FREQUENCY_RANK = {'D': 0, 'W': 1, 'M': 2, 'ME': 2, 'Q': 3}
 
+# Offset from an observation date to the end of the period it covers
+PERIOD_END = {
+    'D': pd.Timedelta(0),
+    'W': pd.Timedelta(days=6),
+    'M': pd.offsets.MonthEnd(0),
+    'Q': pd.offsets.QuarterEnd(0),
+}
 
-def load_and_clean_dataset(filename, date_col='date', value_col=None, freq='infer'):
+
+# Dataset configurations (defined in series_registry.py)
+# Format: (filename, final_column_name, resampling_method)
+DATASETS = clean_datasets()
+
+
+@instrumented(labels=('filename',))
+def load_and_clean_dataset(filename, date_col='date', value_col=None, freq='infer', date_format=None):
     """
     Load and clean a single dataset.
     
     Parameters:
-        filename (str): Name of CSV file in raw data directory
+        filename (str): Name of file in raw data directory (CSV, or the
+            Parquet/Feather copy with the same name; see raw_storage.py)
         date_col (str): Name of date column
         value_col (str): Name of value column (if None, uses second column)
-        freq (str): Original frequency ('D', 'M', 'Q', or 'infer')
+        freq (str): Original frequency ('D', 'M', 'Q', or 'infer'). Inferred
+            frequencies are cached in the manifest until the file changes
+        date_format (str, optional): Format of the dates in a CSV file, from
+            the registry; the format is inferred if None or it doesn't match
     
     Returns:
         tuple: (pd.DataFrame, str) - Cleaned dataframe with DatetimeIndex and value column name
     """
-    filepath = RAW_DATA_DIR / filename
-    
     print(f"  Loading {filename}...")
-    df = pd.read_csv(filepath)
+    df = read_raw(filename, date_format=date_format)
     
-    # Convert date column to datetime
-    df[date_col] = pd.to_datetime(df[date_col])
+    # Convert date column to datetime (already typed for Parquet/Feather)
+    if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df[date_col] = pd.to_datetime(df[date_col])
     
     # Set date as index
     df = df.set_index(date_col)
@@ -65,15 +161,17 @@ def load_and_clean_dataset(filename, date_col='date', value_col=None, freq='infe
     # Sort by date
     df = df.sort_index()
     
-    # Infer frequency if needed
+    # Infer frequency if needed (once per file content)
     if freq == 'infer':
-        freq = pd.infer_freq(df.index)
+        path, _ = find_raw(filename)
+        freq = get_manifest().memo(f"inferred_freq:{value_col}", path, lambda: pd.infer_freq(df.index))
     
     print(f"    Frequency: {freq}, Range: {df.index.min().date()} to {df.index.max().date()}, Rows: {len(df)}")
     
     return df, value_col
 
 
+@instrumented(labels=('value_col', 'method'))
 def resample_to_monthly(df, value_col, method='last'):
     """
     Resample data to monthly frequency.
@@ -101,59 +199,124 @@ def resample_to_monthly(df, value_col, method='last'):
     return df_monthly
 
 
-def process_all_datasets():
+class UnsortedRawData(ValueError):
+    """Raised by stream_to_monthly() when a raw file isn't in date order."""
+
+
+@instrumented(labels=('filename',))
+def stream_to_monthly(filename, method='last', date_col='date', value_col=None,
+                      chunksize=DEFAULT_CHUNK_ROWS, date_format=None):
     """
-    Process all raw datasets and save to processed directory.
+    Load, clean and resample a dataset to monthly in one streaming pass.
+    
+    The raw file is read in chunks. Rows of the month still in progress are
+    carried over to the next chunk; every month that has ended is resampled
+    with resample_to_monthly() as soon as a later date is seen, and its rows
+    are dropped. Memory is bounded by the chunk size plus one month of rows,
+    however long the input, and the result is identical to
+    load_and_clean_dataset() followed by resample_to_monthly().
+    
+    Parameters:
+        filename (str): Name of file in raw data directory
+        method (str): Resampling method ('last', 'mean', 'sum', 'ffill'), or
+            None for series that are already monthly
+        date_col (str): Name of date column
+        value_col (str): Name of value column (if None, uses second column)
+        chunksize (int): Rows read per chunk
+        date_format (str, optional): Format of the dates in a CSV file
     
     Returns:
-        dict: Dictionary of processed dataframes
-    """
-    print("\n" + "=" * 70)
-    print("DATA CLEANING AND PROCESSING (EXTENDED TO 2001)")
-    print("=" * 70 + "\n")
+        tuple: (pd.DataFrame, str) - Monthly dataframe and value column name
     
-    processed_data = {}
-    missing_value_report = []
+    Raises:
+        UnsortedRawData: If the file isn't sorted by date (the fetch scripts
+            always write it sorted)
+    """
+    print(f"  Streaming {filename}...")
+    method = method or 'last'
+    monthly = []
+    carry = None
+    first_date = last_date = None
+    rows = missing_count = chunks = 0
     
-    # Define dataset configurations
-    # Format: (filename, final_column_name, resampling_method)
-    datasets = [
-        # Monetary aggregates (monthly)
-        ('M1.csv', 'm1_billions', None),
-        ('M2.csv', 'm2_billions', None),
-        
-        # Interest rates (daily → monthly last)
-        ('federal_funds_rate.csv', 'fed_funds_rate', 'last'),
-        ('real_interest_rate_10y.csv', 'real_rate_10y', 'last'),
-        ('yield_curve_slope.csv', 'yield_curve_slope', 'last'),
-        ('bbb_spread.csv', 'bbb_spread', 'last'),
-        
-        # Inflation (monthly)
-        ('pce.csv', 'pce_index', None),
-        ('cpi.csv', 'cpi_median', None),
-        
-        # Real economy (quarterly → monthly forward fill, monthly)
-        ('gdp.csv', 'gdp_billions', 'ffill'),
-        ('unemployment_rate.csv', 'unemployment_rate', None),
+    for chunk in iter_raw(filename, chunksize=chunksize, date_format=date_format):
+        chunks += 1
+        chunk = chunk.set_index(date_col)
+        if value_col is None:
+            value_col = chunk.columns[0]
+        chunk = chunk[[value_col]]
+        missing_count += chunk[value_col].isna().sum()
+        chunk = chunk.dropna()
+        if len(chunk) == 0:
+            continue
         
-        # Asset prices (daily/monthly → monthly last)
-        ('home_price_index.csv', 'home_price_index', None),
-        ('sp500.csv', 'sp500_index', 'last'),
-        ('gold_price.csv', 'gold_price_usd', 'last'),
-        ('bitcoin_price.csv', 'bitcoin_price_usd', 'last'),
+        if not chunk.index.is_monotonic_increasing or (last_date is not None and chunk.index[0] < last_date):
+            raise UnsortedRawData(f"{filename} is not sorted by {date_col}")
+        if first_date is None:
+            first_date = chunk.index[0]
+        last_date = chunk.index[-1]
+        rows += len(chunk)
         
-        # Market indicators (daily → monthly mean or last)
-        ('vix.csv', 'vix_index', 'mean'),
-        ('epu_index.csv', 'epu_index', 'mean'),
-        ('consumer_sentiment.csv', 'consumer_sentiment', None),
-    ]
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+        # Months before the latest one can't receive more rows
+        complete = chunk.index < last_date.to_period('M').start_time
+        if complete.any():
+            monthly.append(resample_to_monthly(chunk[complete], value_col, method))
+        carry = chunk[~complete]
     
-    print("Step 1: Loading and cleaning individual datasets\n")
+    if missing_count > 0:
+        print(f"    ⚠ Found {missing_count} missing values")
+    if rows == 0:
+        raise ValueError(f"No observations in {filename}")
+    monthly.append(resample_to_monthly(carry, value_col, method))
     
-    for filename, final_col_name, resample_method in datasets:
-        try:
+    # Months with no rows at all fall between resampled pieces; fill them the
+    # way a single resample over the whole file would
+    df_monthly = pd.concat(monthly)
+    months = pd.date_range(df_monthly.index[0], df_monthly.index[-1], freq='ME', name=df_monthly.index.name)
+    if method == 'sum':
+        df_monthly = df_monthly.reindex(months, fill_value=0.0)
+    elif method == 'ffill':
+        df_monthly = df_monthly.reindex(months).ffill()
+    else:
+        df_monthly = df_monthly.reindex(months)
+    
+    print(f"    Range: {first_date.date()} to {last_date.date()}, Rows: {rows}, Chunks: {chunks}")
+    return df_monthly, value_col
+
+
+def process_dataset(filename, final_col_name, resample_method, stream=False, chunksize=DEFAULT_CHUNK_ROWS):
+    """
+    Load, clean and resample one dataset to monthly (step 1 of process_all_datasets).
+    
+    Parameters:
+        filename (str): Name of file in raw data directory
+        final_col_name (str): Column name in the processed data
+        resample_method (str): Resampling method, or None if already monthly
+        stream (bool): Resample while reading the file in chunks
+        chunksize (int): Rows per chunk when streaming
+    
+    Returns:
+        tuple: (pd.DataFrame, list) - Monthly dataframe (None if processing
+            failed) and the dataset's missing value report entries
+    """
+    missing_value_report = []
+    try:
+        streamed = False
+        if stream:
+            try:
+                df, original_col = stream_to_monthly(filename, resample_method, chunksize=chunksize,
+                                                     date_format=raw_date_format(final_col_name))
+                streamed = True
+            except UnsortedRawData as e:
+                print(f"    ⚠ {e}; loading it whole instead")
+        
+        if streamed:
+            print(f"    Resampled to monthly while streaming, method: {resample_method or 'last'}")
+        else:
             # Load and clean
-            df, original_col = load_and_clean_dataset(filename)
+            df, original_col = load_and_clean_dataset(filename, date_format=raw_date_format(final_col_name))
             
             # Check for missing values before resampling
             missing_before = df[original_col].isna().sum()
@@ -173,30 +336,108 @@ def process_all_datasets():
                 # Ensure it's on month-end frequency
                 if not isinstance(df.index.freq, pd.offsets.MonthEnd) and df.index.freq != 'ME':
                     df = df.resample('ME').last()
-            
-            # Rename column
-            df = df.rename(columns={original_col: final_col_name})
-            
-            # Check for missing values after resampling
-            missing_after = df[final_col_name].isna().sum()
-            if missing_after > 0:
-                print(f"    ⚠ {missing_after} missing values after resampling")
-                missing_value_report.append({
-                    'dataset': filename,
-                    'stage': 'after_resample',
-                    'missing_count': missing_after,
-                    'action': 'will_fill'
-                })
-            
-            # Store processed data
-            processed_data[final_col_name] = df
-            
-            print(f"    ✓ Processed: {len(df)} monthly observations\n")
-            
-        except Exception as e:
-            print(f"    ❌ Error processing {filename}: {str(e)}\n")
-            continue
+        
+        # Rename column
+        df = df.rename(columns={original_col: final_col_name})
+        
+        # Check for missing values after resampling
+        missing_after = df[final_col_name].isna().sum()
+        if missing_after > 0:
+            print(f"    ⚠ {missing_after} missing values after resampling")
+            missing_value_report.append({
+                'dataset': filename,
+                'stage': 'after_resample',
+                'missing_count': missing_after,
+                'action': 'will_fill'
+            })
+        
+        print(f"    ✓ Processed: {len(df)} monthly observations\n")
+        return df, missing_value_report
+        
+    except Exception as e:
+        print(f"    ❌ Error processing {filename}: {str(e)}\n")
+        return None, missing_value_report
+
+
+def _process_dataset_logged(task):
+    """Run process_dataset() in a worker process, returning its log and metrics instead of printing them."""
+    log = io.StringIO()
+    mark = get_metrics().mark()
+    with contextlib.redirect_stdout(log):
+        df, report = process_dataset(*task)
+    return df, report, log.getvalue(), get_manifest().memo_entries(), get_metrics().since(mark)
+
+
+@instrumented
+def load_all_datasets(stream=False, chunksize=DEFAULT_CHUNK_ROWS, jobs=1):
+    """
+    Load, clean and resample every dataset to monthly (step 1).
+    
+    Parameters:
+        stream (bool): Resample each file while reading it in chunks
+            (see stream_to_monthly)
+        chunksize (int): Rows per chunk when streaming
+        jobs (int): Worker processes for loading and resampling the datasets
+            (1 = sequential). Logs and missing value reports are still
+            emitted in registry order.
+    
+    Returns:
+        tuple: (dict, list) - Monthly dataframes by final column name, and
+            the missing value report
+    """
+    processed_data = {}
+    missing_value_report = []
+    
+    tasks = [(filename, final_col_name, resample_method, stream, chunksize)
+             for filename, final_col_name, resample_method in DATASETS]
+    jobs = min(jobs, len(tasks))
+    
+    if jobs > 1:
+        print(f"Step 1: Loading and cleaning individual datasets ({jobs} worker processes)\n")
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # map() yields in submission order, so each dataset's log is
+            # printed in full and in the same order as a sequential run.
+            # Values the workers cached in their copy of the manifest (e.g.
+            # inferred frequencies) are kept here, to be saved with it, and
+            # so are the timings they recorded
+            manifest = get_manifest()
+            for task, (df, report, log, memo, spans) in zip(tasks, executor.map(_process_dataset_logged, tasks)):
+                print(log, end='')
+                manifest.update_memo(memo)
+                get_metrics().extend(spans)
+                missing_value_report.extend(report)
+                if df is not None:
+                    processed_data[task[1]] = df
+    else:
+        print("Step 1: Loading and cleaning individual datasets\n")
+        for task in tasks:
+            df, report = process_dataset(*task)
+            missing_value_report.extend(report)
+            if df is not None:
+                processed_data[task[1]] = df
+    
+    return processed_data, missing_value_report
+
+
+def _ffill(values):
+    """Forward fill the NaNs in each column of a 2-D array (leading NaNs stay NaN)."""
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def common_date_range(processed_data, freq='ME'):
+    """
+    Determine the panel's common date range (step 2).
+    
+    Parameters:
+        processed_data (dict): Dataframes by final column name, at the panel frequency
+        freq (str): Panel frequency, a key of PANEL_FREQUENCIES
     
+    Returns:
+        pd.DatetimeIndex: From the start of the gold data to the latest date
+            every series reaches
+    """
     print("\n" + "=" * 70)
     print("Step 2: Determining date range (starting from gold data)\n")
     
@@ -210,90 +451,219 @@ def process_all_datasets():
     # Find the latest common date
     latest_end = min([df.index.max() for df in processed_data.values()])
     
+    # Create common date range
+    grid, unit, _ = PANEL_FREQUENCIES[freq]
+    common_dates = pd.date_range(earliest_start, latest_end, freq=grid)
+    
     print(f"\nFinal date range: {earliest_start.date()} to {latest_end.date()}")
-    print(f"Total months: {len(pd.date_range(earliest_start, latest_end, freq='ME'))}\n")
+    print(f"Total {unit}: {len(common_dates)}\n")
+    return common_dates
+
+
+def _report_fill(col_name, first_date, missing_before, missing_after, missing_value_report):
+    """Log how one aligned column's gaps were filled (step 3)."""
+    if fill_policy(col_name) == 'ffill_from_start':
+        print(f"  {col_name}: Keeping NaN before {first_date.date()} (series didn't exist)")
+    elif missing_before > 0:
+        print(f"  {col_name}: {missing_before} missing values → forward/backward filling")
+        
+        # Check if still missing after filling
+        if missing_after > 0:
+            print(f"    ⚠ WARNING: {missing_after} values still missing after fill!")
+            missing_value_report.append({
+                'dataset': col_name,
+                'stage': 'final',
+                'missing_count': missing_after,
+                'action': 'STILL_MISSING'
+            })
+
+
+@instrumented(labels=('freq',))
+def align_datasets(processed_data, missing_value_report, freq='ME'):
+    """
+    Align the monthly datasets to the common date range and fill gaps (steps 2-3).
     
-    # Create common date range
-    common_dates = pd.date_range(earliest_start, latest_end, freq='ME')
+    Parameters:
+        processed_data (dict): Monthly dataframes by final column name (or
+            weekly/daily ones, see build_frequency_panel)
+        missing_value_report (list): Report to append still-missing values to
+        freq (str): Panel frequency, a key of PANEL_FREQUENCIES
+    
+    Returns:
+        tuple: (dict, pd.DatetimeIndex) - Aligned dataframes and the common date range
+    """
+    common_dates = common_date_range(processed_data, freq)
     
     print("=" * 70)
     print("Step 3: Aligning all datasets to common date range\n")
     
-    # Align all datasets
-    aligned_data = {}
+    # One outer join of every series onto the common month-end index
+    aligned = pd.concat(processed_data.values(), axis=1, sort=True).reindex(common_dates)
+    columns = list(aligned.columns)
+    values = aligned.to_numpy(dtype=float)
+    missing_before = dict(zip(columns, np.isnan(values).sum(axis=0)))
+    
+    # Forward fill every column at once. ffill never fills before a column's
+    # first value, which is exactly the 'ffill_from_start' policy: series that
+    # start late (e.g. Bitcoin, ~2014) keep NaN before they existed rather
+    # than fake data. The other columns are then backward filled as well.
+    values = _ffill(values)
+    backfill = np.array([fill_policy(col) != 'ffill_from_start' for col in columns])
+    values[:, backfill] = _ffill(values[::-1, backfill])[::-1]
+    missing_after = dict(zip(columns, np.isnan(values).sum(axis=0)))
+    
     for col_name, df in processed_data.items():
-        # Reindex to common dates
-        df_aligned = df.reindex(common_dates)
-        
-        # For Bitcoin, keep NaN values before it existed (don't fill with fake data)
-        if col_name == 'bitcoin_price_usd':
-            # Bitcoin data starts around 2014, leave earlier values as NaN
-            bitcoin_start = df.index.min()
-            print(f"  {col_name}: Keeping NaN before {bitcoin_start.date()} (Bitcoin didn't exist)")
-            # Only forward fill within the actual Bitcoin data range
-            mask = df_aligned.index >= bitcoin_start
-            df_aligned.loc[mask, col_name] = df_aligned.loc[mask, col_name].ffill()
-        else:
-            # For other series, fill missing values
-            missing_count = df_aligned[col_name].isna().sum()
-            if missing_count > 0:
-                print(f"  {col_name}: {missing_count} missing values → forward/backward filling")
-                # Forward fill, then backward fill for any remaining NaNs at the start
-                df_aligned[col_name] = df_aligned[col_name].ffill().bfill()
-                
-                # Check if still missing after filling
-                still_missing = df_aligned[col_name].isna().sum()
-                if still_missing > 0:
-                    print(f"    ⚠ WARNING: {still_missing} values still missing after fill!")
-                    missing_value_report.append({
-                        'dataset': col_name,
-                        'stage': 'final',
-                        'missing_count': still_missing,
-                        'action': 'STILL_MISSING'
-                    })
-        
-        aligned_data[col_name] = df_aligned
+        _report_fill(col_name, df.index.min(), missing_before[col_name], missing_after[col_name],
+                     missing_value_report)
+    
+    aligned_data = {col_name: pd.DataFrame(values[:, [i]], index=common_dates, columns=[col_name])
+                    for i, col_name in enumerate(columns)}
+    
+    return aligned_data, common_dates
+
+
+@instrumented(labels=('freq',))
+def align_to_store(processed_data, missing_value_report, store_path, freq='ME'):
+    """
+    Out-of-core align_datasets(): fill each column straight into a column store.
+    
+    Columns are reindexed, filled and written one at a time into a
+    memory-mapped ColumnStore preallocated for the whole panel, so apart from
+    the inputs only about one column is in memory at once. Values and logs
+    are identical to align_datasets().
+    
+    Parameters:
+        processed_data (dict): Dataframes by final column name, at the panel frequency
+        missing_value_report (list): Report to append still-missing values to
+        store_path (Path): Store directory (replaced if it exists)
+        freq (str): Panel frequency, a key of PANEL_FREQUENCIES
     
-    return aligned_data, common_dates, missing_value_report
+    Returns:
+        ColumnStore: The aligned panel
+    """
+    common_dates = common_date_range(processed_data, freq)
+    
+    print("=" * 70)
+    print("Step 3: Aligning all datasets to common date range (column store)\n")
+    
+    store = ColumnStore.create(store_path, common_dates, list(processed_data))
+    for col_name, df in processed_data.items():
+        values = df.iloc[:, 0].reindex(common_dates).to_numpy(dtype=float)[:, None]
+        missing_before = np.isnan(values).sum()
+        values = _ffill(values)
+        if fill_policy(col_name) != 'ffill_from_start':
+            values = _ffill(values[::-1])[::-1]
+        store.write_column(col_name, values[:, 0])
+        _report_fill(col_name, df.index.min(), missing_before, np.isnan(values).sum(), missing_value_report)
+    
+    return store
 
 
+def process_all_datasets(stream=False, chunksize=DEFAULT_CHUNK_ROWS, jobs=1, store_path=None):
+    """
+    Process all raw datasets and save to processed directory.
+    
+    Parameters:
+        stream (bool): Resample each file while reading it in chunks
+            (see stream_to_monthly)
+        chunksize (int): Rows per chunk when streaming
+        jobs (int): Worker processes for per-dataset cleaning (1 = sequential)
+        store_path (Path, optional): Align out of core into a column store
+            at this path (see align_to_store)
+    
+    Returns:
+        tuple: (dict, pd.DatetimeIndex, list, dict) - Aligned dataframes (or
+            the ColumnStore), common date range, missing value report, and
+            the monthly dataframes before alignment
+    """
+    print("\n" + "=" * 70)
+    print("DATA CLEANING AND PROCESSING (EXTENDED TO 2001)")
+    print("=" * 70 + "\n")
+    
+    processed_data, missing_value_report = load_all_datasets(stream, chunksize, jobs)
+    if store_path is not None:
+        store = align_to_store(processed_data, missing_value_report, store_path)
+        return store, store.index, missing_value_report, processed_data
+    aligned_data, common_dates = align_datasets(processed_data, missing_value_report)
+    return aligned_data, common_dates, missing_value_report, processed_data
+
+
+@instrumented
+def check_quality(panel, panel_file, missing_value_report, gate=True, series=None):
+    """
+    Run the data-quality checks on an aligned panel before it is written.
+    
+    Gaps and stale runs are measured on `series`, the panel's series before
+    alignment filled them. The report goes to results/reports/ (see
+    data_quality.py).
+    
+    Raises:
+        DataQualityError: If a check fails and `gate` is set
+    """
+    print("\n" + "=" * 70)
+    print("Data quality checks\n")
+    return run_quality_checks(panel, report_stem(panel_file), missing_value_report, gate=gate,
+                              series=series)
+
+
+@instrumented
 def save_datasets(aligned_data, common_dates, missing_value_report):
     """
     Save processed individual files and create final merged dataset.
     
     Parameters:
-        aligned_data (dict): Dictionary of aligned dataframes
+        aligned_data (dict or ColumnStore): Dictionary of aligned dataframes,
+            or the store from align_to_store(), which is written one column
+            and then one row chunk at a time instead of being concatenated
         common_dates (pd.DatetimeIndex): Common date range
         missing_value_report (list): List of missing value reports
+    
+    Returns:
+        pd.DataFrame or ColumnStore: The merged panel
     """
+    out_of_core = isinstance(aligned_data, ColumnStore)
+    if out_of_core:
+        columns = ((col_name, aligned_data.column_frame(col_name)) for col_name in aligned_data.columns)
+    else:
+        columns = aligned_data.items()
+    
     print("\n" + "=" * 70)
     print("Step 4: Saving processed individual datasets\n")
     
-    # Save individual processed datasets
-    for col_name, df in aligned_data.items():
+    # Save individual processed datasets (files with unchanged content are left alone)
+    for col_name, df in columns:
         output_file = PROCESSED_DATA_DIR / f"{col_name}.csv"
-        df.to_csv(output_file)
-        print(f"  ✓ Saved: {output_file.name}")
+        if write_if_changed(df, output_file, lambda data, path: data.to_csv(path)):
+            print(f"  ✓ Saved: {output_file.name}")
+        else:
+            print(f"  = Unchanged: {output_file.name}")
     
     print("\n" + "=" * 70)
     print("Step 5: Creating final merged dataset\n")
     
-    # Create merged dataset
-    merged_df = pd.concat(aligned_data.values(), axis=1)
-    merged_df.index.name = 'date'
+    # Create merged dataset (the column store already is one)
+    if out_of_core:
+        merged_df = aligned_data
+        content = merged_df.content_hash()
+    else:
+        merged_df = pd.concat(aligned_data.values(), axis=1)
+        merged_df.index.name = 'date'
+        content = None
     
     # Save merged dataset to FINAL directory
-    merged_file = FINAL_DATA_DIR / "merged_analysis_panel.csv"
-    merged_df.to_csv(merged_file)
-    
-    print(f"  ✓ Final merged dataset created: {merged_file.name}")
+    merged_file = MERGED_PANEL_FILE
+    if write_if_changed(merged_df, merged_file, lambda data, path: data.to_csv(path), content=content):
+        print(f"  ✓ Final merged dataset created: {merged_file.name}")
+    else:
+        print(f"  = Final merged dataset unchanged: {merged_file.name}")
     print(f"    Location: {merged_file}")
     print(f"    Shape: {merged_df.shape} (rows: {merged_df.shape[0]}, columns: {merged_df.shape[1]})")
     print(f"    Date range: {merged_df.index.min().date()} to {merged_df.index.max().date()}")
     
     # Analyze missing values
     print(f"\n  Missing value analysis:")
-    missing_by_col = merged_df.isna().sum()
+    missing_by_col = merged_df.isna().sum() if not out_of_core else pd.Series(
+        {col: merged_df[col].isna().sum() for col in merged_df.columns})
     
     if missing_by_col.sum() == 0:
         print(f"    ✓ No missing values in any column!")
@@ -309,38 +679,431 @@ def save_datasets(aligned_data, common_dates, missing_value_report):
     return merged_df
 
 
-def main():
+def resample_to_frequency(df, freq, rule):
+    """
+    Bring one native-frequency series onto a weekly or daily panel grid.
+    
+    Series at least as frequent as the panel are downsampled: onto weeks with
+    their registry resample method ('last' when it is None or 'ffill'), onto
+    business days by keeping just the business-day observations. Coarser
+    series are spread over the grid from their first observation to the end
+    of the period their last one covers, either holding each value until the
+    next ('ffill') or interpolating linearly in time ('interpolate').
+    
+    Parameters:
+        df (pd.DataFrame): Cleaned series from load_and_clean_dataset
+        freq (str): Panel frequency, 'W' or 'D'
+        rule (dict): The series' entry from series_registry.frequency_rules()
+    
+    Returns:
+        pd.DataFrame: Series on the panel grid
+    """
+    grid, _, _ = PANEL_FREQUENCIES[freq]
+    if FREQUENCY_RANK[rule['frequency']] <= FREQUENCY_RANK[freq]:
+        if freq == 'D':
+            return df[df.index.dayofweek < 5]
+        method = rule['resample'] if rule['resample'] not in (None, 'ffill') else 'last'
+        return getattr(df.resample(grid), method)()
+    
+    end = df.index[-1] + PERIOD_END[rule['frequency']]
+    dates = pd.date_range(df.index[0], end, freq=grid)
+    if rule['upsample'] == 'interpolate':
+        return df.reindex(df.index.union(dates)).interpolate(method='time').reindex(dates)
+    return df.reindex(dates, method='ffill')
+
+
+@instrumented
+def load_native_datasets():
+    """
+    Load and clean every raw dataset at its native frequency.
+    
+    Returns:
+        dict: Cleaned dataframes by final column name (datasets that fail
+            to load are reported and left out)
+    """
+    native_data = {}
+    for filename, final_col_name, _ in DATASETS:
+        try:
+            df, original_col = load_and_clean_dataset(filename, date_format=raw_date_format(final_col_name))
+            native_data[final_col_name] = df.rename(columns={original_col: final_col_name})
+        except Exception as e:
+            print(f"    ❌ Error processing {filename}: {str(e)}\n")
+    return native_data
+
+
+@instrumented(labels=('freq',))
+def build_frequency_panel(freq, native_data, out_of_core=False, quality_gate=True):
+    """
+    Build and save the merged panel at a weekly or daily frequency.
+    
+    Parameters:
+        freq (str): Panel frequency, 'W' or 'D'
+        native_data (dict): Series from load_native_datasets()
+        out_of_core (bool): Align into a column store under PANEL_STORE_DIR
+            and write the panel from it in row chunks
+        quality_gate (bool): Stop before writing if a data-quality check fails
+    
+    Returns:
+        pd.DataFrame or ColumnStore: The merged panel
+    """
+    _, unit, panel_file = PANEL_FREQUENCIES[freq]
+    print("\n" + "=" * 70)
+    print(f"Resampling all datasets to {unit}\n")
+    
+    rules = frequency_rules()
+    resampled = {}
+    for col_name, df in native_data.items():
+        rule = rules[col_name]
+        resampled[col_name] = resample_to_frequency(df, freq, rule)
+        if FREQUENCY_RANK[rule['frequency']] > FREQUENCY_RANK[freq]:
+            print(f"  {col_name}: {rule['frequency']} → {unit} ({rule['upsample']})")
+    
+    if out_of_core:
+        panel = align_to_store(resampled, [], PANEL_STORE_DIR / freq, freq)
+        check_quality(panel, panel_file, [], quality_gate, series=resampled)
+        content = panel.content_hash()
+    else:
+        aligned_data, _ = align_datasets(resampled, [], freq)
+        check_quality(aligned_data, panel_file, [], quality_gate, series=resampled)
+        panel = pd.concat(aligned_data.values(), axis=1)
+        panel.index.name = 'date'
+        content = None
+    
+    print()
+    if write_if_changed(panel, panel_file, lambda data, path: data.to_csv(path), content=content):
+        print(f"  ✓ Merged panel created: {panel_file.name}")
+    else:
+        print(f"  = Merged panel unchanged: {panel_file.name}")
+    print(f"    Shape: {panel.shape} (rows: {panel.shape[0]}, columns: {panel.shape[1]})")
+    print(f"    Date range: {panel.index.min().date()} to {panel.index.max().date()}")
+    return panel
+
+
+def panel_stage(freq):
+    """Manifest stage name of the panel at one frequency."""
+    return STAGE_NAME if freq == 'ME' else f"{STAGE_NAME}:{freq}"
+
+
+def first_changed_row(old, new):
+    """
+    Position of the first row where two frames differ.
+    
+    Returns:
+        int: First differing row (0 if the columns differ; the length of the
+            shorter frame if one extends the other), or None if identical
+    """
+    if list(old.columns) != list(new.columns) or old.index.name != new.index.name:
+        return 0
+    n = min(len(old), len(new))
+    a = old.to_numpy(dtype=float)[:n]
+    b = new.to_numpy(dtype=float)[:n]
+    same = (old.index[:n] == new.index[:n]) & ((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=1)
+    differing = np.flatnonzero(~same)
+    if len(differing) > 0:
+        return int(differing[0])
+    return None if len(old) == len(new) else n
+
+
+def patch_csv(path, df, first_row):
+    """
+    Bring a CSV written by df.to_csv() up to date from data row `first_row` on.
+    
+    The file is truncated just before that row and the remaining rows are
+    appended, so earlier rows are never rewritten.
+    """
+    if first_row == 0:
+        df.to_csv(path)
+        return
+    with open(path, 'r+b') as f:
+        f.readline()  # header
+        for _ in range(first_row):
+            f.readline()
+        f.truncate(f.tell())
+    df.iloc[first_row:].to_csv(path, mode='a', header=False)
+
+
+def save_panel_state(processed_data, outputs, manifest):
+    """
+    Remember the monthly series behind the current outputs, for --incremental.
+    
+    Parameters:
+        processed_data (dict): Monthly dataframes before alignment
+        outputs (list): Files just written (their hashes are stored, so a
+            later edit to any of them invalidates the state)
+        manifest (Manifest): Source of the output hashes
+    """
+    state = {
+        'version': PANEL_STATE_VERSION,
+        'monthly': processed_data,
+        'outputs': {manifest_key(path): manifest.current_hash(path) for path in outputs},
+    }
+    tmp = PANEL_STATE_PATH.with_name(f"{PANEL_STATE_PATH.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, PANEL_STATE_PATH)
+
+
+def load_panel_state(manifest):
+    """
+    Load the state saved by the last run.
+    
+    Returns:
+        dict: State, or None if there is none or an output it describes has
+            since been modified
+    """
+    try:
+        with open(PANEL_STATE_PATH, 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    if state.get('version') != PANEL_STATE_VERSION:
+        return None
+    for key, recorded in state['outputs'].items():
+        if manifest.current_hash(PROJECT_ROOT / key) != recorded:
+            return None
+    return state
+
+
+@instrumented
+def update_incremental(manifest, inputs, stream=False, chunksize=DEFAULT_CHUNK_ROWS, quality_gate=True):
+    """
+    Update the outputs for changed raw files only.
+    
+    Only the changed datasets are reloaded; every other series comes from the
+    monthly data saved by the last run. Each output file is compared with
+    what that run wrote and patched in place from its first changed row, so
+    appending a month rewrites just the tail of each file (the new months
+    plus any forward-filled values they replace).
+    
+    Parameters:
+        manifest (Manifest): Pipeline manifest
+        inputs (list): Stage inputs (see stage_inputs)
+        stream (bool): Stream the changed raw files (see stream_to_monthly)
+        chunksize (int): Rows per chunk when streaming
+        quality_gate (bool): Stop before patching if a data-quality check fails
+    
+    Returns:
+        pd.DataFrame: The merged panel, or None if an incremental update isn't
+            possible (no saved state, or code or registry changed) and the
+            caller must rebuild
+    """
+    state = load_panel_state(manifest)
+    if state is None:
+        print("\n  No state from an unmodified previous run - rebuilding in full.")
+        return None
+    
+    changed = set(manifest.changed_inputs(STAGE_NAME, inputs))
+    changed_datasets = [dataset for dataset, path in zip(DATASETS, inputs) if manifest_key(path) in changed]
+    if len(changed_datasets) < len(changed) or list(state['monthly']) != [col for _, col, _ in DATASETS]:
+        print("\n  Pipeline code or registry changed - rebuilding in full.")
+        return None
+    
+    print("\n" + "=" * 70)
+    print("INCREMENTAL UPDATE")
+    print("=" * 70 + "\n")
+    start_time = time.perf_counter()
+    
+    processed_data = dict(state['monthly'])
+    for filename, final_col_name, resample_method in changed_datasets:
+        df, _ = process_dataset(filename, final_col_name, resample_method, stream, chunksize)
+        if df is None:
+            return None
+        processed_data[final_col_name] = df
+    
+    # Realigning the monthly series is cheap; it's the file writes that are limited to changed rows
+    with contextlib.redirect_stdout(io.StringIO()):
+        old_aligned, _ = align_datasets(state['monthly'], [])
+        aligned_data, _ = align_datasets(processed_data, [])
+    
+    check_quality(aligned_data, MERGED_PANEL_FILE, [], quality_gate, series=processed_data)
+    print()
+    
+    old_frames = {PROCESSED_DATA_DIR / f"{col}.csv": df for col, df in old_aligned.items()}
+    new_frames = {PROCESSED_DATA_DIR / f"{col}.csv": df for col, df in aligned_data.items()}
+    old_frames[MERGED_PANEL_FILE] = pd.concat(old_aligned.values(), axis=1).rename_axis('date')
+    new_frames[MERGED_PANEL_FILE] = merged_df = pd.concat(aligned_data.values(), axis=1).rename_axis('date')
+    
+    print("Patching outputs\n")
+    for path, new in new_frames.items():
+        first_row = first_changed_row(old_frames[path], new)
+        if first_row is None:
+            continue
+        patch_csv(path, new, first_row)
+        manifest.record_file(path, frame_hash(new))
+        print(f"  ✓ Patched: {path.name} (rows {first_row + 1}-{len(new)} of {len(new)})")
+    
+    outputs = list(new_frames)
+    manifest.record_stage(STAGE_NAME, inputs, outputs)
+    save_panel_state(processed_data, outputs, manifest)
+    print(f"\n  Incremental update finished in {(time.perf_counter() - start_time) * 1000:.0f} ms")
+    return merged_df
+
+
+def build_monthly_panel(manifest, inputs, incremental=False, stream=False, chunksize=DEFAULT_CHUNK_ROWS,
+                        jobs=1, out_of_core=False, quality_gate=True):
+    """
+    Build and save the processed files and the monthly merged panel, and record the stage.
+    
+    Parameters:
+        manifest (Manifest): Manifest the stage is recorded in
+        inputs (list): Stage inputs from stage_inputs()
+        incremental (bool): Patch the outputs from the saved panel state
+            when possible (see update_incremental)
+        stream, chunksize, jobs: As for load_all_datasets()
+        out_of_core (bool): Align into a column store under PANEL_STORE_DIR
+        quality_gate (bool): Stop before writing if a data-quality check fails
+    
+    Returns:
+        pd.DataFrame or ColumnStore: The merged panel
+    """
+    if incremental:
+        merged_df = update_incremental(manifest, inputs, stream=stream, chunksize=chunksize,
+                                       quality_gate=quality_gate)
+        if merged_df is not None:
+            return merged_df
+    
+    # Process all datasets
+    aligned_data, common_dates, missing_value_report, processed_data = process_all_datasets(
+        stream=stream, chunksize=chunksize, jobs=jobs,
+        store_path=PANEL_STORE_DIR / 'ME' if out_of_core else None)
+    
+    # Check the panel before anything is written
+    check_quality(aligned_data, MERGED_PANEL_FILE, missing_value_report, gate=quality_gate,
+                  series=processed_data)
+    
+    # Save everything
+    merged_df = save_datasets(aligned_data, common_dates, missing_value_report)
+    outputs = stage_outputs(aligned_data)
+    manifest.record_stage(STAGE_NAME, inputs, outputs)
+    save_panel_state(processed_data, outputs, manifest)
+    return merged_df
+
+
+def stage_inputs():
+    """
+    Files the merged panel depends on: every raw dataset, this script and
+    the other code it runs (STAGE_MODULES).
+
+    Returns:
+        list: Paths, raw datasets first in DATASETS order (raw files that
+            don't exist yet are included, so their appearance invalidates
+            the last run)
+    """
+    inputs = []
+    for filename, _, _ in DATASETS:
+        path, _ = find_raw(filename)
+        inputs.append(path if path is not None else raw_path(filename))
+    inputs.append(Path(__file__).resolve())
+    inputs.extend(CODE_DIR / module for module in STAGE_MODULES)
+    return inputs
+
+
+def stage_outputs(aligned_data):
+    """Files written by save_datasets()."""
+    return [PROCESSED_DATA_DIR / f"{col_name}.csv" for col_name in aligned_data] + [MERGED_PANEL_FILE]
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Clean raw data and build the merged analysis panel.")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild even if the raw inputs are unchanged since the last run")
+    parser.add_argument('--stream', action='store_true',
+                        help="resample each raw file while reading it in chunks (bounded memory)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"rows per chunk when streaming (default: {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument('--incremental', action='store_true',
+                        help="reload only changed raw files and patch the outputs from the first changed row")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="worker processes for per-dataset cleaning (default: 1, 0 = one per CPU core)")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="align into memory-mapped column stores under data/panel_store/ and write "
+                             "the panels from them in row chunks (for very wide panels)")
+    parser.add_argument('--no-quality-gate', action='store_true',
+                        help="write the panels even if data-quality checks fail (the report still lists them)")
+    parser.add_argument('--frequencies', nargs='+', choices=list(PANEL_FREQUENCIES), default=['ME'],
+                        help="panels to build: ME (monthly), W (weekly), D (business-daily); default: ME")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main execution function."""
+    args = parse_args(argv)
+
     try:
-        # Process all datasets
-        aligned_data, common_dates, missing_value_report = process_all_datasets()
+        manifest = get_manifest()
+        inputs = stage_inputs()
+        frequencies = list(dict.fromkeys(args.frequencies))
+        stale = [freq for freq in frequencies
+                 if args.force or not manifest.stage_is_current(panel_stage(freq), inputs)]
+        if not stale:
+            print("\n" + "=" * 70)
+            print("✓ RAW DATA UNCHANGED - OUTPUTS ARE UP TO DATE")
+            print("=" * 70)
+            print("\n  Raw inputs match the last run; nothing to rebuild.")
+            for freq in frequencies:
+                print(f"  - Location: {PANEL_FREQUENCIES[freq][2]}")
+            print("  Run with --force to rebuild anyway.")
+            print("=" * 70 + "\n")
+            return 0
+
+        changed = manifest.changed_inputs(panel_stage(stale[0]), inputs)
+        if changed and len(changed) < len(inputs):
+            print(f"\nChanged since last run: {', '.join(Path(key).name for key in changed)}")
+
+        merged_df = None
+        if 'ME' in stale:
+            merged_df = build_monthly_panel(manifest, inputs, incremental=args.incremental and not args.force,
+                                            stream=args.stream, chunksize=args.chunk_rows,
+                                            jobs=args.jobs or os.cpu_count() or 1, out_of_core=args.out_of_core,
+                                            quality_gate=not args.no_quality_gate)
         
-        # Save everything
-        merged_df = save_datasets(aligned_data, common_dates, missing_value_report)
+        # Weekly and daily panels are always rebuilt in full from the native series
+        extra_panels = {}
+        extra = [freq for freq in stale if freq != 'ME']
+        if extra:
+            print("\n" + "=" * 70)
+            print(f"Loading native-frequency datasets for the {', '.join(extra)} panels\n")
+            native_data = load_native_datasets()
+            for freq in extra:
+                extra_panels[freq] = build_frequency_panel(freq, native_data, out_of_core=args.out_of_core,
+                                                           quality_gate=not args.no_quality_gate)
+                manifest.record_stage(panel_stage(freq), inputs, [PANEL_FREQUENCIES[freq][2]])
         
         print("\n" + "=" * 70)
         print("✓ DATA PROCESSING COMPLETE")
         print("=" * 70)
-        print(f"\nFinal dataset summary:")
-        print(f"  - Location: {FINAL_DATA_DIR / 'merged_analysis_panel.csv'}")
-        print(f"  - Variables: {merged_df.shape[1]}")
-        print(f"  - Monthly observations: {merged_df.shape[0]}")
-        print(f"  - Date range: {merged_df.index.min().date()} to {merged_df.index.max().date()}")
-        print(f"  - Years of data: {(merged_df.index.max() - merged_df.index.min()).days / 365.25:.1f}")
+        if merged_df is not None:
+            print(f"\nFinal dataset summary:")
+            print(f"  - Location: {MERGED_PANEL_FILE}")
+            print(f"  - Variables: {merged_df.shape[1]}")
+            print(f"  - Monthly observations: {merged_df.shape[0]}")
+            print(f"  - Date range: {merged_df.index.min().date()} to {merged_df.index.max().date()}")
+            print(f"  - Years of data: {(merged_df.index.max() - merged_df.index.min()).days / 365.25:.1f}")
+            
+            # Bitcoin coverage
+            bitcoin_data = merged_df['bitcoin_price_usd'].dropna()
+            if len(bitcoin_data) > 0:
+                print(f"\n  Bitcoin data coverage:")
+                print(f"    - Available from: {bitcoin_data.index.min().date()}")
+                print(f"    - Observations: {len(bitcoin_data)} months")
+                print(f"    - Missing (pre-Bitcoin era): {merged_df['bitcoin_price_usd'].isna().sum()} months")
         
-        # Bitcoin coverage
-        bitcoin_data = merged_df['bitcoin_price_usd'].dropna()
-        if len(bitcoin_data) > 0:
-            print(f"\n  Bitcoin data coverage:")
-            print(f"    - Available from: {bitcoin_data.index.min().date()}")
-            print(f"    - Observations: {len(bitcoin_data)} months")
-            print(f"    - Missing (pre-Bitcoin era): {merged_df['bitcoin_price_usd'].isna().sum()} months")
+        for freq, panel in extra_panels.items():
+            _, unit, panel_file = PANEL_FREQUENCIES[freq]
+            print(f"\n  {panel_file.name}:")
+            print(f"    - {panel.shape[0]} {unit} × {panel.shape[1]} variables, "
+                  f"{panel.index.min().date()} to {panel.index.max().date()}")
         
         print("\n  Data is ready for analysis!")
         print("=" * 70 + "\n")
         
         return 0
         
+    except DataQualityError as e:
+        print(f"\n❌ {e}\n", file=sys.stderr)
+        return 1
+        
     except Exception as e:
         print(f"\n❌ ERROR: {str(e)}\n", file=sys.stderr)
         import traceback
@@ -0,0 +1,193 @@
+"""
+Memory-Mapped Column Store for Wide Panels
+==========================================
+
+A merged panel of a few hundred daily series is too big to build as one
+in-memory DataFrame next to the per-series frames it comes from.
+ColumnStore keeps the panel on disk instead, as a preallocated float64 array
+in column-major order, so each column is one contiguous block of the file:
+
+- Writing a column touches only that column's bytes, so a panel can be
+  filled one series at a time with about one column in memory
+- Reading a column (store['gold_price_usd']) memory-maps the file and
+  touches just that block
+- iter_rows(), to_csv() and content_hash() walk the panel in row chunks,
+  so the merged CSV and its manifest hash are produced without
+  materializing the whole panel
+
+A store is a directory holding:
+    values.npy    float64 (rows × columns), Fortran order, read with np.memmap
+    index.npy     Row dates as datetime64[ns]
+    columns.json  Column names, in panel order
+
+Usage:
+    from column_store import ColumnStore
+
+    store = ColumnStore.create(path, dates, ['gold_price_usd', 'sp500_index'])
+    store.write_column('gold_price_usd', values)
+
+    store = ColumnStore.open(path)
+    gold = store['gold_price_usd']            # pd.Series over the memory map
+    for chunk in store.iter_rows():           # pd.DataFrame row blocks of ~8 MB
+        ...
+"""
+
+import json
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from manifest import chunked_frame_hash
+
+# Target size of the row blocks read by iter_rows(), to_csv() and content_hash()
+DEFAULT_CHUNK_BYTES = 8 * 1024**2
+
+VALUES_FILE = 'values.npy'
+INDEX_FILE = 'index.npy'
+COLUMNS_FILE = 'columns.json'
+
+
+class ColumnStore:
+    """
+    A float64 panel stored column by column in a memory-mapped .npy file.
+
+    Create a new store with ColumnStore.create() or open an existing one
+    with ColumnStore.open(). Indexing by column name returns a pd.Series;
+    `shape`, `index` and `columns` mirror a DataFrame's.
+
+    Columns are written, and row blocks read, with plain positioned file
+    I/O rather than through the map: a row block touches every column, and
+    faulting in each column's pages would put far more than the block
+    itself in resident memory. Only store[column] maps the file.
+    """
+
+    def __init__(self, path, index, columns, index_name='date'):
+        self.path = Path(path)
+        self.index = index
+        self.columns = list(columns)
+        self.index_name = index_name
+        self._positions = {col: i for i, col in enumerate(self.columns)}
+
+    @classmethod
+    def create(cls, path, index, columns, index_name='date'):
+        """
+        Preallocate a store (NaN-filled), replacing any store already at `path`.
+
+        Parameters:
+            path (Path): Store directory
+            index (pd.DatetimeIndex): Row dates
+            columns (list): Column names, in order
+            index_name (str): Name given to the index when reading back
+        """
+        path = Path(path)
+        if path.exists():
+            shutil.rmtree(path)
+        path.mkdir(parents=True)
+
+        index = pd.DatetimeIndex(index).astype('datetime64[ns]')
+        np.save(path / INDEX_FILE, index.to_numpy())
+        with open(path / COLUMNS_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'columns': list(columns), 'index_name': index_name}, f, indent=2)
+        values = np.lib.format.open_memmap(path / VALUES_FILE, mode='w+', dtype=np.float64,
+                                           shape=(len(index), len(columns)), fortran_order=True)
+        del values
+
+        store = cls(path, index, columns, index_name)
+        empty = np.full(len(index), np.nan)
+        for col in store.columns:
+            store.write_column(col, empty)
+        return store
+
+    @classmethod
+    def open(cls, path):
+        """Open an existing store."""
+        path = Path(path)
+        with open(path / COLUMNS_FILE, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        index = pd.DatetimeIndex(np.load(path / INDEX_FILE))
+        return cls(path, index, meta['columns'], meta['index_name'])
+
+    def _map(self):
+        return np.load(self.path / VALUES_FILE, mmap_mode='r')
+
+    def _data_offset(self, f):
+        """Byte offset of the array data in values.npy (just past the .npy header)."""
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            np.lib.format.read_array_header_1_0(f)
+        else:
+            np.lib.format.read_array_header_2_0(f)
+        return f.tell()
+
+    @property
+    def shape(self):
+        return (len(self.index), len(self.columns))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def write_column(self, column, values):
+        """Store one column's values (one per row of the index)."""
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        with open(self.path / VALUES_FILE, 'r+b') as f:
+            f.seek(self._data_offset(f) + self._positions[column] * len(self.index) * 8)
+            values.tofile(f)
+
+    def __getitem__(self, column):
+        """One column as a pd.Series over the memory map (no copy)."""
+        return pd.Series(self._map()[:, self._positions[column]], index=self.index, name=column)
+
+    def column_frame(self, column, index_name=None):
+        """One column as a single-column DataFrame."""
+        frame = self[column].to_frame()
+        frame.index.name = index_name
+        return frame
+
+    def chunk_rows(self, chunk_bytes=DEFAULT_CHUNK_BYTES):
+        """Rows per chunk that keep a row block to about chunk_bytes."""
+        return max(1, chunk_bytes // (8 * max(len(self.columns), 1)))
+
+    def iter_rows(self, chunk_rows=None):
+        """
+        Yield the panel as consecutive row blocks.
+
+        Parameters:
+            chunk_rows (int, optional): Rows per block (default: chunk_rows())
+
+        Yields:
+            pd.DataFrame: In-memory block of every column, index named index_name
+        """
+        chunk_rows = chunk_rows or self.chunk_rows()
+        with open(self.path / VALUES_FILE, 'rb') as f:
+            offset = self._data_offset(f)
+            for start in range(0, len(self.index), chunk_rows):
+                stop = min(start + chunk_rows, len(self.index))
+                block = np.empty((stop - start, len(self.columns)), order='F')
+                for i in range(len(self.columns)):
+                    f.seek(offset + (i * len(self.index) + start) * 8)
+                    block[:, i] = np.fromfile(f, dtype=np.float64, count=stop - start)
+                index = self.index[start:stop]
+                index.name = self.index_name
+                yield pd.DataFrame(block, index=index, columns=self.columns)
+
+    def content_hash(self, chunk_rows=None):
+        """manifest.frame_hash() of to_frame(), computed one row chunk at a time."""
+        return chunked_frame_hash(self.iter_rows(chunk_rows))
+
+    def to_frame(self):
+        """The whole panel as an in-memory DataFrame (for panels that fit)."""
+        if len(self.index) == 0:
+            return pd.DataFrame(columns=self.columns, index=pd.DatetimeIndex([], name=self.index_name),
+                                dtype=np.float64)
+        return pd.concat(self.iter_rows(), axis=0)
+
+    def to_csv(self, path, chunk_rows=None):
+        """Write the panel as CSV in row chunks; the file matches to_frame().to_csv(path)."""
+        with open(path, 'w', newline='') as f:
+            if len(self.index) == 0:
+                self.to_frame().to_csv(f)
+            for i, chunk in enumerate(self.iter_rows(chunk_rows)):
+                chunk.to_csv(f, header=(i == 0))
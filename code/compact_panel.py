@@ -0,0 +1,156 @@
+"""
+Compact In-Memory Panel Representation
+======================================
+
+The merged panel is float64 in every column, and the long asset panel built
+by capstone_models.build_asset_panel repeats the asset name as a string on
+every row. compact_frame() stores the same data in smaller dtypes:
+
+- float64 columns become float32 when every value round-trips within
+  FLOAT32_RTOL (relative). Price, index and rate levels all do; columns that
+  don't stay float64
+- String columns with few distinct values (e.g. 'asset') become categorical,
+  one small integer code per row
+- The 'date' column becomes int32 days since 1970-01-01
+
+The compact frame is meant for holding large panels. Model code should call
+expand_frame() on just the columns it fits on: that restores datetime64
+dates, float64 and plain string columns, so date comparisons and estimation
+work exactly as before (on values rounded to float32).
+
+Usage:
+    from compact_panel import compact_frame, expand_frame, memory_report
+
+    compact = compact_frame(long_df)
+    print(memory_report(long_df, compact, 'Long asset panel'))
+
+    # Memory report for the merged panel
+    python code/compact_panel.py
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from config_paths import FINAL_DATA_DIR
+
+FLOAT32_RTOL = 1e-6
+
+# String columns become categorical when they have at most this share of distinct values
+MAX_CATEGORY_RATIO = 0.5
+
+DATE_COLUMN = 'date'
+
+
+def fits_float32(values, rtol=FLOAT32_RTOL):
+    """True if every value of a float array survives a float32 round trip within rtol."""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(over='ignore', invalid='ignore'):
+        narrowed = values.astype(np.float32).astype(np.float64)
+    finite = np.isfinite(values)
+    if not np.array_equal(finite, np.isfinite(narrowed)):
+        return False  # overflows float32
+    error = np.abs(narrowed[finite] - values[finite])
+    return bool(np.all(error <= rtol * np.abs(values[finite])))
+
+
+def encode_dates(dates):
+    """Dates as int32 days since 1970-01-01."""
+    days = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]')
+    if np.isnat(days).any():
+        raise ValueError("Can't int-code missing dates")
+    return days.astype(np.int64).astype(np.int32)
+
+
+def decode_dates(codes):
+    """Inverse of encode_dates(): int32 day codes to datetime64[ns]."""
+    return np.asarray(codes, dtype=np.int64).astype('datetime64[D]').astype('datetime64[ns]')
+
+
+def compact_frame(df, rtol=FLOAT32_RTOL, code_dates=True, date_column=DATE_COLUMN):
+    """
+    Store a panel in compact dtypes (see module docstring).
+
+    Parameters:
+        df (pd.DataFrame): Wide or long panel
+        rtol (float): Largest relative error accepted for float32
+        code_dates (bool): Store the date column as int32 day codes
+        date_column (str): Name of the date column
+
+    Returns:
+        pd.DataFrame: New frame; columns that can't be narrowed are kept as they are
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col == date_column and code_dates and pd.api.types.is_datetime64_any_dtype(series):
+            columns[col] = encode_dates(series)
+        elif series.dtype == np.float64 and fits_float32(series.to_numpy(), rtol):
+            columns[col] = series.to_numpy(dtype=np.float32)
+        elif ((pd.api.types.is_string_dtype(series) or series.dtype == object)
+              and series.nunique(dropna=True) <= MAX_CATEGORY_RATIO * max(len(series), 1)):
+            columns[col] = series.astype('category').array
+        else:
+            columns[col] = series.array
+    return pd.DataFrame(columns, index=df.index)
+
+
+def expand_frame(df, date_column=DATE_COLUMN):
+    """
+    Copy a (possibly compact) frame with the default dtypes restored.
+
+    Int-coded dates become datetime64, float32 becomes float64 and
+    categoricals go back to their categories' dtype. Frames that were never
+    compacted are just copied, so callers needn't know which they were given.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if col == date_column and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = decode_dates(df[col].to_numpy())
+        elif df[col].dtype == np.float32:
+            df[col] = df[col].astype(np.float64)
+        elif isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df
+
+
+def memory_usage(df):
+    """Bytes held by a frame, including its index and string contents."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def memory_report(before, after, label='Panel'):
+    """
+    Describe the memory saved by compact_frame().
+
+    Returns:
+        str: Total footprint before and after, then each column whose dtype changed
+    """
+    size_before = memory_usage(before)
+    size_after = memory_usage(after)
+    saved = 1 - size_after / size_before if size_before else 0.0
+    lines = [f"{label}: {size_before / 1024**2:.2f} MB → {size_after / 1024**2:.2f} MB "
+             f"({saved:.0%} smaller, {len(after):,} rows × {after.shape[1]} columns)"]
+
+    usage_before = before.memory_usage(index=False, deep=True)
+    usage_after = after.memory_usage(index=False, deep=True)
+    for col in after.columns:
+        if str(before[col].dtype) != str(after[col].dtype):
+            lines.append(f"  {col:28s} {str(before[col].dtype):>15s} → {str(after[col].dtype):10s} "
+                         f"{usage_before[col] / 1024:9.1f} KB → {usage_after[col] / 1024:9.1f} KB")
+    kept = [col for col in after.columns if after[col].dtype == np.float64]
+    if kept:
+        lines.append(f"  Kept float64 (not representable within rtol={FLOAT32_RTOL:g}): {', '.join(kept)}")
+    return "\n".join(lines)
+
+
+def main():
+    """Print the memory report for the merged panel."""
+    panel_path = FINAL_DATA_DIR / "merged_analysis_panel.csv"
+    panel = pd.read_csv(panel_path, float_precision='round_trip')
+    panel[DATE_COLUMN] = pd.to_datetime(panel[DATE_COLUMN])
+    print(memory_report(panel, compact_frame(panel), 'Merged panel'))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -53,8 +53,14 @@ CODE_DIR = PROJECT_ROOT / 'code'
 # Data directories
 DATA_DIR = PROJECT_ROOT / 'data'
 RAW_DATA_DIR = DATA_DIR / 'raw'
+VINTAGE_DATA_DIR = RAW_DATA_DIR / 'vintages'  # ALFRED real-time revision history
 PROCESSED_DATA_DIR = DATA_DIR / 'processed'
 FINAL_DATA_DIR = DATA_DIR / 'final'
+CACHE_DIR = DATA_DIR / 'cache'  # Fetcher response cache (not committed)
+MANIFEST_PATH = DATA_DIR / 'manifest.json'  # Content hashes of pipeline artifacts (not committed)
+CHECKPOINT_DIR = DATA_DIR / 'checkpoints'  # Resumable ingestion state (not committed)
+PANEL_STATE_PATH = DATA_DIR / 'panel_state.pkl'  # Monthly series behind the merged panel (not committed)
+PANEL_STORE_DIR = DATA_DIR / 'panel_store'  # Memory-mapped merged panels, --out-of-core (not committed)
 
 # Results directories
 RESULTS_DIR = PROJECT_ROOT / 'results'
@@ -73,6 +79,7 @@ def ensure_directories():
         RAW_DATA_DIR,
         PROCESSED_DATA_DIR,
         FINAL_DATA_DIR,
+        CACHE_DIR,
         FIGURES_DIR,
         TABLES_DIR,
         REPORTS_DIR
@@ -119,6 +126,7 @@ if __name__ == "__main__":
             'RAW_DATA_DIR': RAW_DATA_DIR,
             'PROCESSED_DATA_DIR': PROCESSED_DATA_DIR,
             'FINAL_DATA_DIR': FINAL_DATA_DIR,
+            'CACHE_DIR': CACHE_DIR,
             'RESULTS_DIR': RESULTS_DIR,
             'FIGURES_DIR': FIGURES_DIR,
             'TABLES_DIR': TABLES_DIR,
@@ -0,0 +1,478 @@
+"""
+Data-Quality Checks for the Merged Panels
+=========================================
+
+Checks every column of an aligned panel and writes a machine-readable report
+(JSON, plus a Parquet table with one row per column):
+
+- gaps        Missing values: in total, before the series starts, and the
+              longest run between its first and last value
+- stale       Longest run of repeated values. Series coarser than the panel
+              repeat by design (quarterly GDP fills three months), so the run
+              is compared with the repeat expected from the series' registry
+              frequency
+- outliers    Period-to-period changes more than ZSCORE_LIMIT rolling
+              standard deviations from the mean change of the preceding
+              window (for repeated series, only the periods where the
+              value changed count)
+- unit jumps  Consecutive positive values a factor of UNIT_JUMP_FACTOR or
+              more apart (e.g. a switch from millions to billions)
+- coverage    Share of panel dates with a value
+
+Alignment forward fills every gap, so on the aligned panel a missing month
+just looks like a repeated one. Gaps and stale runs are therefore measured on
+each series before alignment (as resampled to the panel frequency, from the
+panel's first date to the series' last observation) whenever the caller
+passes those series; clean_and_merge.py always does, and so does the command
+line, which reloads them from data/raw/.
+
+Each metric is computed for a whole block of columns at once: run lengths
+with cumulative sums and maximum.accumulate, z-scores with one rolling
+window over the block. Checking the panels costs milliseconds even with
+hundreds of daily columns. Column stores (column_store.py) are read a block
+of columns at a time.
+
+THRESHOLDS decides which results fail a panel. The gap and stale limits come
+from each series' registry definition (native_limits): its frequency sets how
+long a value may stay unchanged, trading-day series may miss exchange
+closures on the daily panel, and series that start late ('ffill_from_start')
+aren't held to full coverage. A registry entry can override any limit for
+its series with a 'quality' dict. clean_and_merge.py runs the checks
+on each panel before writing it and stops if any fail (--no-quality-gate
+writes the report and carries on).
+
+Usage:
+    from data_quality import run_quality_checks
+
+    report = run_quality_checks(panel, REPORTS_DIR / 'data_quality_merged_analysis_panel',
+                                series=monthly_series_before_alignment)
+
+    # Check the saved merged panel
+    python code/data_quality.py [data/final/merged_analysis_panel.csv] [--no-gate]
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config_paths import FINAL_DATA_DIR, REPORTS_DIR
+import series_registry
+
+# A check fails when a column's value is below the 'min_' or above the 'max_'
+# limit; None reports the value without failing on it. native_limits()
+# refines these per series from its registry entry
+THRESHOLDS = {
+    'min_coverage': 1.0,        # share of panel dates with a value (aligned panels are filled)
+    'max_interior_gap': 0,      # longest run of missing panel periods after the series starts
+    'max_stale_ratio': None,    # longest repeated run / expected repeat length
+    'max_unit_jumps': 0,
+    'max_outliers': None,
+}
+
+# Native observations a value may repeat before the series counts as stale:
+# a month of trading days, a quarter of weeks, half a year of monthly
+# releases (rounded statistics such as the unemployment rate plateau), and a
+# year of quarters
+MAX_STALE_OBSERVATIONS = {'D': 21, 'W': 13, 'M': 6, 'Q': 4}
+
+# Business days a trading-day series may miss on the daily panel: exchange
+# holidays, and the four-day NYSE closure after 9/11/2001
+EXCHANGE_CLOSURE_DAYS = 4
+
+ZSCORE_LIMIT = 8.0
+ZSCORE_MIN_PERIODS = 12
+# Unit changes move values by a power of 100 or 1000 (percent vs fraction,
+# millions vs billions); noisy daily indexes can move tenfold in a day
+UNIT_JUMP_FACTOR = 100.0
+
+# Rolling z-score window, in periods, by panel frequency (roughly 3 years
+# monthly, 2 years weekly, 1 year daily)
+ZSCORE_WINDOWS = {'ME': 36, 'W': 104, 'D': 260}
+
+# Days covered by one observation of each registry frequency
+NATIVE_PERIOD_DAYS = {'D': 1.0, 'W': 7.0, 'M': 365.25 / 12, 'Q': 365.25 / 4}
+
+# Date grid of each panel frequency (as in clean_and_merge.PANEL_FREQUENCIES)
+PANEL_GRIDS = {'ME': 'ME', 'W': 'W-FRI', 'D': 'B'}
+
+# Columns checked together (bounds memory for wide column stores)
+BLOCK_COLUMNS = 256
+
+
+class DataQualityError(ValueError):
+    """Raised by run_quality_checks() when a panel fails its thresholds."""
+
+    def __init__(self, failures, report_path):
+        self.failures = failures
+        self.report_path = report_path
+        shown = '; '.join(f"{f['column']} {f['check']}={f['value']:g} (limit {f['limit']:g})"
+                          for f in failures[:5])
+        more = f" and {len(failures) - 5} more" if len(failures) > 5 else ""
+        super().__init__(f"Data quality checks failed: {shown}{more} (see {report_path})")
+
+
+def _longest_runs(mask):
+    """Longest run of True in each column of a 2-D boolean array."""
+    if len(mask) == 0:
+        return np.zeros(mask.shape[1], dtype=np.int64)
+    counts = np.cumsum(mask, axis=0)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=0)
+    return (counts - resets).max(axis=0)
+
+
+def _panel_frequency(index):
+    """Panel frequency key ('ME', 'W' or 'D') and mean days per period."""
+    if len(index) < 2:
+        return 'ME', NATIVE_PERIOD_DAYS['M']
+    days = (index[-1] - index[0]).days / (len(index) - 1)
+    if days < 3:
+        return 'D', days
+    if days < 15:
+        return 'W', days
+    return 'ME', days
+
+
+def _column_blocks(panel, block_columns=BLOCK_COLUMNS):
+    """
+    Yield a panel as (column names, 2-D float array) blocks of columns.
+
+    Accepts a DataFrame, a dict of single-column frames on the same index
+    (clean_and_merge's aligned data) or a column_store.ColumnStore.
+    """
+    if isinstance(panel, dict):
+        names = list(panel)
+        for start in range(0, len(names), block_columns):
+            block = names[start:start + block_columns]
+            yield block, np.column_stack([panel[col].iloc[:, 0].to_numpy(dtype=float) for col in block])
+    elif isinstance(panel, pd.DataFrame):
+        for start in range(0, panel.shape[1], block_columns):
+            block = panel.iloc[:, start:start + block_columns]
+            yield list(block.columns), block.to_numpy(dtype=float)
+    else:
+        names = list(panel.columns)
+        for start in range(0, len(names), block_columns):
+            block = names[start:start + block_columns]
+            yield block, np.column_stack([panel[col].to_numpy(dtype=float) for col in block])
+
+
+def _panel_index(panel):
+    if isinstance(panel, dict):
+        return next(iter(panel.values())).index
+    return panel.index
+
+
+def _gap_and_stale(values, expected_runs):
+    """Longest interior gap and repeated run of each column of a 2-D array."""
+    n_rows = len(values)
+    valid = ~np.isnan(values)
+    has_values = valid.any(axis=0)
+    rows = np.arange(n_rows)[:, None]
+
+    # Gaps: runs of missing values between the first and last value
+    first = np.where(has_values, valid.argmax(axis=0), n_rows)
+    last = np.where(has_values, n_rows - 1 - valid[::-1].argmax(axis=0), -1)
+    interior = ~valid & (rows > first) & (rows < last)
+
+    # Stale runs: consecutive equal values (NaN never equals NaN)
+    repeats = values[1:] == values[:-1]
+    stale_run = np.where(has_values, _longest_runs(repeats) + 1, 0)
+    return {
+        'interior_gap': _longest_runs(interior),
+        'stale_run': stale_run,
+        'stale_ratio': stale_run / expected_runs,
+    }
+
+
+def check_block(values, index, expected_runs, window):
+    """
+    Quality metrics for a block of aligned columns.
+
+    Parameters:
+        values (np.ndarray): Panel values, rows × columns (NaN = missing)
+        index (pd.DatetimeIndex): Panel dates
+        expected_runs (np.ndarray): Expected repeat length of each column
+        window (int): Rolling z-score window in periods
+
+    Returns:
+        dict: Metric name to an array with one value per column
+    """
+    n_rows, n_cols = values.shape
+    valid = ~np.isnan(values)
+    observations = valid.sum(axis=0)
+    has_values = observations > 0
+    first = np.where(has_values, valid.argmax(axis=0), n_rows)
+    last = np.where(has_values, n_rows - 1 - valid[::-1].argmax(axis=0), -1)
+    runs = _gap_and_stale(values, expected_runs)
+
+    # Unit jumps: consecutive positive values a factor UNIT_JUMP_FACTOR apart
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.abs(np.log(values[1:] / values[:-1]))
+    both_positive = (values[1:] > 0) & (values[:-1] > 0)
+    unit_jumps = (both_positive & (ratio >= np.log(UNIT_JUMP_FACTOR))).sum(axis=0)
+
+    # Outliers: z-score of each change against the preceding window's changes.
+    # Repeated series are scored on the periods where they actually changed
+    changes = np.diff(values, axis=0)
+    changes[(changes == 0) & (expected_runs > 1)] = np.nan
+    changes = pd.DataFrame(changes)
+    rolling = changes.rolling(window, min_periods=ZSCORE_MIN_PERIODS)
+    mean = rolling.mean().shift(1).to_numpy()
+    std = rolling.std().shift(1).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zscores = np.abs((changes.to_numpy() - mean) / std)
+    zscores[~np.isfinite(zscores)] = np.nan
+    outliers = (zscores > ZSCORE_LIMIT).sum(axis=0)
+    scored = ~np.isnan(zscores).all(axis=0)
+    zscores[np.isnan(zscores)] = -np.inf
+    worst = zscores.argmax(axis=0)
+
+    return {
+        'first_date': [index[i].date().isoformat() if ok else None for i, ok in zip(first, has_values)],
+        'last_date': [index[i].date().isoformat() if ok else None for i, ok in zip(last, has_values)],
+        'observations': observations,
+        'coverage': observations / n_rows if n_rows else np.zeros(n_cols),
+        'missing': n_rows - observations,
+        'leading_missing': np.minimum(first, n_rows),
+        'interior_gap': runs['interior_gap'],
+        'stale_run': runs['stale_run'],
+        'expected_run': expected_runs,
+        'stale_ratio': runs['stale_ratio'],
+        'unit_jumps': unit_jumps,
+        'outliers': outliers,
+        'max_zscore': np.where(scored, zscores.max(axis=0, initial=-np.inf), np.nan),
+        'max_zscore_date': [index[i + 1].date().isoformat() if ok else None for i, ok in zip(worst, scored)],
+    }
+
+
+def native_limits(entry, freq):
+    """
+    Limits that follow from a registry entry's definition on a panel of frequency `freq`.
+
+    - max_stale_ratio: MAX_STALE_OBSERVATIONS for its native frequency (a
+      series finer than the panel repeats in panel periods, which is stricter)
+    - max_interior_gap: EXCHANGE_CLOSURE_DAYS for daily series on the daily
+      panel; any missing period fails otherwise
+    - min_coverage: not checked for 'ffill_from_start' series, which are
+      missing by definition before they begin
+    """
+    limits = {'max_stale_ratio': MAX_STALE_OBSERVATIONS[entry['frequency']]}
+    if entry['frequency'] == 'D' and freq == 'D':
+        limits['max_interior_gap'] = EXCHANGE_CLOSURE_DAYS
+    if entry.get('fill') == 'ffill_from_start':
+        limits['min_coverage'] = None
+    return limits
+
+
+def column_thresholds(column, thresholds=None, registry=series_registry.REGISTRY, freq='ME'):
+    """
+    Limits for one column: THRESHOLDS, then the limits its registry definition
+    implies (native_limits), then `thresholds`, then the entry's 'quality'
+    overrides.
+    """
+    limits = dict(THRESHOLDS)
+    entry = series_registry.entry_for(column, registry)
+    if entry is not None:
+        limits.update(native_limits(entry, freq))
+    limits.update(thresholds or {})
+    if entry is not None:
+        limits.update(entry.get('quality', {}))
+    return limits
+
+
+def _series_blocks(series, index, freq, block_columns=BLOCK_COLUMNS):
+    """
+    Yield pre-alignment series as (column names, 2-D float array) blocks.
+
+    Each series is resampled onto the panel grid from the panel's first date
+    to the last observation of any series, so a missing period is NaN rather
+    than forward filled and a gap just after the panel ends still counts.
+    """
+    names = list(series)
+    frames = {col: series[col].iloc[:, 0] if isinstance(series[col], pd.DataFrame) else series[col]
+              for col in names}
+    end = max([index[-1]] + [s.last_valid_index() for s in frames.values() if s.notna().any()])
+    grid = PANEL_GRIDS[freq]
+    dates = pd.date_range(index[0], end, freq=grid)
+    for start in range(0, len(names), block_columns):
+        block = names[start:start + block_columns]
+        yield block, np.column_stack([
+            frames[col][frames[col].index >= index[0]].resample(grid).last()
+            .reindex(dates).to_numpy(dtype=float)
+            for col in block
+        ])
+
+
+def check_panel(panel, thresholds=None, block_columns=BLOCK_COLUMNS, series=None):
+    """
+    Run every check over a panel.
+
+    Parameters:
+        panel: DataFrame, dict of aligned single-column frames, or ColumnStore
+        thresholds (dict, optional): Limits overriding THRESHOLDS and the
+            registry-derived limits (see column_thresholds)
+        block_columns (int): Columns checked at a time
+        series (dict, optional): The panel's series before alignment, at the
+            panel frequency (DataFrames or Series by column). Gaps and stale
+            runs of these columns are measured on them instead of the panel
+
+    Returns:
+        tuple: (pd.DataFrame, list) - One row per column with its metrics and
+            the limits applied to it (min_coverage, max_interior_gap, ...;
+            NaN where not checked), and the failed checks as
+            {'column', 'check', 'value', 'limit'} dicts
+    """
+    index = _panel_index(panel)
+    freq, period_days = _panel_frequency(index)
+    rules = series_registry.frequency_rules()
+
+    frames = []
+    for names, values in _column_blocks(panel, block_columns):
+        expected = np.array([
+            max(1, round(NATIVE_PERIOD_DAYS[rules[col]['frequency']] / period_days)) if col in rules else 1
+            for col in names
+        ])
+        metrics = check_block(values, index, expected, ZSCORE_WINDOWS[freq])
+        frames.append(pd.DataFrame(metrics, index=pd.Index(names, name='column')))
+    report = pd.concat(frames) if frames else pd.DataFrame()
+
+    series = {col: frame for col, frame in (series or {}).items() if col in report.index}
+    if series:
+        for names, values in _series_blocks(series, index, freq, block_columns):
+            runs = _gap_and_stale(values, report.loc[names, 'expected_run'].to_numpy())
+            for metric, column_values in runs.items():
+                report.loc[names, metric] = column_values
+    report['runs_checked_on'] = np.where(report.index.isin(list(series)), 'series', 'panel')
+
+    failures = []
+    applied = {}
+    for column, row in report.iterrows():
+        applied[column] = limits = column_thresholds(column, thresholds, freq=freq)
+        for check, limit in limits.items():
+            if limit is None:
+                continue
+            metric = check[4:]
+            value = row[metric]
+            if (check.startswith('min_') and value < limit) or (check.startswith('max_') and value > limit):
+                failures.append({'column': column, 'check': metric, 'value': float(value), 'limit': float(limit)})
+    # The limits each column was held to, next to its metrics (NaN: not checked)
+    report = report.join(pd.DataFrame.from_dict(applied, orient='index', dtype=float))
+    report['passed'] = ~report.index.isin([f['column'] for f in failures])
+    return report, failures
+
+
+def write_report(report, failures, path_stem, panel_name, thresholds=None, missing_value_report=None):
+    """
+    Save a check_panel() result as <path_stem>.json and <path_stem>.parquet.
+
+    The JSON holds the run summary, default thresholds, failures, per-column
+    metrics with each column's effective limits and (from clean_and_merge)
+    the missing value report; the Parquet file is the per-column table.
+
+    Returns:
+        Path: The JSON report
+    """
+    path_stem = Path(path_stem)
+    path_stem.parent.mkdir(parents=True, exist_ok=True)
+    summary = {
+        'panel': panel_name,
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'rows': int(report['observations'].iloc[0] + report['missing'].iloc[0]) if len(report) else 0,
+        'columns': len(report),
+        'passed': not failures,
+        'thresholds': dict(THRESHOLDS, **(thresholds or {})),
+        'limits': {'zscore': ZSCORE_LIMIT, 'unit_jump_factor': UNIT_JUMP_FACTOR,
+                   'max_stale_observations': MAX_STALE_OBSERVATIONS,
+                   'exchange_closure_days': EXCHANGE_CLOSURE_DAYS},
+        'failures': failures,
+        'metrics': json.loads(report.reset_index().to_json(orient='records')),
+        'missing_value_report': json.loads(pd.DataFrame(missing_value_report or []).to_json(orient='records')),
+    }
+    json_path = path_stem.with_suffix('.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    report.reset_index().to_parquet(path_stem.with_suffix('.parquet'), index=False)
+    return json_path
+
+
+def run_quality_checks(panel, path_stem, missing_value_report=None, thresholds=None, gate=True,
+                       series=None):
+    """
+    Check a panel, save the report and print a summary.
+
+    Parameters:
+        panel: DataFrame, dict of aligned single-column frames, or ColumnStore
+        path_stem (Path): Report location without suffix
+        missing_value_report (list, optional): Included in the JSON report
+        thresholds (dict, optional): Limits overriding THRESHOLDS (see column_thresholds)
+        gate (bool): Raise DataQualityError if any check fails
+        series (dict, optional): The panel's series before alignment (see check_panel)
+
+    Returns:
+        pd.DataFrame: Per-column metrics
+    """
+    report, failures = check_panel(panel, thresholds, series=series)
+    json_path = write_report(report, failures, path_stem, Path(path_stem).name, thresholds,
+                             missing_value_report)
+
+    if not failures:
+        print(f"  ✓ Data quality: all {len(report)} columns passed (report: {json_path.name})")
+    else:
+        print(f"  ❌ Data quality: {len(failures)} failed checks in "
+              f"{(~report['passed']).sum()} of {len(report)} columns (report: {json_path.name})")
+        for failure in failures:
+            print(f"    {failure['column']}: {failure['check']} = {failure['value']:g} "
+                  f"(limit {failure['limit']:g})")
+        if gate:
+            raise DataQualityError(failures, json_path)
+    return report
+
+
+def report_stem(panel_file):
+    """Report location for a panel file: results/reports/data_quality_<panel name>."""
+    return REPORTS_DIR / f"data_quality_{Path(panel_file).stem}"
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Run the data-quality checks on saved panels.")
+    parser.add_argument('panels', nargs='*', type=Path,
+                        default=[FINAL_DATA_DIR / 'merged_analysis_panel.csv'],
+                        help="panel CSV files (default: the merged monthly panel)")
+    parser.add_argument('--no-gate', action='store_true',
+                        help="exit 0 even if checks fail (the report still lists them)")
+    return parser.parse_args(argv)
+
+
+def load_series(freq):
+    """Every registry series from data/raw/, resampled to panel frequency `freq` but not aligned."""
+    # clean_and_merge imports this module, so import it only when needed
+    from clean_and_merge import load_native_datasets, resample_to_frequency
+
+    rules = series_registry.frequency_rules()
+    return {col: resample_to_frequency(df, freq, rules[col]) for col, df in load_native_datasets().items()}
+
+
+def main(argv=None):
+    """Check each panel file against the raw series and write its report."""
+    args = parse_args(argv)
+    failed = False
+    series = {}
+    for panel_file in args.panels:
+        print(f"\n{panel_file.name}")
+        panel = pd.read_csv(panel_file, index_col=0, parse_dates=True, float_precision='round_trip')
+        freq, _ = _panel_frequency(panel.index)
+        if freq not in series:
+            series[freq] = load_series(freq)
+        try:
+            run_quality_checks(panel, report_stem(panel_file), gate=not args.no_gate,
+                               series={col: s for col, s in series[freq].items() if col in panel.columns})
+        except DataQualityError:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
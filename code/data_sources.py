@@ -0,0 +1,483 @@
+"""
+Pluggable Data Sources for the Fetch Scripts
+============================================
+
+Both fetch scripts get their data through a DataSource instead of calling
+fredapi / yfinance directly, so the ingestion layer can run (and be
+benchmarked) without the live internet.
+
+Backends:
+- LiveSource:       FRED REST API over the shared pooled session (http_session.py)
+                    and Yahoo Finance via yfinance (default)
+- LocalFileSource:  Recorded responses stored as CSV files in a fixtures directory
+- ReplayHTTPSource: A local HTTP stand-in server (see stub_server.py) that
+                    replays recorded responses with configurable latency
+
+Fixtures directory layout (shared by LocalFileSource and stub_server.py):
+    <fixtures>/fred/<SERIES_ID>.csv             date,value
+    <fixtures>/fred_vintages/<SERIES_ID>.csv    date,realtime_start,value
+    <fixtures>/yahoo/<TICKER>.csv               Date,Close
+
+Selecting a backend:
+    FETCH_SOURCE=live|local|replay      (or --source on the fetch scripts)
+    FETCH_SOURCE_PATH=<dir or URL>      fixtures directory for 'local',
+                                        server URL for 'replay'
+"""
+
+import io
+import os
+from pathlib import Path
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+import requests
+from config_paths import DATA_DIR
+from http_session import get_session
+from retry_policy import request_timeout
+
+FRED_API_URL = 'https://api.stlouisfed.org/fred'
+FRED_PAGE_LIMIT = 100000  # maximum observations per FRED request
+# Widest real-time period ALFRED accepts: every vintage ever published
+REALTIME_START_ALL = '1776-07-04'
+REALTIME_END_ALL = '9999-12-31'
+DEFAULT_FIXTURES_DIR = DATA_DIR / 'fixtures'
+DEFAULT_REPLAY_URL = 'http://127.0.0.1:8765'
+SOURCE_NAMES = ('live', 'local', 'replay')
+
+
+def _date_str(value):
+    """Format a date-like value as 'YYYY-MM-DD' (None stays None)."""
+    if value is None:
+        return None
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def _fixture_name(identifier):
+    """Make a series ID or ticker safe to use as a file name (e.g. '^GSPC')."""
+    return quote(identifier, safe='')
+
+
+def _slice_dates(obj, start=None, end=None):
+    """Restrict a date-indexed Series/DataFrame to [start, end]."""
+    index = obj.index.tz_localize(None) if obj.index.tz is not None else obj.index
+    mask = np.ones(len(obj), dtype=bool)
+    if start is not None:
+        mask &= index >= pd.Timestamp(start).normalize()
+    if end is not None:
+        mask &= index <= pd.Timestamp(end)
+    return obj[mask]
+
+
+class DataSource:
+    """
+    Interface every backend implements.
+
+    get_series() mirrors fredapi.Fred.get_series, so a DataSource can be passed
+    anywhere the fetch scripts previously used a Fred client.
+    """
+
+    name = 'base'
+    rate_limited = False  # apply the FRED token bucket to requests
+
+    def get_series(self, series_id, observation_start=None, observation_end=None):
+        """
+        Get a FRED series.
+
+        Returns:
+            pd.Series: Observations indexed by date (float, NaN for missing)
+        """
+        raise NotImplementedError
+
+    def get_vintages(self, series_id, realtime_start=None, realtime_end=None):
+        """
+        Get every vintage of a FRED series (ALFRED real-time periods).
+
+        Returns:
+            pd.DataFrame: date, realtime_start, value - one row per observation
+                per real-time period in which it had that value
+        """
+        raise NotImplementedError
+
+    def get_history(self, ticker, start=None, end=None):
+        """
+        Get a Yahoo Finance daily price history.
+
+        Returns:
+            pd.DataFrame: Prices indexed by date with at least a 'Close' column
+        """
+        raise NotImplementedError
+
+    def download(self, tickers, start=None, end=None):
+        """
+        Get histories for several tickers at once.
+
+        Returns:
+            pd.DataFrame: Columns grouped by ticker (like yf.download(group_by='ticker'))
+        """
+        frames = {}
+        for ticker in tickers:
+            try:
+                frames[ticker] = self.get_history(ticker, start, end)
+            except (FileNotFoundError, ValueError):
+                continue
+        if len(frames) == 0:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def cache_key(self, kind):
+        """Response cache namespace, so other backends never pollute live entries."""
+        return kind if self.name == 'live' else f"{self.name}:{kind}"
+
+
+def _get_json(url, params, timeout):
+    """
+    GET a JSON endpoint over the shared session.
+
+    The timeout is shortened to the calling thread's deadline, if it has one
+    (see retry_policy.deadline_at).
+
+    Raises:
+        requests.HTTPError: With the API's error message and the response
+            attached (so retry_policy can read the status and Retry-After)
+    """
+    response = get_session().get(url, params=params, timeout=request_timeout(timeout))
+    if response.status_code >= 400:
+        try:
+            message = response.json().get('error_message', response.reason)
+        except ValueError:
+            message = response.reason
+        # Don't echo the request URL: it contains the API key
+        raise requests.HTTPError(f"{response.status_code} {message}", response=response)
+    return response.json()
+
+
+def _get_vintage_pages(url, params, timeout):
+    """
+    Page through a FRED observations request by real-time period (output_type=1).
+
+    Returns:
+        list: Every observation dict across all pages
+    """
+    params = dict(params, output_type=1, limit=FRED_PAGE_LIMIT, offset=0)
+    observations = []
+    while True:
+        payload = _get_json(url, params, timeout)
+        page = payload.get('observations', [])
+        observations.extend(page)
+        if len(page) == 0 or len(observations) >= int(payload.get('count', len(observations))):
+            return observations
+        params['offset'] = len(observations)
+
+
+class LiveSource(DataSource):
+    """
+    FRED REST API and Yahoo Finance (yfinance).
+
+    FRED requests use the pooled keep-alive session from http_session.py.
+    """
+
+    name = 'live'
+    rate_limited = True
+
+    def __init__(self, api_key=None, timeout=30):
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def get_series(self, series_id, observation_start=None, observation_end=None):
+        payload = _get_json(f"{FRED_API_URL}/series/observations", {
+            'series_id': series_id,
+            'observation_start': _date_str(observation_start),
+            'observation_end': _date_str(observation_end),
+            'api_key': self.api_key or os.getenv('FRED_API_KEY'),
+            'file_type': 'json',
+        }, self.timeout)
+        return parse_fred_observations(payload)
+
+    def get_vintages(self, series_id, realtime_start=None, realtime_end=None):
+        observations = _get_vintage_pages(f"{FRED_API_URL}/series/observations", {
+            'series_id': series_id,
+            'realtime_start': _date_str(realtime_start) or REALTIME_START_ALL,
+            'realtime_end': _date_str(realtime_end) or REALTIME_END_ALL,
+            'api_key': self.api_key or os.getenv('FRED_API_KEY'),
+            'file_type': 'json',
+        }, self.timeout)
+        return parse_fred_vintages({'observations': observations})
+
+    def get_history(self, ticker, start=None, end=None):
+        import yfinance as yf
+        return yf.Ticker(ticker).history(start=start, end=end, timeout=request_timeout(self.timeout))
+
+    def download(self, tickers, start=None, end=None):
+        import yfinance as yf
+        # auto_adjust matches the Ticker.history() default used by get_history
+        return yf.download(list(tickers), start=start, end=end,
+                           group_by='ticker', auto_adjust=True,
+                           progress=False, threads=True)
+
+
+class LocalFileSource(DataSource):
+    """Serves recorded responses from a fixtures directory."""
+
+    name = 'local'
+
+    def __init__(self, root=DEFAULT_FIXTURES_DIR):
+        self.root = root
+
+    def get_series(self, series_id, observation_start=None, observation_end=None):
+        path = self.root / 'fred' / f"{_fixture_name(series_id)}.csv"
+        if not path.exists():
+            raise ValueError(f"No data exists for series id: {series_id}")
+        df = pd.read_csv(path, parse_dates=['date'], float_precision='round_trip')
+        data = pd.Series(df['value'].astype(float).values, index=pd.DatetimeIndex(df['date']))
+        return _slice_dates(data, observation_start, observation_end)
+
+    def get_vintages(self, series_id, realtime_start=None, realtime_end=None):
+        path = self.root / 'fred_vintages' / f"{_fixture_name(series_id)}.csv"
+        if not path.exists():
+            raise ValueError(f"No vintage data exists for series id: {series_id}")
+        df = pd.read_csv(path, parse_dates=['date', 'realtime_start'], float_precision='round_trip')
+        return _slice_realtime(df, realtime_start, realtime_end)
+
+    def get_history(self, ticker, start=None, end=None):
+        path = self.root / 'yahoo' / f"{_fixture_name(ticker)}.csv"
+        if not path.exists():
+            raise ValueError(f"No data found for {ticker}")
+        df = pd.read_csv(path, parse_dates=['Date'], float_precision='round_trip')
+        df = df.set_index('Date')
+        return _slice_dates(df, start, end)
+
+
+class ReplayHTTPSource(DataSource):
+    """
+    Client for the local stand-in server in stub_server.py.
+
+    The FRED endpoint speaks the real API's JSON format
+    (/fred/series/observations?series_id=...&file_type=json).
+    """
+
+    name = 'replay'
+
+    def __init__(self, base_url=DEFAULT_REPLAY_URL, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def get_series(self, series_id, observation_start=None, observation_end=None):
+        payload = _get_json(f"{self.base_url}/fred/series/observations", {
+            'series_id': series_id,
+            'observation_start': _date_str(observation_start),
+            'observation_end': _date_str(observation_end),
+            'file_type': 'json',
+        }, self.timeout)
+        return parse_fred_observations(payload)
+
+    def get_vintages(self, series_id, realtime_start=None, realtime_end=None):
+        observations = _get_vintage_pages(f"{self.base_url}/fred/series/observations", {
+            'series_id': series_id,
+            'realtime_start': _date_str(realtime_start) or REALTIME_START_ALL,
+            'realtime_end': _date_str(realtime_end) or REALTIME_END_ALL,
+            'file_type': 'json',
+        }, self.timeout)
+        return parse_fred_vintages({'observations': observations})
+
+    def get_history(self, ticker, start=None, end=None):
+        response = get_session().get(f"{self.base_url}/yahoo/history", params={
+            'ticker': ticker,
+            'start': _date_str(start),
+            'end': _date_str(end),
+        }, timeout=request_timeout(self.timeout))
+        response.raise_for_status()
+        df = pd.read_csv(io.BytesIO(response.content), parse_dates=['Date'], float_precision='round_trip')
+        return df.set_index('Date')
+
+
+def parse_fred_observations(payload):
+    """
+    Convert a FRED series/observations JSON payload to a pd.Series.
+
+    Parameters:
+        payload (dict): Decoded JSON with an 'observations' list
+
+    Returns:
+        pd.Series: Values indexed by date, '.' (FRED's missing marker) as NaN
+    """
+    observations = payload.get('observations', [])
+    dates = pd.to_datetime([obs['date'] for obs in observations], format='%Y-%m-%d')
+    values = pd.to_numeric(pd.Series([obs['value'] for obs in observations], dtype=object),
+                           errors='coerce').astype(float)
+    return pd.Series(values.values, index=dates)
+
+
+def parse_fred_vintages(payload):
+    """
+    Convert a FRED observations payload requested by real-time period to a DataFrame.
+
+    Parameters:
+        payload (dict): Decoded JSON whose observations carry realtime_start
+
+    Returns:
+        pd.DataFrame: date, realtime_start, value sorted by (date, realtime_start)
+    """
+    observations = payload.get('observations', [])
+    df = pd.DataFrame({
+        'date': pd.to_datetime([obs['date'] for obs in observations], format='%Y-%m-%d'),
+        'realtime_start': pd.to_datetime([obs['realtime_start'] for obs in observations], format='%Y-%m-%d'),
+        'value': pd.to_numeric(pd.Series([obs['value'] for obs in observations], dtype=object),
+                               errors='coerce').astype(float).values,
+    })
+    return df.sort_values(['date', 'realtime_start'], kind='stable').reset_index(drop=True)
+
+
+def _slice_realtime(df, realtime_start=None, realtime_end=None):
+    """
+    Restrict a vintage table to real-time periods overlapping [realtime_start, realtime_end].
+
+    The row in effect at realtime_start (the last one starting on or before it)
+    is kept for each date, so the window's first vintage is complete.
+    """
+    if _date_str(realtime_end) == REALTIME_END_ALL:
+        realtime_end = None
+    if _date_str(realtime_start) == REALTIME_START_ALL:
+        realtime_start = None
+    if realtime_end is not None:
+        df = df[df['realtime_start'] <= pd.Timestamp(realtime_end)]
+    if realtime_start is not None:
+        start = pd.Timestamp(realtime_start)
+        before = df[df['realtime_start'] <= start].drop_duplicates('date', keep='last')
+        df = pd.concat([before, df[df['realtime_start'] > start]])
+        df = df.sort_values(['date', 'realtime_start'], kind='stable')
+    return df.reset_index(drop=True)
+
+
+def cache_namespace(source, kind):
+    """Response cache namespace for a source (plain Fred clients count as live)."""
+    if hasattr(source, 'cache_key'):
+        return source.cache_key(kind)
+    return kind
+
+
+def get_source(name=None, path=None, api_key=None):
+    """
+    Create a data source backend.
+
+    Parameters:
+        name (str, optional): 'live', 'local' or 'replay' (default: FETCH_SOURCE or 'live')
+        path (str, optional): Fixtures directory or server URL (default: FETCH_SOURCE_PATH)
+        api_key (str, optional): FRED API key for the live backend
+
+    Returns:
+        DataSource: The selected backend
+    """
+    name = name or os.getenv('FETCH_SOURCE', 'live')
+    path = path or os.getenv('FETCH_SOURCE_PATH')
+
+    if name == 'live':
+        return LiveSource(api_key=api_key)
+    if name == 'local':
+        return LocalFileSource(Path(path) if path else DEFAULT_FIXTURES_DIR)
+    if name == 'replay':
+        return ReplayHTTPSource(path or DEFAULT_REPLAY_URL)
+    raise ValueError(f"Unknown data source: {name} (expected one of {', '.join(SOURCE_NAMES)})")
+
+
+# ==============================================================================
+# FIXTURE RECORDING
+# ==============================================================================
+
+def _write_fixture(path, df, keys, merge):
+    """
+    Write a fixture CSV, optionally merged into the one already there.
+
+    With `merge`, rows of the existing file whose `keys` also appear in `df`
+    are replaced and the rest kept, so recording an incremental fetch extends
+    the fixture instead of truncating it to the fetched slice.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if merge and path.exists():
+        existing = pd.read_csv(path, parse_dates=keys, float_precision='round_trip')
+        df = (pd.concat([existing, df], ignore_index=True)
+              .drop_duplicates(subset=keys, keep='last')
+              .sort_values(keys))
+    df.to_csv(path, index=False)
+
+
+def write_fixture_series(root, series_id, data, merge=False):
+    """Save a FRED series in the fixtures layout (merged into the existing fixture if `merge`)."""
+    path = root / 'fred' / f"{_fixture_name(series_id)}.csv"
+    _write_fixture(path, pd.DataFrame({'date': data.index, 'value': data.values}), ['date'], merge)
+
+
+def write_fixture_vintages(root, series_id, vintages, merge=False):
+    """Save a FRED vintage table in the fixtures layout (merged into the existing fixture if `merge`)."""
+    path = root / 'fred_vintages' / f"{_fixture_name(series_id)}.csv"
+    _write_fixture(path, vintages[['date', 'realtime_start', 'value']], ['date', 'realtime_start'], merge)
+
+
+def write_fixture_history(root, ticker, history, merge=False):
+    """Save a Yahoo Finance price history in the fixtures layout (merged into the existing fixture if `merge`)."""
+    path = root / 'yahoo' / f"{_fixture_name(ticker)}.csv"
+    df = history[['Close']].copy()
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    _write_fixture(path, df.rename_axis('Date').reset_index(), ['Date'], merge)
+
+
+class RecordingSource(DataSource):
+    """
+    Wraps another source and records every response into a fixtures directory.
+
+    Responses are merged into existing fixtures, so recording an incremental
+    fetch (a short recent slice) keeps the history recorded before it.
+    """
+
+    def __init__(self, inner, root=DEFAULT_FIXTURES_DIR):
+        self.inner = inner
+        self.root = root
+        self.name = inner.name
+        self.rate_limited = inner.rate_limited
+
+    def get_series(self, series_id, observation_start=None, observation_end=None):
+        data = self.inner.get_series(series_id, observation_start, observation_end)
+        write_fixture_series(self.root, series_id, data, merge=True)
+        return data
+
+    def get_vintages(self, series_id, realtime_start=None, realtime_end=None):
+        vintages = self.inner.get_vintages(series_id, realtime_start, realtime_end)
+        write_fixture_vintages(self.root, series_id, vintages, merge=True)
+        return vintages
+
+    def get_history(self, ticker, start=None, end=None):
+        history = self.inner.get_history(ticker, start, end)
+        write_fixture_history(self.root, ticker, history, merge=True)
+        return history
+
+    def download(self, tickers, start=None, end=None):
+        raw = self.inner.download(tickers, start, end)
+        if not raw.empty:
+            for ticker in set(raw.columns.get_level_values(0)):
+                write_fixture_history(self.root, ticker, raw[ticker].dropna(subset=['Close']), merge=True)
+        return raw
+
+
+def generate_synthetic_fixtures(root, n_series, start='2001-01-01', end=None, seed=0):
+    """
+    Write random-walk daily FRED fixtures for load testing.
+
+    Parameters:
+        root (Path): Fixtures directory
+        n_series (int): Number of series to create (IDs SYN0001, SYN0002, ...)
+        start (str): First observation date
+        end (str, optional): Last observation date (default: today)
+        seed (int): Random seed, so runs are reproducible
+
+    Returns:
+        list: Generated series IDs
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, end or pd.Timestamp.today().normalize())
+    series_ids = []
+    for i in range(1, n_series + 1):
+        series_id = f"SYN{i:04d}"
+        values = 100 + np.cumsum(rng.normal(0, 1, len(dates)))
+        write_fixture_series(root, series_id, pd.Series(values.round(4), index=dates))
+        series_ids.append(series_id)
+    return series_ids
@@ -24,90 +24,60 @@ Data series included:
 Note: S&P 500 and Bitcoin are fetched from Yahoo Finance (see fetch_asset_prices.py)
 
 Setup:
-    1. Ensure libraries are installed: pip install fredapi pandas python-dotenv
+    1. Ensure libraries are installed: pip install requests pandas python-dotenv
     2. API key should be in .env file
     3. Run: python code/fetch_all_economic_data.py
+
+Options:
+    --workers N     Number of series fetched concurrently (default: 4, 1 = sequential)
+    --timeout S     Seconds allowed per series before it is reported as failed (default: 60)
+    --incremental   Only fetch observations after the last date already saved in
+                    data/raw/ (minus --overlap-days, to pick up revisions) and
+                    merge them into the existing files
+    --overlap-days  Days re-fetched before the last saved date in incremental mode (default: 90)
+    --offline       Serve every series from the local response cache (no network, no API key)
+    --cache         Also cache live responses (default: only local/replay sources)
+    --no-cache      Bypass the local response cache
+    --cache-ttl S   Seconds a cached response stays fresh (default: 43200)
+    --source NAME   Data source backend: live (default), local or replay (see data_sources.py)
+    --source-path P Fixtures directory (local) or stand-in server URL (replay)
+    --record        Also save every live response to data/fixtures/ for later replay
+    --max-retries N Retries per series for 429/5xx/timeouts, with jittered
+                    exponential backoff (default: 4). Requests are rate limited
+                    to FRED's 120 requests/minute (see retry_policy.py).
+    --pool-size N   Keep-alive connections in the shared HTTP pool
+                    (default: max(workers, 16); see http_session.py)
+    --raw-format F  Storage format for data/raw/: csv (default), parquet or feather
+    --raw-compression C
+                    Codec for parquet/feather files (see raw_storage.py)
 """
 
 import os
 import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import pandas as pd
-from fredapi import Fred
 from config_paths import RAW_DATA_DIR
+from response_cache import get_cache, configure_cache
+from data_sources import SOURCE_NAMES, get_source, cache_namespace, RecordingSource
+from retry_policy import call_with_retry, configure_retries, deadline_at, fred_rate_limiter
+from http_session import DEFAULT_POOL_SIZE, configure_session, print_connection_stats
+from series_registry import fred_series_config
+from raw_storage import RAW_FORMATS, configure_storage, read_raw, write_raw, raw_exists, last_saved_date
+from metrics import instrumented
+from manifest import get_manifest
 
-# Dictionary of FRED series IDs and their descriptions
-SERIES_CONFIG = {
-    'M1SL': {
-        'name': 'M1 Money Stock',
-        'filename': 'M1.csv',
-        'column': 'm1_billions'
-    },
-    'M2SL': {
-        'name': 'M2 Money Stock',
-        'filename': 'M2.csv',
-        'column': 'm2_billions'
-    },
-    'DFF': {
-        'name': 'Federal Funds Rate',
-        'filename': 'federal_funds_rate.csv',
-        'column': 'rate_percent'
-    },
-    'REAINTRATREARAT10Y': {
-        'name': '10-Year Real Interest Rate',
-        'filename': 'real_interest_rate_10y.csv',
-        'column': 'real_rate_percent'
-    },
-    'T10Y2Y': {
-        'name': '10Y-2Y Treasury Yield Spread',
-        'filename': 'yield_curve_slope.csv',
-        'column': 'spread_percent'
-    },
-    'PCE': {
-        'name': 'Personal Consumption Expenditures Price Index',
-        'filename': 'pce.csv',
-        'column': 'pce_index'
-    },
-    'MEDCPIM158SFRBCLE': {
-        'name': 'Median Consumer Price Index',
-        'filename': 'cpi.csv',
-        'column': 'cpi_index'
-    },
-    'GDP': {
-        'name': 'Gross Domestic Product',
-        'filename': 'gdp.csv',
-        'column': 'gdp_billions'
-    },
-    'UNRATE': {
-        'name': 'Unemployment Rate',
-        'filename': 'unemployment_rate.csv',
-        'column': 'rate_percent'
-    },
-    'CSUSHPISA': {
-        'name': 'Case-Shiller U.S. National Home Price Index',
-        'filename': 'home_price_index.csv',
-        'column': 'index_value'
-    },
-    'VIXCLS': {
-        'name': 'CBOE Volatility Index (VIX)',
-        'filename': 'vix.csv',
-        'column': 'vix_index'
-    },
-    'USEPUINDXD': {
-        'name': 'US Economic Policy Uncertainty Index',
-        'filename': 'epu_index.csv',
-        'column': 'epu_index'
-    },
-    'BAMLC0A4CBBB': {
-        'name': 'ICE BofA BBB Corporate Bond Spread',
-        'filename': 'bbb_spread.csv',
-        'column': 'spread_percent'
-    },
-    'UMCSENT': {
-        'name': 'University of Michigan Consumer Sentiment',
-        'filename': 'consumer_sentiment.csv',
-        'column': 'sentiment_index'
-    }
-}
+# FRED series IDs and their descriptions (defined in series_registry.py)
+SERIES_CONFIG = fred_series_config()
+
+# Concurrency defaults for fetch_all_series
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_TIMEOUT = 60  # seconds per series
+
+# Incremental refresh: re-fetch this many days before the last saved date so
+# revised observations (e.g. GDP, PCE) are picked up
+DEFAULT_OVERLAP_DAYS = 90
 
 
 def get_api_key():
@@ -148,33 +118,165 @@ def get_api_key():
     return api_key
 
 
-def fetch_series(fred, series_id, series_name, start_date=None, end_date=None):
+@instrumented(labels=('series_id',))
+def fetch_series(source, series_id, series_name, start_date=None, end_date=None,
+                 verbose=True, raise_errors=False):
     """
     Fetch a single series from FRED.
     
+    Transient failures (rate limiting, server errors, timeouts) are retried
+    with backoff; requests to the live API go through the shared FRED rate
+    limiter.
+    
     Parameters:
-        fred: Fred API client
+        source: Data source (see data_sources.py) or Fred API client
         series_id (str): FRED series ID
         series_name (str): Human-readable name
         start_date (str, optional): Start date
         end_date (str, optional): End date
+        verbose (bool): Print progress messages
+        raise_errors (bool): Re-raise fetch errors instead of returning None
     
     Returns:
         pd.Series: Time series data
     """
-    print(f"  Fetching {series_name} ({series_id})...")
+    if verbose:
+        print(f"  Fetching {series_name} ({series_id})...")
     try:
-        data = fred.get_series(series_id, 
-                              observation_start=start_date,
-                              observation_end=end_date)
-        print(f"    ✓ {len(data)} observations")
+        limiter = fred_rate_limiter() if getattr(source, 'rate_limited', True) else None
+        data = get_cache().fetch(
+            cache_namespace(source, 'fred'), series_id, start_date, end_date,
+            lambda: call_with_retry(
+                lambda: source.get_series(series_id,
+                                          observation_start=start_date,
+                                          observation_end=end_date),
+                limiter=limiter, description=series_id))
+        if verbose:
+            print(f"    ✓ {len(data)} observations")
         return data
     except Exception as e:
-        print(f"    ❌ Error: {str(e)}")
+        if raise_errors:
+            raise
+        if verbose:
+            print(f"    ❌ Error: {str(e)}")
         return None
 
 
-def save_series(data, filename, column_name):
+def fetch_all_series(source, series_config, max_workers=DEFAULT_MAX_WORKERS,
+                     timeout=DEFAULT_TIMEOUT, start_date=None, end_date=None,
+                     start_dates=None, verbose=True):
+    """
+    Fetch several FRED series concurrently using a bounded worker pool.
+    
+    Each series gets its own timeout, counted from the moment a worker starts
+    on it. Results are returned in series_config order regardless of the
+    order in which requests complete.
+    
+    Parameters:
+        source: Data source (see data_sources.py) or Fred API client
+        series_config (dict): Mapping of series ID to config (see SERIES_CONFIG)
+        max_workers (int): Maximum number of concurrent requests
+        timeout (float): Seconds allowed per series
+        start_date (str, optional): Start date
+        end_date (str, optional): End date
+        start_dates (dict, optional): Per-series start dates, overriding start_date
+        verbose (bool): Print a result line per series
+    
+    Returns:
+        tuple: (dict, dict) - Series ID to pd.Series for successful fetches,
+               and series ID to error message for failed ones
+    """
+    started = {}
+    start_dates = start_dates or {}
+
+    def run(series_id, config):
+        started[series_id] = time.monotonic()
+        # Stop retrying (and cut request timeouts) once the series times out
+        with deadline_at(started[series_id] + timeout):
+            return fetch_series(source, series_id, config['name'],
+                                start_dates.get(series_id, start_date), end_date,
+                                verbose=False, raise_errors=True)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    futures = {
+        series_id: executor.submit(run, series_id, config)
+        for series_id, config in series_config.items()
+    }
+    outcomes = {}
+    pending = dict(futures)
+
+    while pending:
+        wait(pending.values(), timeout=0.1, return_when=FIRST_COMPLETED)
+        now = time.monotonic()
+        for series_id, future in list(pending.items()):
+            if future.done():
+                try:
+                    outcomes[series_id] = (future.result(), None)
+                except Exception as e:
+                    outcomes[series_id] = (None, str(e))
+            elif series_id in started and now - started[series_id] > timeout:
+                outcomes[series_id] = (None, f"Timed out after {timeout:g}s")
+            else:
+                continue
+            del pending[series_id]
+
+    # Timed-out workers stop at their deadline; don't block on them
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    errors = {}
+    for series_id, config in series_config.items():
+        data, error = outcomes[series_id]
+        if error is None and (data is None or len(data) == 0):
+            error = "No observations returned"
+        if error is None:
+            if verbose:
+                print(f"  ✓ {config['name']} ({series_id}): {len(data)} observations")
+            results[series_id] = data
+        else:
+            if verbose:
+                print(f"  ❌ {config['name']} ({series_id}): {error}")
+            errors[series_id] = error
+
+    return results, errors
+
+
+def read_last_saved_date(filename):
+    """
+    Get the last observation date already stored in a raw data file.
+    
+    Parameters:
+        filename (str): Raw data filename
+    
+    Returns:
+        pd.Timestamp: Last saved date, or None if the file doesn't exist or is empty
+    """
+    return last_saved_date(filename)
+
+
+def incremental_start_dates(series_config, overlap_days=DEFAULT_OVERLAP_DAYS):
+    """
+    Work out the observation_start for each series in incremental mode.
+    
+    Series without a saved file are left out, so they fall back to a full fetch.
+    
+    Parameters:
+        series_config (dict): Mapping of series ID to config (see SERIES_CONFIG)
+        overlap_days (int): Days to re-fetch before the last saved date
+    
+    Returns:
+        dict: Series ID to start date string ('YYYY-MM-DD')
+    """
+    start_dates = {}
+    for series_id, config in series_config.items():
+        last_date = read_last_saved_date(config['filename'])
+        if last_date is not None:
+            start = last_date - pd.Timedelta(days=overlap_days)
+            start_dates[series_id] = start.strftime('%Y-%m-%d')
+    return start_dates
+
+
+def save_series(data, filename, column_name, append=False):
     """
     Save series data to CSV.
     
@@ -182,6 +284,12 @@ def save_series(data, filename, column_name):
         data (pd.Series): Time series data
         filename (str): Output filename
         column_name (str): Name for the data column
+        append (bool): Merge into the existing file instead of overwriting it.
+            Fetched observations replace saved ones on the same date, so
+            revisions inside the overlap window are applied.
+    
+    Returns:
+        bool: True if the file was written
     """
     if data is None or len(data) == 0:
         return False
@@ -191,48 +299,121 @@ def save_series(data, filename, column_name):
         column_name: data.values
     }).reset_index(drop=True)
     
-    output_path = RAW_DATA_DIR / filename
-    df.to_csv(output_path, index=False)
+    if append and raw_exists(filename):
+        existing = read_raw(filename)
+        df['date'] = pd.to_datetime(df['date'])
+        df = (
+            pd.concat([existing, df], ignore_index=True)
+            .drop_duplicates(subset='date', keep='last')
+            .sort_values('date')
+            .reset_index(drop=True)
+        )
+
+    write_raw(df, filename)
     return True
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Fetch economic data series from FRED.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help="number of series fetched concurrently (1 = sequential)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds allowed per series")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only fetch observations after the last saved date and merge them in")
+    parser.add_argument('--overlap-days', type=int, default=DEFAULT_OVERLAP_DAYS,
+                        help="days re-fetched before the last saved date in incremental mode")
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help="serve every series from the local response cache")
+    parser.add_argument('--cache', dest='cache', action='store_true', default=None,
+                        help="cache live responses too (default: only local/replay sources)")
+    parser.add_argument('--no-cache', dest='cache', action='store_false', default=None,
+                        help="bypass the local response cache")
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help="seconds a cached response stays fresh")
+    parser.add_argument('--source', choices=SOURCE_NAMES, default=None,
+                        help="data source backend (default: FETCH_SOURCE or live)")
+    parser.add_argument('--source-path', default=None,
+                        help="fixtures directory (local) or stand-in server URL (replay)")
+    parser.add_argument('--record', action='store_true',
+                        help="save every response to data/fixtures/ for later replay")
+    parser.add_argument('--max-retries', type=int, default=None,
+                        help="retries per series for 429/5xx/timeouts (default: 4)")
+    parser.add_argument('--pool-size', type=int, default=None,
+                        help="keep-alive connections in the shared HTTP pool")
+    parser.add_argument('--raw-format', choices=list(RAW_FORMATS), default=None,
+                        help="storage format for data/raw/ (default: RAW_FORMAT or csv)")
+    parser.add_argument('--raw-compression', default=None,
+                        help="codec for parquet/feather raw files")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main execution function."""
+    args = parse_args(argv)
+
     print("\n" + "=" * 70)
     print("FRED Economic Data Fetcher")
     print("=" * 70)
     print(f"\nFetching {len(SERIES_CONFIG)} economic data series...\n")
     
     try:
-        # Get API key
-        api_key = get_api_key()
+        cache = configure_cache(offline=args.offline, enabled=args.cache, ttl=args.cache_ttl)
+        if args.max_retries is not None:
+            configure_retries(max_attempts=args.max_retries + 1)
+        configure_session(pool_size=args.pool_size or max(args.workers, DEFAULT_POOL_SIZE))
+        configure_storage(args.raw_format, args.raw_compression)
+        
+        source = get_source(args.source, args.source_path)
+        if cache.offline:
+            print("\nOffline mode: serving all series from the response cache")
+        elif source.name == 'live':
+            # Get API key
+            source.api_key = get_api_key()
+            print("\nConnecting to FRED API...")
+        else:
+            print(f"\nUsing {source.name} data source")
+        if args.record:
+            source = RecordingSource(source)
         
-        # Initialize FRED client
-        print("\nConnecting to FRED API...")
-        fred = Fred(api_key=api_key)
+        start_dates = {}
+        if args.incremental:
+            start_dates = incremental_start_dates(SERIES_CONFIG, args.overlap_days)
+            print(f"\nIncremental mode: {len(start_dates)}/{len(SERIES_CONFIG)} series have saved data "
+                  f"(overlap: {args.overlap_days} days)")
         
         # Fetch all series
-        print("\nFetching data series:")
-        results = {}
-        for series_id, config in SERIES_CONFIG.items():
-            data = fetch_series(fred, series_id, config['name'])
-            if data is not None:
-                results[series_id] = data
+        print(f"\nFetching data series ({args.workers} workers):")
+        results, errors = fetch_all_series(source, SERIES_CONFIG,
+                                           max_workers=args.workers,
+                                           timeout=args.timeout,
+                                           start_dates=start_dates)
         
         # Save all series
         print("\nSaving data to files:")
         success_count = 0
         for series_id, data in results.items():
             config = SERIES_CONFIG[series_id]
-            if save_series(data, config['filename'], config['column']):
+            if save_series(data, config['filename'], config['column'],
+                           append=series_id in start_dates):
                 print(f"  ✓ {config['filename']}")
                 success_count += 1
+        get_manifest().flush()
+        
+        if errors:
+            print("\n❌ Failed series:")
+            for series_id, error in errors.items():
+                print(f"  • {SERIES_CONFIG[series_id]['name']} ({series_id}): {error}")
+        
+        print()
+        print_connection_stats()
         
         print("\n" + "=" * 70)
         print(f"✓ SUCCESS! {success_count}/{len(SERIES_CONFIG)} series saved to data/raw/")
         print("=" * 70 + "\n")
         
-        return 0
+        return 0 if not errors else 1
         
     except Exception as e:
         print(f"\n❌ ERROR: {str(e)}\n", file=sys.stderr)
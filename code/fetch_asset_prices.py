@@ -15,87 +15,231 @@ Yahoo Finance provides free historical daily prices with extensive history.
 Setup:
     1. Install libraries: pip install yfinance pandas
     2. Run: python code/fetch_asset_prices.py
+
+By default only bars after the last date already saved in data/raw/ (minus a
+small overlap) are fetched and appended to the existing files.
+
+Options:
+    --batch         Download every ticker in ASSET_CONFIG in one bulk request
+                    and split the result into the per-ticker CSVs
+    --full-history  Re-download the full history and overwrite the saved files
+    --overlap-days  Days re-fetched before the last saved date (default: 7)
+    --offline       Serve every ticker from the local response cache (no network)
+    --cache         Also cache live responses (default: only local/replay sources)
+    --no-cache      Bypass the local response cache
+    --cache-ttl S   Seconds a cached response stays fresh (default: 43200)
+    --source NAME   Data source backend: live (default), local or replay (see data_sources.py)
+    --source-path P Fixtures directory (local) or stand-in server URL (replay)
+    --record        Also save every live response to data/fixtures/ for later replay
+    --max-retries N Retries per request for 429/5xx/timeouts, with jittered
+                    exponential backoff (default: 4)
+    --raw-format F  Storage format for data/raw/: csv (default), parquet or feather
+    --raw-compression C
+                    Codec for parquet/feather files (see raw_storage.py)
 """
 
 import sys
+import argparse
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 from config_paths import RAW_DATA_DIR
+from response_cache import get_cache, configure_cache
+from data_sources import SOURCE_NAMES, get_source, cache_namespace, RecordingSource
+from retry_policy import call_with_retry, configure_retries
+from http_session import print_connection_stats
+from series_registry import asset_config
+from raw_storage import RAW_FORMATS, configure_storage, read_raw, write_raw, raw_exists, last_saved_date
+from metrics import instrumented
+from manifest import get_manifest
+
+
+# Yahoo Finance tickers and their configurations (defined in series_registry.py)
+ASSET_CONFIG = asset_config()
+
+# Incremental refresh: re-fetch this many days before the last saved date
+DEFAULT_OVERLAP_DAYS = 7
+
+
+def cache_start(start_date, years):
+    """
+    Response cache key start for a request from `start_date` (or `years` back) to today.
+
+    Entries are keyed by what was requested, with an open end, rather than by
+    dates computed from the clock, so an --offline run on a later day still
+    finds the entry a live run stored.
+    """
+    return start_date if start_date is not None else f"last {years}y"
+
+
+def read_last_saved_date(filename):
+    """
+    Get the last date stored in a raw asset file.
+    
+    CSV files are read from the end, so only the final line is parsed.
+    
+    Parameters:
+        filename (str): Raw data filename
+    
+    Returns:
+        pd.Timestamp: Last saved date, or None if the file doesn't exist or has no rows
+    """
+    return last_saved_date(filename)
+
+
+def incremental_start_date(filename, overlap_days=DEFAULT_OVERLAP_DAYS):
+    """
+    Work out the fetch start date for an incremental refresh.
+    
+    Parameters:
+        filename (str): Raw data filename
+        overlap_days (int): Days to re-fetch before the last saved date
+    
+    Returns:
+        datetime: Start date, or None if nothing is saved yet (full fetch needed)
+    """
+    last_date = read_last_saved_date(filename)
+    if last_date is None:
+        return None
+    return (last_date - pd.Timedelta(days=overlap_days)).to_pydatetime()
 
 
-# Dictionary of Yahoo Finance tickers and their configurations
-ASSET_CONFIG = {
-    '^GSPC': {
-        'name': 'S&P 500 Index',
-        'filename': 'sp500.csv',
-        'column': 'sp500_index',
-        'years': 25  # Fetch 25 years of history
-    },
-    'GC=F': {
-        'name': 'Gold Futures (Continuous Contract)',
-        'filename': 'gold_price.csv',
-        'column': 'gold_price_usd',
-        'years': 25  # Fetch 25 years of history
-    },
-    'BTC-USD': {
-        'name': 'Bitcoin Price',
-        'filename': 'bitcoin_price.csv',
-        'column': 'bitcoin_price_usd',
-        'years': 25  # Will get all available data (Bitcoin started ~2014)
-    }
-}
-
-
-def fetch_asset_data(ticker, years=25):
+@instrumented(labels=('ticker',))
+def fetch_asset_data(ticker, years=25, start_date=None, source=None, verbose=True):
     """
     Fetch asset price data from Yahoo Finance.
     
     Parameters:
         ticker (str): Yahoo Finance ticker symbol
         years (int): Number of years of historical data to fetch
+        start_date (datetime, optional): Fetch from this date instead of
+            going back `years` years
+        source (DataSource, optional): Data source backend (default: get_source())
+        verbose (bool): Print progress messages
     
     Returns:
         pd.DataFrame: Asset price data with date and price columns
     """
-    print(f"\n  Fetching {ticker}...")
+    if verbose:
+        print(f"\n  Fetching {ticker}...")
     
     # Calculate date range
+    key_start = cache_start(start_date, years)
     end_date = datetime.now()
-    start_date = end_date - timedelta(days=years*365 + years//4)  # Account for leap years
+    if start_date is None:
+        start_date = end_date - timedelta(days=years*365 + years//4)  # Account for leap years
+    
+    source = source or get_source()
     
     try:
-        # Create ticker object
-        asset = yf.Ticker(ticker)
-        
-        # Fetch historical data
-        df = asset.history(start=start_date, end=end_date)
-        
-        if df.empty:
-            raise RuntimeError(f"No data returned for {ticker}")
-        
-        # Clean and prepare data
-        df = df.reset_index()
-        df = df[['Date', 'Close']].copy()
-        df.columns = ['date', 'price']
-        
-        # Remove timezone info for consistency
-        df['date'] = pd.to_datetime(df['date']).dt.tz_localize(None)
+        # Fetch historical data (served from the response cache when fresh)
+        df = get_cache().fetch(
+            cache_namespace(source, 'yahoo'), ticker, key_start, None,
+            lambda: call_with_retry(
+                lambda: source.get_history(ticker, start=start_date, end=end_date),
+                description=ticker))
         
-        # Sort by date
-        df = df.sort_values('date').reset_index(drop=True)
+        return prepare_price_data(df, ticker, verbose=verbose)
         
+    except Exception as e:
+        raise RuntimeError(f"Failed to fetch {ticker}: {str(e)}")
+
+
+def prepare_price_data(history, ticker, verbose=True):
+    """
+    Convert a Yahoo Finance price history into a date/price dataframe.
+    
+    Parameters:
+        history (pd.DataFrame): OHLC history indexed by date
+        ticker (str): Yahoo Finance ticker symbol (for messages)
+        verbose (bool): Print a summary of the fetched data
+    
+    Returns:
+        pd.DataFrame: Asset price data with date and price columns
+    """
+    if history.empty:
+        raise RuntimeError(f"No data returned for {ticker}")
+    
+    # Clean and prepare data
+    df = history.rename_axis('Date').reset_index()
+    df = df[['Date', 'Close']].copy()
+    df.columns = ['date', 'price']
+    
+    # Batched downloads include dates where only other tickers traded
+    df = df.dropna(subset=['price'])
+    if df.empty:
+        raise RuntimeError(f"No data returned for {ticker}")
+    
+    # Remove timezone info for consistency
+    df['date'] = pd.to_datetime(df['date'])
+    if df['date'].dt.tz is not None:
+        df['date'] = df['date'].dt.tz_localize(None)
+    
+    # Sort by date
+    df = df.sort_values('date').reset_index(drop=True)
+    
+    if verbose:
         print(f"    ✓ Fetched {len(df)} observations")
         print(f"      Range: {df['date'].min().date()} to {df['date'].max().date()}")
         print(f"      Latest price: ${df['price'].iloc[-1]:,.2f}")
-        
-        return df
-        
-    except Exception as e:
-        raise RuntimeError(f"Failed to fetch {ticker}: {str(e)}")
+    
+    return df
+
+
+def fetch_assets_batched(tickers, years=25, start_dates=None, source=None):
+    """
+    Fetch price data for several tickers in one bulk Yahoo Finance request.
+    
+    The request covers the earliest start needed by any ticker; each ticker's
+    frame is then trimmed back to its own start date.
+    
+    Parameters:
+        tickers (list): Yahoo Finance ticker symbols
+        years (int): Number of years of historical data to fetch
+        start_dates (dict, optional): Ticker to incremental start date; tickers
+            missing from it get the full `years` of history
+        source (DataSource, optional): Data source backend (default: get_source())
+    
+    Returns:
+        tuple: (dict, dict) - Ticker to price dataframe (same shape as
+               fetch_asset_data) for successful tickers, and ticker to error
+               message for failed ones
+    """
+    tickers = list(tickers)
+    print(f"\n  Fetching {len(tickers)} tickers in one batch: {', '.join(tickers)}...")
+    
+    # Calculate date range
+    requested = [(start_dates or {}).get(ticker) for ticker in tickers]
+    key_start = cache_start(min(requested) if None not in requested else None, years)
+    end_date = datetime.now()
+    full_start = end_date - timedelta(days=years*365 + years//4)  # Account for leap years
+    start_dates = {ticker: start or full_start for ticker, start in zip(tickers, requested)}
+    start_date = min(start_dates.values())
+    
+    source = source or get_source()
+    raw = get_cache().fetch(
+        cache_namespace(source, 'yahoo-batch'), ','.join(tickers), key_start, None,
+        lambda: call_with_retry(
+            lambda: source.download(tickers, start=start_date, end=end_date),
+            description='batch download'))
+    
+    frames = {}
+    errors = {}
+    available = set(raw.columns.get_level_values(0)) if not raw.empty else set()
+    for ticker in tickers:
+        print(f"\n  {ticker}:")
+        try:
+            if ticker not in available:
+                raise RuntimeError(f"No data returned for {ticker}")
+            history = raw[ticker]
+            history = history[history.index >= pd.Timestamp(start_dates[ticker]).normalize()]
+            frames[ticker] = prepare_price_data(history, ticker)
+        except Exception as e:
+            errors[ticker] = str(e)
+    
+    return frames, errors
 
 
-def save_asset_data(df, filename, column_name):
+def save_asset_data(df, filename, column_name, append=False, verbose=True):
     """
     Save asset price data to raw data directory.
     
@@ -103,19 +247,44 @@ def save_asset_data(df, filename, column_name):
         df (pd.DataFrame): Asset price data
         filename (str): Output filename
         column_name (str): Name for the price column
+        append (bool): Merge into the existing file instead of overwriting it;
+            fetched bars replace saved ones on the same date
+        verbose (bool): Print where the data was saved
     """
     # Rename price column to specific asset name
     df = df.rename(columns={'price': column_name})
     
-    output_path = RAW_DATA_DIR / filename
-    df.to_csv(output_path, index=False)
-    print(f"    ✓ Saved to: {output_path.name}")
+    if append and raw_exists(filename):
+        existing = read_raw(filename)
+        n_existing = len(existing)
+        df = (
+            pd.concat([existing, df], ignore_index=True)
+            .drop_duplicates(subset='date', keep='last')
+            .sort_values('date')
+            .reset_index(drop=True)
+        )
+        output_path = write_raw(df, filename)
+        if verbose:
+            print(f"    ✓ Appended {len(df) - n_existing} new rows to: {output_path.name}")
+        return
+
+    output_path = write_raw(df, filename)
+    if verbose:
+        print(f"    ✓ Saved to: {output_path.name}")
 
 
-def fetch_all_assets():
+def fetch_all_assets(batch=False, full_history=False, overlap_days=DEFAULT_OVERLAP_DAYS,
+                     source=None):
     """
     Fetch all asset prices and save to raw data directory.
     
+    Parameters:
+        batch (bool): Download all tickers in one bulk request
+        full_history (bool): Re-download full history instead of appending
+            bars after the last saved date
+        overlap_days (int): Days re-fetched before the last saved date
+        source (DataSource, optional): Data source backend (default: get_source())
+    
     Returns:
         dict: Dictionary of fetched dataframes
     """
@@ -126,15 +295,45 @@ def fetch_all_assets():
     results = {}
     errors = []
     
+    source = source or get_source()
+    
+    start_dates = {}
+    if not full_history:
+        for ticker, config in ASSET_CONFIG.items():
+            start = incremental_start_date(config['filename'], overlap_days)
+            if start is not None:
+                start_dates[ticker] = start
+        print(f"\nIncremental mode: {len(start_dates)}/{len(ASSET_CONFIG)} assets have saved data "
+              f"(overlap: {overlap_days} days)")
+    
+    batch_frames = {}
+    batch_errors = {}
+    if batch:
+        years = max(config['years'] for config in ASSET_CONFIG.values())
+        try:
+            batch_frames, batch_errors = fetch_assets_batched(ASSET_CONFIG.keys(), years=years,
+                                                              start_dates=start_dates,
+                                                              source=source)
+        except Exception as e:
+            batch_errors = {ticker: f"Batch download failed: {str(e)}" for ticker in ASSET_CONFIG}
+    
     for ticker, config in ASSET_CONFIG.items():
         try:
             print(f"\nProcessing: {config['name']}")
             
             # Fetch data
-            df = fetch_asset_data(ticker, years=config['years'])
+            if batch:
+                if ticker in batch_errors:
+                    raise RuntimeError(batch_errors[ticker])
+                df = batch_frames[ticker]
+            else:
+                df = fetch_asset_data(ticker, years=config['years'],
+                                      start_date=start_dates.get(ticker),
+                                      source=source)
             
             # Save data
-            save_asset_data(df, config['filename'], config['column'])
+            save_asset_data(df, config['filename'], config['column'],
+                            append=ticker in start_dates)
             
             results[ticker] = {
                 'dataframe': df,
@@ -155,15 +354,63 @@ def fetch_all_assets():
     return results, errors
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Fetch asset prices from Yahoo Finance.")
+    parser.add_argument('--batch', action='store_true',
+                        help="download all tickers in one bulk request")
+    parser.add_argument('--full-history', action='store_true',
+                        help="re-download the full history instead of appending new bars")
+    parser.add_argument('--overlap-days', type=int, default=DEFAULT_OVERLAP_DAYS,
+                        help="days re-fetched before the last saved date")
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help="serve every ticker from the local response cache")
+    parser.add_argument('--cache', dest='cache', action='store_true', default=None,
+                        help="cache live responses too (default: only local/replay sources)")
+    parser.add_argument('--no-cache', dest='cache', action='store_false', default=None,
+                        help="bypass the local response cache")
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help="seconds a cached response stays fresh")
+    parser.add_argument('--source', choices=SOURCE_NAMES, default=None,
+                        help="data source backend (default: FETCH_SOURCE or live)")
+    parser.add_argument('--source-path', default=None,
+                        help="fixtures directory (local) or stand-in server URL (replay)")
+    parser.add_argument('--record', action='store_true',
+                        help="save every response to data/fixtures/ for later replay")
+    parser.add_argument('--max-retries', type=int, default=None,
+                        help="retries per request for 429/5xx/timeouts (default: 4)")
+    parser.add_argument('--raw-format', choices=list(RAW_FORMATS), default=None,
+                        help="storage format for data/raw/ (default: RAW_FORMAT or csv)")
+    parser.add_argument('--raw-compression', default=None,
+                        help="codec for parquet/feather raw files")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main execution function."""
+    args = parse_args(argv)
+
     print("\n" + "=" * 70)
     print("FETCHING ASSET PRICES FROM YAHOO FINANCE")
     print("=" * 70)
     
     try:
+        cache = configure_cache(offline=args.offline, enabled=args.cache, ttl=args.cache_ttl)
+        if args.max_retries is not None:
+            configure_retries(max_attempts=args.max_retries + 1)
+        configure_storage(args.raw_format, args.raw_compression)
+        if cache.offline:
+            print("\nOffline mode: serving all tickers from the response cache")
+        source = get_source(args.source, args.source_path)
+        if args.record:
+            source = RecordingSource(source)
+        
         # Fetch all assets
-        results, errors = fetch_all_assets()
+        results, errors = fetch_all_assets(batch=args.batch,
+                                           full_history=args.full_history,
+                                           overlap_days=args.overlap_days,
+                                           source=source)
+        get_manifest().flush()
         
         # Summary
         print("\n" + "=" * 70)
@@ -188,6 +435,9 @@ def main():
             for error in errors:
                 print(f"  • {error}")
         
+        print()
+        print_connection_stats()
+        
         print("\n" + "=" * 70)
         print(f"✓ Asset price data saved to: {RAW_DATA_DIR}")
         print("=" * 70 + "\n")
@@ -0,0 +1,107 @@
+"""
+Shared HTTP Session for the Data Fetchers
+=========================================
+
+One pooled, keep-alive requests.Session used by every FRED request (and by the
+replay backend), so a refresh pays TCP/TLS setup once per host instead of once
+per series.
+
+Yahoo Finance requests go through yfinance, which already keeps a single
+process-wide session of its own (with the browser impersonation Yahoo needs),
+so they are not routed through this pool.
+
+Usage:
+    from http_session import get_session, connection_stats
+
+    response = get_session().get(url, params=params, timeout=30)
+    print(connection_stats())
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 16
+
+_session = None
+_pool_size = DEFAULT_POOL_SIZE
+_lock = threading.Lock()
+
+
+def _build_session(pool_size):
+    session = requests.Session()
+    # Retries are handled by retry_policy.call_with_retry, not urllib3
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session(_pool_size)
+        return _session
+
+
+def configure_session(pool_size=None):
+    """
+    Set the connection pool size (e.g. to match the worker count).
+
+    Takes effect immediately; an existing session is closed and replaced.
+
+    Parameters:
+        pool_size (int, optional): Maximum connections kept open per host
+
+    Returns:
+        requests.Session: The process-wide session
+    """
+    global _session, _pool_size
+    if pool_size is not None:
+        with _lock:
+            _pool_size = max(1, pool_size)
+            if _session is not None:
+                _session.close()
+                _session = None
+    return get_session()
+
+
+def connection_stats(session=None):
+    """
+    Summarise connection reuse across every host the session has talked to.
+
+    Returns:
+        dict: requests, connections_opened, connections_reused and reuse_rate
+    """
+    session = session or _session
+    requests_made = 0
+    opened = 0
+    if session is not None:
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_made += pool.num_requests
+                opened += pool.num_connections
+
+    reused = max(0, requests_made - opened)
+    return {
+        'requests': requests_made,
+        'connections_opened': opened,
+        'connections_reused': reused,
+        'reuse_rate': round(reused / requests_made, 3) if requests_made else 0.0,
+    }
+
+
+def print_connection_stats(session=None):
+    """Print a one-line connection reuse summary."""
+    stats = connection_stats(session)
+    if stats['requests'] == 0:
+        return
+    print(f"  HTTP connections: {stats['requests']} requests over {stats['connections_opened']} "
+          f"connections ({stats['connections_reused']} reused, {stats['reuse_rate']:.0%})")
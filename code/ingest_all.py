@@ -0,0 +1,328 @@
+"""
+Fetch All Raw Data (FRED + Yahoo Finance) in One Event Loop
+===========================================================
+
+Runs every FRED series (fetch_all_fred_economic_data.SERIES_CONFIG) and every
+Yahoo Finance ticker (fetch_asset_prices.ASSET_CONFIG) as tasks on a single
+asyncio event loop, so the whole raw-data refresh is bounded by the slowest
+request rather than the sum of all of them.
+
+The fetchers themselves are blocking, so each task runs its fetch + save in a
+worker thread (asyncio.to_thread). A semaphore caps how many run at once.
+Each job's timeout is also a deadline for its worker thread
+(retry_policy.deadline_at): rate-limit waits, retry backoff and every HTTP
+request's timeout are cut to the time left, so a timed-out job stops rather
+than holding a thread, and a job reported as timed out never saves its file.
+Rate limiting, retries, the response cache and the shared HTTP session all
+still apply.
+
+Usage:
+    python code/ingest_all.py [--concurrency 8] [--timeout 120] [--incremental]
+                              [--full-history] [--json summary.json]
+
+Options:
+    --concurrency N Maximum requests in flight across both sources (default: 8)
+    --timeout S     Seconds allowed per series/ticker, including retries (default: 120)
+    --incremental   FRED: only fetch after the last saved date (see fetch_all_fred_economic_data.py)
+    --full-history  Yahoo: re-download full history instead of appending new bars
+    --offline       Serve everything from the local response cache
+    --cache         Also cache live responses (default: only local/replay sources)
+    --no-cache      Bypass the local response cache
+    --cache-ttl S   Seconds a cached response stays fresh (default: 43200)
+    --source NAME   Data source backend: live (default), local or replay
+    --source-path P Fixtures directory (local) or stand-in server URL (replay)
+    --max-retries N Retries per request for 429/5xx/timeouts, with jittered
+                    exponential backoff (default: 4)
+    --raw-format F  Storage format for data/raw/: csv (default), parquet or feather
+    --raw-compression C
+                    Codec for parquet/feather files (see raw_storage.py)
+    --json PATH     Also write the structured result summary as JSON
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config_paths import RAW_DATA_DIR
+from response_cache import configure_cache
+from retry_policy import DeadlineExceeded, configure_retries, deadline_at
+from data_sources import SOURCE_NAMES, get_source
+from http_session import configure_session, print_connection_stats
+from raw_storage import RAW_FORMATS, configure_storage
+from manifest import get_manifest
+import fetch_all_fred_economic_data as fred_fetch
+import fetch_asset_prices as asset_fetch
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 120  # seconds per series/ticker
+
+
+class _JobControl:
+    """
+    Deadline shared by a job's worker thread and the task waiting on it.
+
+    The worker calls start_save() before writing its file and the task calls
+    cancel() when the timeout fires; the lock makes those mutually exclusive,
+    so a job is either saved or reported as timed out, never both.
+    """
+
+    def __init__(self, timeout):
+        self.deadline = time.monotonic() + timeout
+        self._lock = threading.Lock()
+        self._state = None
+
+    def start_save(self):
+        """Claim the right to save (worker thread); raises DeadlineExceeded once timed out."""
+        with self._lock:
+            if self._state == 'cancelled' or time.monotonic() >= self.deadline:
+                self._state = 'cancelled'
+                raise DeadlineExceeded("timed out before saving")
+            self._state = 'saving'
+
+    def cancel(self):
+        """Mark the job timed out; False if it is already saving and should be awaited."""
+        with self._lock:
+            if self._state == 'saving':
+                return False
+            self._state = 'cancelled'
+            return True
+
+
+def _fred_job(control, source, series_id, config, start_date):
+    """Fetch and save one FRED series (runs in a worker thread)."""
+    data = fred_fetch.fetch_series(source, series_id, config['name'], start_date,
+                                   verbose=False, raise_errors=True)
+    if data is None or len(data) == 0:
+        raise RuntimeError("No observations returned")
+    control.start_save()
+    fred_fetch.save_series(data, config['filename'], config['column'],
+                           append=start_date is not None)
+    return len(data)
+
+
+def _asset_job(control, source, ticker, config, start_date):
+    """Fetch and save one Yahoo Finance ticker (runs in a worker thread)."""
+    df = asset_fetch.fetch_asset_data(ticker, years=config['years'], start_date=start_date,
+                                      source=source, verbose=False)
+    control.start_save()
+    asset_fetch.save_asset_data(df, config['filename'], config['column'],
+                                append=start_date is not None, verbose=False)
+    return len(df)
+
+
+def _run_until_deadline(control, job, *args):
+    """Run job(control, *args) with its requests bounded by the job's deadline."""
+    with deadline_at(control.deadline):
+        return job(control, *args)
+
+
+async def _run_job(semaphore, timeout, kind, identifier, config, job, *args):
+    """Run one blocking job under the concurrency limit and timeout."""
+    result = {
+        'source': kind,
+        'id': identifier,
+        'name': config['name'],
+        'filename': config['filename'],
+        'success': False,
+        'rows': 0,
+        'elapsed_s': 0.0,
+        'error': None,
+    }
+    async with semaphore:
+        start = time.perf_counter()
+        control = _JobControl(timeout)
+        work = asyncio.ensure_future(asyncio.to_thread(_run_until_deadline, control, job, *args))
+        try:
+            try:
+                result['rows'] = await asyncio.wait_for(asyncio.shield(work), timeout)
+            except asyncio.TimeoutError:
+                if control.cancel():
+                    raise
+                # Already writing its file: let the save finish
+                result['rows'] = await work
+            result['success'] = True
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            result['error'] = f"Timed out after {timeout:g}s"
+        except Exception as e:
+            result['error'] = str(e)
+        result['elapsed_s'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+async def ingest_all(source, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                     fred_start_dates=None, asset_start_dates=None):
+    """
+    Fetch and save every FRED series and Yahoo ticker concurrently.
+
+    Parameters:
+        source (DataSource): Data source backend
+        concurrency (int): Maximum jobs in flight
+        timeout (float): Seconds allowed per job
+        fred_start_dates (dict, optional): Series ID to incremental start date
+        asset_start_dates (dict, optional): Ticker to incremental start date
+
+    Returns:
+        list: One result dict per series/ticker, FRED first, in config order
+    """
+    fred_start_dates = fred_start_dates or {}
+    asset_start_dates = asset_start_dates or {}
+
+    # asyncio.to_thread uses the default executor. A timed-out job releases
+    # the semaphore while its thread may still be unwinding (e.g. parsing a
+    # response that arrived just before the deadline), so leave headroom.
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=2 * max(1, concurrency)))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    tasks = [
+        _run_job(semaphore, timeout, 'fred', series_id, config, _fred_job,
+                 source, series_id, config, fred_start_dates.get(series_id))
+        for series_id, config in fred_fetch.SERIES_CONFIG.items()
+    ]
+    tasks += [
+        _run_job(semaphore, timeout, 'yahoo', ticker, config, _asset_job,
+                 source, ticker, config, asset_start_dates.get(ticker))
+        for ticker, config in asset_fetch.ASSET_CONFIG.items()
+    ]
+
+    # gather preserves task order, so the summary is deterministic
+    return await asyncio.gather(*tasks)
+
+
+def print_summary(results, elapsed):
+    """Print per-source summaries in the same format as the individual fetch scripts."""
+    fred_results = [r for r in results if r['source'] == 'fred']
+    asset_results = [r for r in results if r['source'] == 'yahoo']
+
+    print("\n" + "=" * 70)
+    print("FETCH SUMMARY")
+    print("=" * 70)
+
+    print("\nFRED series:")
+    for r in fred_results:
+        if r['success']:
+            print(f"  ✓ {r['filename']} ({r['rows']:,} observations, {r['elapsed_s']:.2f}s)")
+        else:
+            print(f"  ❌ {r['name']} ({r['id']}): {r['error']}")
+
+    fred_ok = sum(1 for r in fred_results if r['success'])
+    print(f"\n✓ SUCCESS! {fred_ok}/{len(fred_results)} series saved to data/raw/")
+
+    asset_ok = sum(1 for r in asset_results if r['success'])
+    print(f"\nSuccessfully fetched: {asset_ok}/{len(asset_results)} assets")
+
+    if asset_ok > 0:
+        print("\n✓ Successful fetches:")
+        for r in asset_results:
+            if r['success']:
+                print(f"  • {r['name']:25s} → {r['filename']:25s} ({r['rows']:,} rows)")
+
+    asset_errors = [r for r in asset_results if not r['success']]
+    if asset_errors:
+        print("\n❌ Errors encountered:")
+        for r in asset_errors:
+            print(f"  • Error fetching {r['id']} ({r['name']}): {r['error']}")
+
+    slowest = max(results, key=lambda r: r['elapsed_s'])
+    print(f"\nTotal wall time: {elapsed:.2f}s "
+          f"(slowest: {slowest['id']} {slowest['elapsed_s']:.2f}s, "
+          f"sum of all requests: {sum(r['elapsed_s'] for r in results):.2f}s)")
+    print()
+    print_connection_stats()
+
+    print("\n" + "=" * 70)
+    print(f"✓ Raw data saved to: {RAW_DATA_DIR}")
+    print("=" * 70 + "\n")
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Fetch all FRED and Yahoo Finance data in one event loop.")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="maximum requests in flight")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds allowed per series/ticker")
+    parser.add_argument('--incremental', action='store_true',
+                        help="FRED: only fetch observations after the last saved date")
+    parser.add_argument('--full-history', action='store_true',
+                        help="Yahoo: re-download full history instead of appending new bars")
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help="serve everything from the local response cache")
+    parser.add_argument('--cache', dest='cache', action='store_true', default=None,
+                        help="cache live responses too (default: only local/replay sources)")
+    parser.add_argument('--no-cache', dest='cache', action='store_false', default=None,
+                        help="bypass the local response cache")
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help="seconds a cached response stays fresh")
+    parser.add_argument('--source', choices=SOURCE_NAMES, default=None,
+                        help="data source backend (default: FETCH_SOURCE or live)")
+    parser.add_argument('--source-path', default=None,
+                        help="fixtures directory (local) or stand-in server URL (replay)")
+    parser.add_argument('--max-retries', type=int, default=None,
+                        help="retries per request for 429/5xx/timeouts (default: 4)")
+    parser.add_argument('--raw-format', choices=list(RAW_FORMATS), default=None,
+                        help="storage format for data/raw/ (default: RAW_FORMAT or csv)")
+    parser.add_argument('--raw-compression', default=None,
+                        help="codec for parquet/feather raw files")
+    parser.add_argument('--json', dest='json_path', default=None,
+                        help="write the structured result summary to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    print("\n" + "=" * 70)
+    print("RAW DATA INGESTION (FRED + YAHOO FINANCE)")
+    print("=" * 70)
+
+    try:
+        cache = configure_cache(enabled=args.cache, offline=args.offline, ttl=args.cache_ttl)
+        if args.max_retries is not None:
+            configure_retries(max_attempts=args.max_retries + 1)
+        configure_session(pool_size=args.concurrency)
+        configure_storage(args.raw_format, args.raw_compression)
+        source = get_source(args.source, args.source_path)
+        if source.name == 'live' and not cache.offline:
+            source.api_key = fred_fetch.get_api_key()
+
+        fred_start_dates = {}
+        if args.incremental:
+            fred_start_dates = fred_fetch.incremental_start_dates(fred_fetch.SERIES_CONFIG)
+        asset_start_dates = {}
+        if not args.full_history:
+            for ticker, config in asset_fetch.ASSET_CONFIG.items():
+                start = asset_fetch.incremental_start_date(config['filename'])
+                if start is not None:
+                    asset_start_dates[ticker] = start
+
+        total = len(fred_fetch.SERIES_CONFIG) + len(asset_fetch.ASSET_CONFIG)
+        print(f"\nFetching {total} series ({args.concurrency} concurrent, {args.timeout:g}s timeout)...")
+
+        start = time.perf_counter()
+        results = asyncio.run(ingest_all(source, args.concurrency, args.timeout,
+                                         fred_start_dates, asset_start_dates))
+        get_manifest().flush()
+        elapsed = time.perf_counter() - start
+
+        print_summary(results, elapsed)
+
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump({'elapsed_s': round(elapsed, 3), 'results': results}, f, indent=2)
+
+        return 0 if all(r['success'] for r in results) else 1
+
+    except Exception as e:
+        print(f"\n❌ ERROR: {str(e)}\n", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
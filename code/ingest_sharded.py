@@ -0,0 +1,376 @@
+"""
+Sharded FRED Ingestion Across Worker Processes
+==============================================
+
+For registries with hundreds of FRED series. The series are partitioned
+across N worker processes ("shards"); each shard fetches and saves its
+series with a few threads and its own slice of the FRED rate budget
+(1/N of the per-key limit, see retry_policy.configure_fred_rate_limit), so
+the shards together never exceed FRED's 120 requests per minute.
+
+Checkpointing:
+    Each shard appends one JSON line per finished series to
+    data/checkpoints/fred_sharded/shard-<i>.jsonl as soon as the series is
+    saved. With --resume, series already saved successfully are skipped, so
+    a crash at series 180 of 300 restarts at 181. Failed series are retried.
+
+Result manifests:
+    Each shard also writes its own content-hash manifest (manifest.py), so
+    processes never rewrite data/manifest.json concurrently. When all shards
+    finish, their checkpoint lines are merged into
+    data/checkpoints/fred_sharded/ingest_manifest.json (one record per
+    series) and their content hashes are merged into data/manifest.json.
+
+Usage:
+    python code/ingest_sharded.py [--shards 4] [--workers-per-shard 2] [--resume]
+                                  [--incremental] [--source local]
+
+Options:
+    --shards N              Worker processes (default: 4; at most 60, see retry_policy.max_fred_shares)
+    --workers-per-shard N   Concurrent series within each shard (default: 2)
+    --resume                Skip series saved by an earlier, interrupted run
+    --incremental           Only fetch after the last saved date (see fetch_all_fred_economic_data.py)
+    --overlap-days N        Days re-fetched before the last saved date (default: 90)
+    --offline / --no-cache  Response cache options (see response_cache.py);
+                            --cache also caches live responses
+    --source NAME           Data source backend: live (default), local or replay
+    --source-path P         Fixtures directory (local) or stand-in server URL (replay)
+    --raw-format F          Storage format for data/raw/ (see raw_storage.py)
+    --max-retries N         Retries per series for 429/5xx/timeouts (default: 4)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from config_paths import CHECKPOINT_DIR
+from manifest import get_manifest, configure_manifest
+from data_sources import SOURCE_NAMES, get_source
+from response_cache import configure_cache
+from retry_policy import configure_retries, configure_fred_rate_limit, max_fred_shares
+from http_session import configure_session
+from raw_storage import RAW_FORMATS, configure_storage
+import fetch_all_fred_economic_data as fred_fetch
+
+DEFAULT_SHARDS = 4
+DEFAULT_WORKERS_PER_SHARD = 2
+DEFAULT_CHECKPOINT_DIR = CHECKPOINT_DIR / 'fred_sharded'
+
+
+def partition(series_ids, n_shards):
+    """
+    Split series IDs across shards round-robin.
+
+    Round-robin keeps shards balanced when the registry groups similar
+    (e.g. long daily) series together.
+
+    Returns:
+        list: One list of series IDs per shard (empty shards are dropped)
+    """
+    shards = [list(series_ids[i::n_shards]) for i in range(max(1, n_shards))]
+    return [shard for shard in shards if shard]
+
+
+def read_checkpoint(checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+    """
+    Load every shard's checkpoint lines.
+
+    A series can have records in several shard files (a resumed run
+    partitions the remaining series afresh), so the record with the latest
+    'finished_at' wins, and a success wins a tie. A torn final line (from a
+    crash mid-write) is ignored.
+
+    Returns:
+        dict: Series ID to its latest record
+    """
+    records = {}
+    if not checkpoint_dir.exists():
+        return records
+    for path in sorted(checkpoint_dir.glob('shard-*.jsonl')):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                current = records.get(record['id'])
+                if current is None or _record_order(record) >= _record_order(current):
+                    records[record['id']] = record
+    return records
+
+
+def _record_order(record):
+    """Sort key of a checkpoint record: when it finished, then success over failure."""
+    return (record.get('finished_at', 0.0), record['success'])
+
+
+def clear_checkpoint(checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+    """Remove the shard checkpoints and manifests from a previous run."""
+    if not checkpoint_dir.exists():
+        return
+    for pattern in ('shard-*.jsonl', 'manifest-shard-*.json'):
+        for path in checkpoint_dir.glob(pattern):
+            path.unlink()
+
+
+def _append_record(path, record):
+    """Append one checkpoint line and force it to disk."""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run_shard(shard_index, n_shards, series_config, start_dates, options):
+    """
+    Fetch and save one shard's series (runs in a worker process).
+
+    Parameters:
+        shard_index (int): This shard's number
+        n_shards (int): Total shards (sets this process's share of the rate budget)
+        series_config (dict): Series ID to config for this shard only
+        start_dates (dict): Series ID to incremental start date
+        options (dict): source, source_path, api_key, workers, offline,
+            cache, raw_format, max_retries, checkpoint_dir
+
+    Returns:
+        dict: Shard summary (shard, succeeded, failed, elapsed_s)
+    """
+    checkpoint_dir = options['checkpoint_dir']
+    configure_fred_rate_limit(share=1.0 / n_shards)
+    configure_cache(offline=options['offline'], enabled=options['cache'])
+    configure_session(pool_size=options['workers'])
+    configure_storage(options['raw_format'])
+    if options['max_retries'] is not None:
+        configure_retries(max_attempts=options['max_retries'] + 1)
+    configure_manifest(checkpoint_dir / f"manifest-shard-{shard_index}.json")
+
+    source = get_source(options['source'], options['source_path'])
+    if options['api_key']:
+        source.api_key = options['api_key']
+
+    checkpoint = checkpoint_dir / f"shard-{shard_index}.jsonl"
+
+    def job(series_id, config):
+        start = time.perf_counter()
+        record = {'id': series_id, 'shard': shard_index, 'filename': config['filename'],
+                  'success': False, 'rows': 0, 'error': None}
+        try:
+            data = fred_fetch.fetch_series(source, series_id, config['name'],
+                                           start_dates.get(series_id),
+                                           verbose=False, raise_errors=True)
+            if data is None or len(data) == 0:
+                raise RuntimeError("No observations returned")
+            fred_fetch.save_series(data, config['filename'], config['column'],
+                                   append=series_id in start_dates)
+            record['success'] = True
+            record['rows'] = len(data)
+        except Exception as e:
+            record['error'] = str(e)
+        record['elapsed_s'] = round(time.perf_counter() - start, 3)
+        record['finished_at'] = time.time()
+        return record
+
+    started = time.perf_counter()
+    succeeded = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+        futures = [executor.submit(job, series_id, config) for series_id, config in series_config.items()]
+        for future in as_completed(futures):
+            record = future.result()
+            _append_record(checkpoint, record)
+            if record['success']:
+                succeeded += 1
+            else:
+                failed += 1
+    # Worker processes exit without running atexit hooks, so write the
+    # shard's manifest before handing back to the parent
+    get_manifest().flush()
+
+    return {
+        'shard': shard_index,
+        'succeeded': succeeded,
+        'failed': failed,
+        'elapsed_s': round(time.perf_counter() - started, 3),
+    }
+
+
+def merge_results(series_config, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+    """
+    Merge the shards' checkpoints and content manifests.
+
+    Writes ingest_manifest.json (one record per series, in config order, with
+    never-attempted series marked as such) and folds each shard's content
+    hashes into data/manifest.json.
+
+    Returns:
+        dict: Series ID to record
+    """
+    records = read_checkpoint(checkpoint_dir)
+    merged = {}
+    for series_id, config in series_config.items():
+        merged[series_id] = records.get(series_id, {
+            'id': series_id, 'shard': None, 'filename': config['filename'],
+            'success': False, 'rows': 0, 'error': 'Not attempted',
+        })
+
+    with open(checkpoint_dir / 'ingest_manifest.json', 'w', encoding='utf-8') as f:
+        json.dump({'series': list(merged.values())}, f, indent=2)
+
+    manifest = get_manifest()
+    for path in sorted(checkpoint_dir.glob('manifest-shard-*.json')):
+        manifest.merge(path)
+    return merged
+
+
+def run_sharded(series_config, n_shards=DEFAULT_SHARDS, workers_per_shard=DEFAULT_WORKERS_PER_SHARD,
+                start_dates=None, resume=False, source_name=None, source_path=None, api_key=None,
+                offline=None, cache=None, raw_format=None, max_retries=None,
+                checkpoint_dir=DEFAULT_CHECKPOINT_DIR, verbose=True):
+    """
+    Fetch every series in series_config across worker processes.
+
+    Parameters:
+        series_config (dict): Series ID to config (see SERIES_CONFIG)
+        n_shards (int): Worker processes
+        workers_per_shard (int): Concurrent series within each shard
+        start_dates (dict, optional): Series ID to incremental start date
+        resume (bool): Skip series already saved according to the checkpoint
+
+    Returns:
+        tuple: (dict, list) - Series ID to merged record, and shard summaries
+
+    Raises:
+        ValueError: If n_shards is more than the FRED rate budget can be split across
+    """
+    if n_shards > max_fred_shares():
+        raise ValueError(f"--shards {n_shards} splits FRED's rate budget too thinly; "
+                         f"use at most {max_fred_shares()} shards")
+    start_dates = start_dates or {}
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    done = set()
+    if resume:
+        done = {sid for sid, record in read_checkpoint(checkpoint_dir).items() if record['success']}
+        if verbose:
+            print(f"\nResuming: {len(done & set(series_config))}/{len(series_config)} series already saved")
+    else:
+        clear_checkpoint(checkpoint_dir)
+
+    remaining = [sid for sid in series_config if sid not in done]
+    shards = partition(remaining, n_shards)
+    options = {
+        'source': source_name, 'source_path': source_path, 'api_key': api_key,
+        'workers': workers_per_shard, 'offline': offline, 'cache': cache,
+        'raw_format': raw_format, 'max_retries': max_retries,
+        'checkpoint_dir': checkpoint_dir,
+    }
+
+    summaries = []
+    if shards:
+        if verbose:
+            print(f"\nFetching {len(remaining)} series in {len(shards)} shards "
+                  f"({workers_per_shard} workers each, {1 / len(shards):.0%} of the FRED rate budget per shard)...")
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [
+                executor.submit(run_shard, i, len(shards),
+                                {sid: series_config[sid] for sid in shard},
+                                {sid: start_dates[sid] for sid in shard if sid in start_dates},
+                                options)
+                for i, shard in enumerate(shards)
+            ]
+            for future in as_completed(futures):
+                summary = future.result()
+                summaries.append(summary)
+                if verbose:
+                    print(f"  ✓ Shard {summary['shard']}: {summary['succeeded']} saved, "
+                          f"{summary['failed']} failed ({summary['elapsed_s']:.1f}s)")
+
+    merged = merge_results(series_config, checkpoint_dir)
+    return merged, sorted(summaries, key=lambda s: s['shard'])
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Fetch FRED series across worker processes.")
+    parser.add_argument('--shards', type=int, default=DEFAULT_SHARDS,
+                        help="worker processes")
+    parser.add_argument('--workers-per-shard', type=int, default=DEFAULT_WORKERS_PER_SHARD,
+                        help="concurrent series within each shard")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip series saved by an earlier, interrupted run")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only fetch observations after the last saved date and merge them in")
+    parser.add_argument('--overlap-days', type=int, default=fred_fetch.DEFAULT_OVERLAP_DAYS,
+                        help="days re-fetched before the last saved date in incremental mode")
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help="serve every series from the local response cache")
+    parser.add_argument('--cache', dest='cache', action='store_true', default=None,
+                        help="cache live responses too (default: only local/replay sources)")
+    parser.add_argument('--no-cache', dest='cache', action='store_false', default=None,
+                        help="bypass the local response cache")
+    parser.add_argument('--source', choices=SOURCE_NAMES, default=None,
+                        help="data source backend (default: FETCH_SOURCE or live)")
+    parser.add_argument('--source-path', default=None,
+                        help="fixtures directory (local) or stand-in server URL (replay)")
+    parser.add_argument('--raw-format', choices=list(RAW_FORMATS), default=None,
+                        help="storage format for data/raw/ (default: RAW_FORMAT or csv)")
+    parser.add_argument('--max-retries', type=int, default=None,
+                        help="retries per series for 429/5xx/timeouts (default: 4)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    series_config = fred_fetch.SERIES_CONFIG
+
+    print("\n" + "=" * 70)
+    print("SHARDED FRED INGESTION")
+    print("=" * 70)
+
+    try:
+        cache = configure_cache(offline=args.offline, enabled=args.cache)
+        source = get_source(args.source, args.source_path)
+        api_key = None
+        if source.name == 'live' and not cache.offline:
+            api_key = fred_fetch.get_api_key()
+
+        start_dates = {}
+        if args.incremental:
+            start_dates = fred_fetch.incremental_start_dates(series_config, args.overlap_days)
+
+        start = time.perf_counter()
+        merged, _ = run_sharded(series_config, args.shards, args.workers_per_shard,
+                                start_dates=start_dates, resume=args.resume,
+                                source_name=source.name, source_path=args.source_path,
+                                api_key=api_key, offline=args.offline, cache=args.cache,
+                                raw_format=args.raw_format, max_retries=args.max_retries)
+        elapsed = time.perf_counter() - start
+
+        failed = [record for record in merged.values() if not record['success']]
+        if failed:
+            print("\n❌ Failed series:")
+            for record in failed:
+                print(f"  • {series_config[record['id']]['name']} ({record['id']}): {record['error']}")
+
+        print("\n" + "=" * 70)
+        print(f"✓ SUCCESS! {len(merged) - len(failed)}/{len(merged)} series saved to data/raw/ "
+              f"in {elapsed:.1f}s")
+        print(f"  Result manifest: {DEFAULT_CHECKPOINT_DIR / 'ingest_manifest.json'}")
+        if failed:
+            print("  Re-run with --resume to retry only the failed series.")
+        print("=" * 70 + "\n")
+
+        return 0 if not failed else 1
+
+    except Exception as e:
+        print(f"\n❌ ERROR: {str(e)}\n", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
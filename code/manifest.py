@@ -0,0 +1,365 @@
+"""
+Content-Hash Manifest for Pipeline Artifacts
+============================================
+
+Records a content hash for every raw, processed and final data file the
+pipeline writes, plus the inputs each stage last ran on, in
+data/manifest.json. Stages consult it to skip work whose result would be
+byte-identical to what is already on disk:
+
+- write_if_changed(): skips rewriting a file whose content is unchanged
+  (used by raw_storage.write_raw and clean_and_merge.save_datasets)
+- stage_is_current(): True if a stage's inputs (and its own code) hash the
+  same as on its last successful run and its outputs are untouched, so the
+  whole stage can be skipped
+- memo(): caches a value derived from a file (e.g. its inferred frequency)
+  until the file's content changes
+
+File hashes are cached against size and mtime, so checking an unchanged file
+costs a stat() rather than a read. A file edited outside the pipeline
+(different size or mtime) is always re-hashed.
+
+Usage:
+    from manifest import get_manifest, frame_hash
+
+    manifest = get_manifest()
+    if manifest.stage_is_current('clean_and_merge', input_paths):
+        ...  # outputs are up to date
+    manifest.record_stage('clean_and_merge', input_paths, output_paths)
+
+File records are kept in memory and written out with the next stage record
+or flush(), so a fetch loop writing hundreds of files saves the manifest
+once rather than once per file.
+"""
+
+import os
+import json
+import atexit
+import hashlib
+import threading
+from pathlib import Path
+import pandas as pd
+from config_paths import PROJECT_ROOT, MANIFEST_PATH
+
+MANIFEST_VERSION = 1
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def frame_hash(df):
+    """
+    SHA-256 of a DataFrame's content (index, columns, dtypes and values).
+
+    Datetime columns are hashed at nanosecond resolution, so the same dates
+    read back from CSV and from Parquet hash identically.
+    """
+    return chunked_frame_hash([df])
+
+
+def chunked_frame_hash(chunks):
+    """
+    frame_hash() of a DataFrame given as consecutive row blocks.
+
+    Row hashes don't depend on the other rows, so this equals frame_hash()
+    of the concatenated blocks without ever holding them all in memory.
+    """
+    digest = hashlib.sha256()
+    for i, df in enumerate(chunks):
+        df = df.copy()
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = df[col].astype('datetime64[ns]')
+        if isinstance(df.index, pd.DatetimeIndex):
+            df.index = df.index.astype('datetime64[ns]')
+        if i == 0:
+            digest.update(repr((list(df.columns), [str(t) for t in df.dtypes], df.index.name)).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def manifest_key(path):
+    """Manifest key for a path: relative to the project root where possible."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+class Manifest:
+    """
+    Content hashes of pipeline artifacts, persisted as JSON.
+
+    Thread-safe within a process. record_file() only marks the manifest
+    dirty; record_stage(), merge() and flush() write it with an atomic
+    replace, so an interrupted run never leaves a corrupt manifest. Pending
+    file records are also flushed at interpreter exit.
+
+    Parameters:
+        path (Path): Manifest file location
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._data = self._load()
+        self._dirty = False
+        self._registered = False
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                return data
+        except (FileNotFoundError, ValueError):
+            pass
+        return {'version': MANIFEST_VERSION, 'files': {}, 'stages': {}}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def flush(self):
+        """
+        Write pending file records to disk.
+
+        Returns:
+            bool: True if the manifest was written, False if nothing was pending
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            self._save()
+            return True
+
+    def _entry_is_fresh(self, entry, path):
+        """True if the file on disk still matches the size/mtime recorded with its hash."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        return entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+
+    def current_hash(self, path):
+        """
+        Content hash of a file, re-reading it only if it changed since it was recorded.
+
+        Returns:
+            str: SHA-256 hex digest, or None if the file doesn't exist
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        with self._lock:
+            entry = self._data['files'].get(manifest_key(path))
+            if entry is not None and self._entry_is_fresh(entry, path):
+                return entry['hash']
+        return file_hash(path)
+
+    def record_file(self, path, content_hash=None):
+        """
+        Record a file's current hash (and its frame hash, if given).
+
+        The record is held in memory until the next record_stage() or
+        flush().
+
+        Parameters:
+            path (Path): File just written
+            content_hash (str, optional): frame_hash() of the data written
+        """
+        path = Path(path)
+        stat = os.stat(path)
+        entry = {
+            'hash': file_hash(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        if content_hash is not None:
+            entry['content'] = content_hash
+        with self._lock:
+            self._data['files'][manifest_key(path)] = entry
+            self._dirty = True
+            if not self._registered:
+                atexit.register(self.flush)
+                self._registered = True
+        return entry['hash']
+
+    def content_unchanged(self, path, content_hash):
+        """True if `path` already holds data with this frame_hash() and hasn't been touched since."""
+        with self._lock:
+            entry = self._data['files'].get(manifest_key(path))
+            return (entry is not None and entry.get('content') == content_hash
+                    and self._entry_is_fresh(entry, path))
+
+    def stage_is_current(self, stage, inputs):
+        """
+        Check whether a stage can be skipped.
+
+        Parameters:
+            stage (str): Stage name
+            inputs (list): Input file paths (include the stage's own script)
+
+        Returns:
+            bool: True if every input hashes the same as on the last recorded
+                run and every recorded output is still on disk unmodified
+        """
+        with self._lock:
+            record = self._data['stages'].get(stage)
+        if record is None:
+            return False
+
+        input_hashes = {manifest_key(p): self.current_hash(p) for p in inputs}
+        if input_hashes != record['inputs']:
+            return False
+        for key, recorded in record['outputs'].items():
+            if self.current_hash(PROJECT_ROOT / key) != recorded:
+                return False
+        return True
+
+    def record_stage(self, stage, inputs, outputs):
+        """Record the input and output hashes of a successful stage run."""
+        record = {
+            'inputs': {manifest_key(p): self.current_hash(p) for p in inputs},
+            'outputs': {manifest_key(p): self.current_hash(p) for p in outputs},
+        }
+        with self._lock:
+            self._data['stages'][stage] = record
+            self._save()
+
+    def memo(self, name, path, compute):
+        """
+        A value derived from a file's content, computed once per content hash.
+
+        New values are kept in memory and saved by the next manifest write
+        (record_stage/flush), so a lookup never rewrites the manifest.
+
+        Parameters:
+            name (str): What the value is, e.g. 'inferred_freq:rate_percent'
+            path (Path): File the value is derived from
+            compute (callable): compute() returns the value (JSON-serializable)
+
+        Returns:
+            The cached value if the file is unchanged, else compute()'s result
+        """
+        key = manifest_key(path)
+        content = self.current_hash(path)
+        with self._lock:
+            entry = self._data.get('memo', {}).get(name, {}).get(key)
+        if entry is not None and entry['hash'] == content:
+            return entry['value']
+        value = compute()
+        with self._lock:
+            self._data.setdefault('memo', {}).setdefault(name, {})[key] = {'hash': content, 'value': value}
+        return value
+
+    def memo_entries(self):
+        """All memo() values, for handing back from a worker process."""
+        with self._lock:
+            return {name: dict(entries) for name, entries in self._data.get('memo', {}).items()}
+
+    def update_memo(self, entries):
+        """Fold memo_entries() from a worker process into this manifest (in memory)."""
+        with self._lock:
+            memo = self._data.setdefault('memo', {})
+            for name, values in entries.items():
+                memo.setdefault(name, {}).update(values)
+
+    def merge(self, other_path):
+        """
+        Fold the file entries of another manifest into this one.
+
+        Used to combine the per-process manifests written by sharded
+        ingestion; entries from `other_path` win.
+
+        Returns:
+            int: Number of entries merged
+        """
+        other = Manifest(other_path)
+        with self._lock:
+            self._data['files'].update(other._data['files'])
+            self._save()
+        return len(other._data['files'])
+
+    def changed_inputs(self, stage, inputs):
+        """
+        List the inputs whose hash differs from the stage's last recorded run.
+
+        Returns:
+            list: Manifest keys of new or changed inputs (all of them if the
+                stage has never run)
+        """
+        with self._lock:
+            record = self._data['stages'].get(stage, {'inputs': {}})
+        return [manifest_key(p) for p in inputs if self.current_hash(p) != record['inputs'].get(manifest_key(p))]
+
+
+def write_if_changed(df, path, writer, manifest=None, content=None):
+    """
+    Write a DataFrame only if its content differs from what is on disk.
+
+    Parameters:
+        df (pd.DataFrame): Data to write (anything `writer` accepts if
+            `content` is given, e.g. a column_store.ColumnStore)
+        path (Path): Destination file
+        writer (callable): writer(df, path) performs the actual write
+        manifest (Manifest, optional): Defaults to get_manifest()
+        content (str, optional): frame_hash() of the data, if already known
+
+    Returns:
+        bool: True if the file was written, False if it was already up to date
+    """
+    manifest = manifest or get_manifest()
+    content = content or frame_hash(df)
+    if Path(path).exists() and manifest.content_unchanged(path, content):
+        return False
+    writer(df, path)
+    manifest.record_file(path, content)
+    return True
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest():
+    """Return the process-wide manifest, loading it on first use."""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = Manifest()
+        return _manifest
+
+
+def configure_manifest(path, base=MANIFEST_PATH):
+    """
+    Point this process at its own manifest file.
+
+    Worker processes must not rewrite the shared manifest concurrently, so
+    each writes to `path` (seeded with the file entries from `base`, so
+    unchanged-content checks still work) and the parent merges them back
+    with Manifest.merge().
+
+    Returns:
+        Manifest: The process-wide manifest
+    """
+    global _manifest
+    manifest = Manifest(path)
+    if base is not None:
+        seed = Manifest(base)
+        for key, entry in seed._data['files'].items():
+            manifest._data['files'].setdefault(key, entry)
+    with _manifest_lock:
+        _manifest = manifest
+    return manifest
@@ -0,0 +1,503 @@
+"""
+Per-Step Timing, Memory and Row-Count Metrics
+=============================================
+
+Lightweight instrumentation for the pipeline steps. Decorate a function
+with @instrumented (or wrap a block in `with span(...)`) and every call
+records:
+
+- Wall time
+- Rows in (the first DataFrame-like argument) and rows out (the return
+  value, or the first element of a returned tuple)
+- Resident memory at the end of the call and its change during the call,
+  plus the process's peak resident memory so far
+- With PIPELINE_TRACE_MEMORY=1, the peak Python/numpy allocation during
+  the call (tracemalloc). This is exact per call but slows allocation-heavy
+  code down, and calls running at the same time in other threads count
+  towards each other's peak
+
+Records are kept in memory by a process-wide collector (a few hundred bytes
+per call). They are written only when a metrics file is configured:
+
+    PIPELINE_METRICS=PATH       Write this run's metrics to PATH when the
+                                process exits. The format follows the
+                                extension: .prom for Prometheus text
+                                (textfile collector), .jsonl to append one
+                                JSON line per run, anything else for JSON
+    PIPELINE_METRICS_FORMAT=F   Override the format: json, jsonl or prometheus
+    PIPELINE_TRACE_MEMORY=1     Trace allocations (see above)
+
+run_pipeline.py also takes --metrics PATH. The JSON holds every call (with
+its labels and parent step) and per-step totals; the Prometheus file holds
+the per-step totals only, so its series don't grow with the registry.
+
+Usage:
+    from metrics import instrumented, span
+
+    @instrumented(labels=('series_id',))
+    def fetch_series(source, series_id, ...): ...
+
+    with span('align', freq='W') as step:
+        ...
+        step.rows_out = len(panel)
+
+    # Per-step totals of a saved run, and a regression check against a baseline
+    python code/metrics.py summary metrics.json
+    python code/metrics.py compare baseline.json metrics.json [--tolerance 0.25]
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import inspect
+import argparse
+import threading
+import functools
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_FORMATS = {'json', 'jsonl', 'prometheus'}
+
+# Steps faster than this are left out of `compare`; their timings are mostly noise
+MIN_COMPARE_SECONDS = 0.05
+
+DEFAULT_TOLERANCE = 0.25
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _rss_bytes():
+    """Current resident memory of this process, or None where /proc isn't available."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _peak_rss_bytes():
+    """Highest resident memory of this process so far, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # KB on Linux
+
+
+def _mb(n_bytes):
+    return None if n_bytes is None else round(n_bytes / 1024**2, 2)
+
+
+def count_rows(value):
+    """Rows in a DataFrame, Series, array or ColumnStore (or a tuple starting with one), else None."""
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    if hasattr(value, 'shape') and hasattr(value, '__len__'):
+        return len(value)
+    return None
+
+
+class Span:
+    """
+    One timed call or block; use span() or @instrumented rather than creating these directly.
+
+    Set `rows_in` / `rows_out` inside the block to report row counts that
+    can't be inferred.
+    """
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.rows_in = None
+        self.rows_out = None
+        self._child_peak = 0
+
+    def __enter__(self):
+        stack = self.metrics._stack()
+        self.parent = stack[-1] if stack else None
+        if self.metrics.trace_memory and tracemalloc.is_tracing():
+            # The parent's peak so far is kept before the peak is reset for this span
+            if self.parent is not None:
+                self.parent._child_peak = max(self.parent._child_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self._rss_start = _rss_bytes()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        self.metrics._stack().pop()
+        rss = _rss_bytes()
+        record = {
+            'name': self.name,
+            'labels': self.labels,
+            'parent': self.parent.name if self.parent is not None else None,
+            'thread': threading.current_thread().name,
+            'pid': os.getpid(),
+            'start_s': round(self._start - self.metrics.started, 6),
+            'elapsed_s': round(elapsed, 6),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'rss_mb': _mb(rss),
+            'rss_delta_mb': _mb(rss - self._rss_start) if rss is not None and self._rss_start is not None else None,
+            'peak_rss_mb': _mb(max(filter(None, (_peak_rss_bytes(), rss)), default=None)),
+            'error': exc_type.__name__ if exc_type is not None else None,
+        }
+        if self.metrics.trace_memory and tracemalloc.is_tracing():
+            record['peak_traced_mb'] = _mb(max(self._child_peak, tracemalloc.get_traced_memory()[1]))
+        self.metrics.record(record)
+        return False
+
+
+class Metrics:
+    """
+    Collects span records for this process and writes them out.
+
+    Parameters:
+        path (Path, optional): Where write() saves the run (None = don't save)
+        fmt (str, optional): json, jsonl or prometheus (default: from the extension)
+        trace_memory (bool): Measure per-span peak allocations with tracemalloc
+    """
+
+    def __init__(self, path=None, fmt=None, trace_memory=False):
+        self.path = None
+        self.fmt = None
+        self.trace_memory = False
+        self.records = []
+        self.started = time.perf_counter()
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._registered = False
+        self.configure(path, fmt, trace_memory)
+
+    def configure(self, path=None, fmt=None, trace_memory=None):
+        """Change the output file, format or memory tracing; None values are ignored."""
+        if fmt is not None and fmt not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format: {fmt} (expected one of {', '.join(sorted(METRICS_FORMATS))})")
+        if path is not None:
+            self.path = Path(path)
+            if not self._registered:
+                atexit.register(self.write)
+                self._registered = True
+        if fmt is not None:
+            self.fmt = fmt
+        if trace_memory is not None:
+            self.trace_memory = trace_memory
+            if trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **labels):
+        """Context manager timing a block as step `name`."""
+        return Span(self, name, labels)
+
+    def record(self, entry):
+        with self._lock:
+            self.records.append(entry)
+
+    def mark(self):
+        """Position to pass to since() later (for handing records back from a worker process)."""
+        with self._lock:
+            return len(self.records)
+
+    def since(self, mark):
+        """Records added after mark()."""
+        with self._lock:
+            return list(self.records[mark:])
+
+    def extend(self, records):
+        """Add records collected in a worker process."""
+        with self._lock:
+            self.records.extend(records)
+
+    def summary(self):
+        """
+        Per-step totals.
+
+        Returns:
+            dict: Step name to calls, errors, total_s, max_s, rows_in, rows_out
+                and the largest peak memory seen by any of its calls
+        """
+        with self._lock:
+            records = list(self.records)
+        return summarize(records)
+
+    def to_dict(self):
+        """The run as one JSON-serializable dict."""
+        with self._lock:
+            records = list(self.records)
+        return {
+            'script': Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else 'python',
+            'started_at': self.started_at,
+            'elapsed_s': round(time.perf_counter() - self.started, 3),
+            'peak_rss_mb': _mb(_peak_rss_bytes()),
+            'steps': summarize(records),
+            'spans': records,
+        }
+
+    def to_prometheus(self):
+        """Per-step totals in the Prometheus text exposition format."""
+        return prometheus_text(self.to_dict())
+
+    def write(self, path=None, fmt=None):
+        """
+        Save the run (atomically, except when appending to a .jsonl file).
+
+        Returns:
+            Path: File written, or None if no path is configured
+        """
+        path = Path(path) if path is not None else self.path
+        if path is None:
+            return None
+        fmt = fmt or self.fmt or metrics_format(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == 'jsonl':
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self.to_dict()) + '\n')
+            return path
+
+        text = self.to_prometheus() if fmt == 'prometheus' else json.dumps(self.to_dict(), indent=2)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return path
+
+
+def metrics_format(path):
+    """Output format implied by a file name."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.prom':
+        return 'prometheus'
+    if suffix == '.jsonl':
+        return 'jsonl'
+    return 'json'
+
+
+def summarize(records):
+    """Per-step totals of a list of span records (see Metrics.summary)."""
+    steps = {}
+    for r in records:
+        step = steps.setdefault(r['name'], {'calls': 0, 'errors': 0, 'total_s': 0.0, 'max_s': 0.0,
+                                            'rows_in': 0, 'rows_out': 0, 'peak_rss_mb': None})
+        step['calls'] += 1
+        step['errors'] += r['error'] is not None
+        step['total_s'] += r['elapsed_s']
+        step['max_s'] = max(step['max_s'], r['elapsed_s'])
+        step['rows_in'] += r['rows_in'] or 0
+        step['rows_out'] += r['rows_out'] or 0
+        for key in ('peak_rss_mb', 'peak_traced_mb'):
+            if r.get(key) is not None:
+                step[key] = max(step.get(key) or 0, r[key])
+    for step in steps.values():
+        step['total_s'] = round(step['total_s'], 6)
+    return steps
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(run):
+    """
+    Render a run (Metrics.to_dict()) as Prometheus text.
+
+    Every series carries a `script` label, so one textfile-collector
+    directory can hold the files of several scripts.
+    """
+    script = _label_value(run['script'])
+    metrics = [
+        ('pipeline_step_calls_total', 'counter', 'Calls of each instrumented step.', 'calls', 1),
+        ('pipeline_step_errors_total', 'counter', 'Calls of each step that raised.', 'errors', 1),
+        ('pipeline_step_seconds_total', 'counter', 'Wall time spent in each step.', 'total_s', 1),
+        ('pipeline_step_seconds_max', 'gauge', 'Slowest single call of each step.', 'max_s', 1),
+        ('pipeline_step_rows_in_total', 'counter', 'Rows passed into each step.', 'rows_in', 1),
+        ('pipeline_step_rows_out_total', 'counter', 'Rows returned by each step.', 'rows_out', 1),
+        ('pipeline_step_peak_rss_bytes', 'gauge', 'Process peak resident memory at the end of a call.',
+         'peak_rss_mb', 1024**2),
+        ('pipeline_step_peak_traced_bytes', 'gauge', 'Peak traced allocations during a call (tracemalloc).',
+         'peak_traced_mb', 1024**2),
+    ]
+    lines = []
+    for metric, kind, help_text, key, scale in metrics:
+        values = [(name, step[key]) for name, step in run['steps'].items() if step.get(key) is not None]
+        if not values:
+            continue
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, value in values:
+            lines.append(f'{metric}{{script="{script}",step="{_label_value(name)}"}} {value * scale:g}')
+
+    lines.append("# HELP pipeline_run_seconds Wall time of the run.")
+    lines.append("# TYPE pipeline_run_seconds gauge")
+    lines.append(f'pipeline_run_seconds{{script="{script}"}} {run["elapsed_s"]:g}')
+    if run['peak_rss_mb'] is not None:
+        lines.append("# HELP pipeline_run_peak_rss_bytes Peak resident memory of the run.")
+        lines.append("# TYPE pipeline_run_peak_rss_bytes gauge")
+        lines.append(f'pipeline_run_peak_rss_bytes{{script="{script}"}} {run["peak_rss_mb"] * 1024**2:g}')
+    return "\n".join(lines) + "\n"
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Return the process-wide collector, configured from environment variables on first use."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(
+                path=os.getenv('PIPELINE_METRICS') or None,
+                fmt=os.getenv('PIPELINE_METRICS_FORMAT') or None,
+                trace_memory=os.getenv('PIPELINE_TRACE_MEMORY', '').strip().lower() in ('1', 'true', 'yes', 'on'),
+            )
+        return _metrics
+
+
+def configure_metrics(path=None, fmt=None, trace_memory=None):
+    """
+    Override metrics settings (e.g. from command-line options).
+
+    Returns:
+        Metrics: The process-wide collector
+    """
+    metrics = get_metrics()
+    metrics.configure(path, fmt, trace_memory)
+    return metrics
+
+
+def span(name, **labels):
+    """Time a block as step `name` (see module docstring)."""
+    return get_metrics().span(name, **labels)
+
+
+def instrumented(func=None, *, name=None, labels=()):
+    """
+    Decorator recording every call of a function as a step.
+
+    Parameters:
+        name (str, optional): Step name (default: the function's name)
+        labels (tuple): Argument names whose values are recorded with each call
+
+    Usable bare (@instrumented) or with options (@instrumented(labels=('filename',))).
+    """
+    if func is None:
+        return functools.partial(instrumented, name=name, labels=labels)
+
+    step_name = name or func.__name__
+    signature = inspect.signature(func) if labels else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        call_labels = {}
+        if signature is not None:
+            bound = signature.bind_partial(*args, **kwargs)
+            call_labels = {label: str(bound.arguments[label]) for label in labels if label in bound.arguments}
+        with span(step_name, **call_labels) as step:
+            step.rows_in = next((rows for rows in map(count_rows, args) if rows is not None), None)
+            result = func(*args, **kwargs)
+            step.rows_out = count_rows(result)
+            return result
+
+    return wrapper
+
+
+# ------------------------------------------------------------------------------
+# Command line: summarize and compare saved runs
+# ------------------------------------------------------------------------------
+
+def load_run(path):
+    """A saved JSON run (the last one, for a .jsonl file)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if metrics_format(path) == 'jsonl':
+            lines = [line for line in f if line.strip()]
+            if not lines:
+                raise ValueError(f"No runs in {path}")
+            return json.loads(lines[-1])
+        return json.load(f)
+
+
+def print_summary(run):
+    """Print a run's per-step totals, slowest first."""
+    print(f"\n{run['script']} run at {run['started_at']}: {run['elapsed_s']:.2f}s, "
+          f"peak RSS {run['peak_rss_mb']} MB\n")
+    print(f"  {'step':32s} {'calls':>6s} {'total s':>9s} {'max s':>8s} {'rows out':>10s} {'peak MB':>9s}")
+    for name, step in sorted(run['steps'].items(), key=lambda item: -item[1]['total_s']):
+        peak = step.get('peak_traced_mb', step['peak_rss_mb'])
+        print(f"  {name:32s} {step['calls']:6d} {step['total_s']:9.3f} {step['max_s']:8.3f} "
+              f"{step['rows_out']:10,d} {peak if peak is not None else '':>9}")
+
+
+def compare_runs(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    Steps whose total time grew by more than `tolerance` (a fraction) over the baseline.
+
+    Steps under MIN_COMPARE_SECONDS in both runs are ignored.
+
+    Returns:
+        list: (step, baseline seconds, current seconds) per regression
+    """
+    regressions = []
+    for name, step in current['steps'].items():
+        before = baseline['steps'].get(name)
+        if before is None or max(before['total_s'], step['total_s']) < MIN_COMPARE_SECONDS:
+            continue
+        if step['total_s'] > before['total_s'] * (1 + tolerance):
+            regressions.append((name, before['total_s'], step['total_s']))
+    return regressions
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Summarize or compare saved pipeline metrics.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    summary = sub.add_parser('summary', help="print a run's per-step totals")
+    summary.add_argument('path', help="JSON or JSON-lines metrics file")
+    compare = sub.add_parser('compare', help="exit 1 if a step got slower than the baseline")
+    compare.add_argument('baseline', help="metrics of a known-good run")
+    compare.add_argument('current', help="metrics of the run to check")
+    compare.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                         help=f"allowed slowdown as a fraction (default: {DEFAULT_TOLERANCE})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    try:
+        if args.command == 'summary':
+            print_summary(load_run(args.path))
+            return 0
+
+        regressions = compare_runs(load_run(args.baseline), load_run(args.current), args.tolerance)
+        if not regressions:
+            print(f"✓ No step is more than {args.tolerance:.0%} slower than the baseline")
+            return 0
+        print(f"❌ {len(regressions)} step(s) more than {args.tolerance:.0%} slower than the baseline:")
+        for name, before, after in regressions:
+            change = f"{after / before - 1:+.0%}" if before else "new"
+            print(f"  • {name}: {before:.3f}s → {after:.3f}s ({change})")
+        return 1
+
+    except Exception as e:
+        print(f"\n❌ ERROR: {str(e)}\n", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+Raw Data Storage (CSV, Parquet or Feather)
+==========================================
+
+Reads and writes the per-series files in data/raw/. The fetch scripts write
+through write_raw() and every loader reads through read_raw(), so the storage
+format can be switched without touching the rest of the pipeline.
+
+Each raw file has a datetime64 'date' column followed by float64 value
+columns (vintage tables, see vintages.py, add a datetime64 'realtime_start').
+Parquet and Feather keep those types on disk, so loading a file skips CSV
+tokenising and date parsing entirely; for the long daily series this is most
+of clean_and_merge's load time. iter_raw() reads a file in fixed-size chunks
+instead, for consumers that stream it (clean_and_merge.py --stream).
+
+Files are addressed by their logical name from the fetch configs (e.g.
+'federal_funds_rate.csv'); the extension on disk follows the format, and
+read_raw() finds the file in whichever format it was saved. Writing a file
+removes any copy of it in another format, so a series never has two
+diverging raw files. A write whose content matches what is already on disk
+is skipped (see manifest.py), so unchanged series keep their file untouched.
+
+Configuration (environment variables, or --raw-format / --raw-compression on
+the fetch scripts):
+    RAW_FORMAT=csv|parquet|feather      Format for new writes (default: csv)
+    RAW_COMPRESSION=<codec>             Parquet: snappy (default), zstd, gzip, none
+                                        Feather: lz4 (default), zstd, uncompressed
+                                        Ignored for CSV
+
+Usage:
+    from raw_storage import read_raw, write_raw, iter_raw
+
+    df = read_raw('federal_funds_rate.csv')
+    for chunk in iter_raw('federal_funds_rate.csv', chunksize=50_000):
+        ...
+    write_raw(df, 'federal_funds_rate.csv')
+
+    # Convert every existing raw file
+    python code/raw_storage.py convert --format parquet --compression zstd
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+import pandas as pd
+from config_paths import RAW_DATA_DIR
+from manifest import write_if_changed
+
+# Columns stored as datetime64 rather than float64
+DATE_COLUMNS = ('date', 'realtime_start')
+
+# Rows per chunk yielded by iter_raw()
+DEFAULT_CHUNK_ROWS = 100_000
+
+RAW_FORMATS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+DEFAULT_FORMAT = 'csv'
+
+_format = os.getenv('RAW_FORMAT', DEFAULT_FORMAT).strip().lower()
+_compression = os.getenv('RAW_COMPRESSION') or None
+
+
+def configure_storage(fmt=None, compression=None):
+    """
+    Override the raw storage format (e.g. from command-line options).
+
+    None values are ignored.
+
+    Parameters:
+        fmt (str, optional): 'csv', 'parquet' or 'feather'
+        compression (str, optional): Codec for the columnar formats
+    """
+    global _format, _compression
+    if fmt is not None:
+        if fmt not in RAW_FORMATS:
+            raise ValueError(f"Unknown raw format: {fmt} (expected one of {', '.join(RAW_FORMATS)})")
+        _format = fmt
+    if compression is not None:
+        _compression = compression
+
+
+def get_format():
+    """Return the format used for new raw writes."""
+    if _format not in RAW_FORMATS:
+        raise ValueError(f"Unknown raw format: {_format} (expected one of {', '.join(RAW_FORMATS)})")
+    return _format
+
+
+def raw_path(filename, fmt=None, raw_dir=RAW_DATA_DIR):
+    """
+    Path of a raw file in the given format.
+
+    Parameters:
+        filename (str): Logical file name from the fetch configs (e.g. 'M2.csv')
+        fmt (str, optional): Storage format (default: configured format)
+
+    Returns:
+        Path: File path with the format's extension
+    """
+    return raw_dir / (Path(filename).stem + RAW_FORMATS[fmt or get_format()])
+
+
+def find_raw(filename, raw_dir=RAW_DATA_DIR):
+    """
+    Locate a raw file in whichever format it was saved.
+
+    The configured format is checked first.
+
+    Returns:
+        tuple: (Path, format), or (None, None) if no file exists
+    """
+    preferred = get_format()
+    for fmt in [preferred] + [f for f in RAW_FORMATS if f != preferred]:
+        path = raw_path(filename, fmt, raw_dir)
+        if path.exists():
+            return path, fmt
+    return None, None
+
+
+def raw_exists(filename, raw_dir=RAW_DATA_DIR):
+    """True if the raw file exists in any format."""
+    return find_raw(filename, raw_dir)[0] is not None
+
+
+def read_raw(filename, columns=None, raw_dir=RAW_DATA_DIR, date_format=None):
+    """
+    Load a raw series file in any supported format.
+
+    Parameters:
+        filename (str): Logical file name (e.g. 'federal_funds_rate.csv')
+        columns (list, optional): Columns to load (default: all)
+        date_format (str, optional): strftime format of the dates in a CSV
+            file (e.g. '%Y-%m-%d'). They are then parsed while the file is
+            read, which is faster than inferring the format afterwards;
+            dates that don't match it fall back to inference
+
+    Returns:
+        pd.DataFrame: 'date' as datetime64 plus the value columns
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist in any format
+    """
+    path, fmt = find_raw(filename, raw_dir)
+    if path is None:
+        raise FileNotFoundError(f"No raw data file for {filename} in {raw_dir}")
+
+    if fmt == 'parquet':
+        df = pd.read_parquet(path, columns=columns)
+    elif fmt == 'feather':
+        df = pd.read_feather(path, columns=columns)
+    else:
+        df = pd.read_csv(path, usecols=columns, float_precision='round_trip',
+                         **_csv_date_options(path, columns, date_format))
+
+    return _parse_dates(df)
+
+
+def _csv_date_options(path, columns, date_format):
+    """read_csv() arguments that parse the date columns with an explicit format."""
+    if date_format is None:
+        return {}
+    header = pd.read_csv(path, nrows=0).columns
+    dates = [col for col in DATE_COLUMNS if col in header and (columns is None or col in columns)]
+    return {'parse_dates': dates, 'date_format': date_format} if dates else {}
+
+
+def _parse_dates(df):
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def iter_raw(filename, columns=None, chunksize=DEFAULT_CHUNK_ROWS, raw_dir=RAW_DATA_DIR, date_format=None):
+    """
+    Read a raw series file in chunks of at most `chunksize` rows, in file order.
+
+    Only one chunk is held in memory at a time (for Feather, one record batch
+    of the memory-mapped file), so arbitrarily long files can be streamed.
+    Chunks are typed exactly like read_raw(), and date_format works the same.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the file
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist in any format
+    """
+    path, fmt = find_raw(filename, raw_dir)
+    if path is None:
+        raise FileNotFoundError(f"No raw data file for {filename} in {raw_dir}")
+
+    if fmt == 'csv':
+        with pd.read_csv(path, usecols=columns, float_precision='round_trip', chunksize=chunksize,
+                         **_csv_date_options(path, columns, date_format)) as reader:
+            for chunk in reader:
+                yield _parse_dates(chunk)
+        return
+
+    import pyarrow as pa
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns)
+        for batch in batches:
+            yield _parse_dates(batch.to_pandas())
+        return
+
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for offset in range(0, batch.num_rows, chunksize):
+                yield _parse_dates(batch.slice(offset, chunksize).to_pandas())
+
+
+def write_raw(df, filename, fmt=None, compression=None, raw_dir=RAW_DATA_DIR):
+    """
+    Save a raw series file, replacing any copy of it in another format.
+
+    Nothing is written if the file already holds exactly this data.
+
+    Parameters:
+        df (pd.DataFrame): 'date' column plus value columns
+        filename (str): Logical file name (e.g. 'federal_funds_rate.csv')
+        fmt (str, optional): Storage format (default: configured format)
+        compression (str, optional): Codec for the columnar formats
+            (default: RAW_COMPRESSION, then the library default)
+
+    Returns:
+        Path: The file written
+    """
+    fmt = fmt or get_format()
+    options = {}
+    codec = compression or _compression
+    if codec is not None:
+        if codec.lower() == 'none':
+            codec = None if fmt == 'parquet' else 'uncompressed'
+        options['compression'] = codec
+
+    df = df.reset_index(drop=True)
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col]).astype('datetime64[ns]')
+    value_cols = [col for col in df.columns if col not in DATE_COLUMNS]
+    df[value_cols] = df[value_cols].astype('float64')
+
+    def writer(data, path):
+        if fmt == 'parquet':
+            data.to_parquet(path, index=False, **options)
+        elif fmt == 'feather':
+            data.to_feather(path, **options)
+        else:
+            data.to_csv(path, index=False)
+
+    path = raw_path(filename, fmt, raw_dir)
+    write_if_changed(df, path, writer)
+
+    for other in RAW_FORMATS:
+        stale = raw_path(filename, other, raw_dir)
+        if other != fmt and stale.exists():
+            stale.unlink()
+    return path
+
+
+def last_saved_date(filename, raw_dir=RAW_DATA_DIR):
+    """
+    Last date stored in a raw file, reading as little of it as possible.
+
+    CSV files are read from the end (only the final line is parsed); the
+    columnar formats load just the 'date' column.
+
+    Returns:
+        pd.Timestamp: Last saved date, or None if the file doesn't exist or has no rows
+    """
+    path, fmt = find_raw(filename, raw_dir)
+    if path is None:
+        return None
+
+    if fmt != 'csv':
+        dates = read_raw(filename, columns=['date'], raw_dir=raw_dir)['date']
+        return dates.max() if len(dates) else None
+
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 4096))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+
+    if len(lines) == 0:
+        return None
+    last_date = lines[-1].decode('utf-8').split(',')[0]
+    if last_date == 'date':
+        return None
+    return pd.Timestamp(last_date)
+
+
+def convert_all(fmt, compression=None, raw_dir=RAW_DATA_DIR):
+    """
+    Rewrite every raw file in raw_dir in the given format.
+
+    Returns:
+        list: (logical file name, bytes before, bytes after) per file
+    """
+    names = sorted({path.stem for path in raw_dir.iterdir()
+                    if path.suffix in RAW_FORMATS.values()})
+    converted = []
+    for stem in names:
+        filename = f"{stem}.csv"
+        path, _ = find_raw(filename, raw_dir)
+        before = path.stat().st_size
+        df = read_raw(filename, raw_dir=raw_dir)
+        after = write_raw(df, filename, fmt, compression, raw_dir).stat().st_size
+        converted.append((filename, before, after))
+    return converted
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Manage the storage format of data/raw/.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    convert = sub.add_parser('convert', help="rewrite every raw file in another format")
+    convert.add_argument('--format', choices=list(RAW_FORMATS), required=True)
+    convert.add_argument('--compression', default=None,
+                         help="codec for parquet/feather (e.g. snappy, zstd, lz4, none)")
+
+    sub.add_parser('bench', help="time loading every raw file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    if args.command == 'convert':
+        converted = convert_all(args.format, args.compression)
+        for filename, before, after in converted:
+            print(f"  ✓ {Path(filename).stem:25s} {before / 1024:8.1f} KB → {after / 1024:8.1f} KB")
+        print(f"\n✓ Converted {len(converted)} files to {args.format} in: {RAW_DATA_DIR}")
+        return 0
+
+    total = 0.0
+    for path in sorted(RAW_DATA_DIR.iterdir()):
+        if path.suffix not in RAW_FORMATS.values():
+            continue
+        start = time.perf_counter()
+        df = read_raw(path.name)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"  {path.name:30s} {len(df):>7,} rows  {elapsed * 1000:7.2f} ms")
+    print(f"\nTotal load time: {total * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
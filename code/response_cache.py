@@ -0,0 +1,245 @@
+"""
+On-Disk HTTP Response Cache for the Data Fetchers
+=================================================
+
+Caches the responses returned by FRED (fetch_all_fred_economic_data.py) and
+Yahoo Finance (fetch_asset_prices.py) so repeat runs don't hit the network for
+identical requests.
+
+Live fetches only use the cache when asked to (FETCH_CACHE=1 or --cache), so
+a production refresh never silently reuses an old response. Requests to the
+recorded backends (--source local/replay, see data_sources.py) are cached
+by default, and offline mode always reads from the cache. Every response
+served from the cache is logged with its age.
+
+Entries are keyed by source, series ID/ticker and date range, expire after a
+configurable TTL, and the least recently used entries are evicted once the
+cache grows past a size limit. In offline mode every request is served from
+the cache (ignoring the TTL) and a missing entry is an error, so the whole
+pipeline can run without network access.
+
+Configuration (environment variables, or the matching command-line options
+on the fetch scripts):
+    FETCH_CACHE=1|0         Cache every backend, live included (--cache), or
+                            none of them (--no-cache); default: recorded backends only
+    FETCH_CACHE_TTL=S       Entry lifetime in seconds, default 43200 (--cache-ttl)
+    FETCH_CACHE_MAX_MB=N    Size limit before eviction, default 512
+    FETCH_OFFLINE=1         Serve only from the cache (--offline)
+
+Usage:
+    from response_cache import get_cache
+
+    data = get_cache().fetch('fred', 'DFF', start, end,
+                             lambda: fred.get_series('DFF'))
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import threading
+from datetime import date, datetime
+from config_paths import CACHE_DIR
+
+DEFAULT_TTL = 12 * 60 * 60  # seconds
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _env_flag(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _normalize_date(value):
+    """Reduce a date-like value to 'YYYY-MM-DD' so keys are stable within a day."""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    if hasattr(value, 'strftime'):  # pd.Timestamp
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+
+def _format_age(seconds):
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 2 * 3600:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+class ResponseCache:
+    """
+    Pickle-per-entry response cache with TTL, LRU size eviction and offline mode.
+    
+    Parameters:
+        cache_dir (Path): Directory holding cache entries
+        ttl (float): Seconds before an entry is considered stale
+        max_bytes (int): Total size limit; oldest-used entries are evicted beyond it
+        offline (bool): Serve only from the cache, never call the network
+        enabled (bool): True caches every source, False none; None (default)
+            caches only the recorded backends, never live requests
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES,
+                 offline=False, enabled=None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, source, identifier, start=None, end=None):
+        """Build the cache key for a request."""
+        raw = '|'.join([source, str(identifier), _normalize_date(start), _normalize_date(end)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.pkl"
+
+    def caches(self, source):
+        """
+        Whether requests for `source` go through the cache.
+
+        Recorded backends namespace their entries as '<backend>:<kind>'
+        (DataSource.cache_key); plain 'fred'/'yahoo' entries are live.
+        """
+        if self.offline:
+            return True
+        if self.enabled is None:
+            return ':' in source
+        return self.enabled
+
+    def _lookup(self, source, identifier, start=None, end=None):
+        """Return (value, age in seconds), or (None, None) if missing or expired."""
+        path = self._path(self.key(source, identifier, start, end))
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None, None
+        if not self.offline and age > self.ttl:
+            return None, None
+
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None, None
+
+        # Record the access for LRU eviction without resetting the TTL clock
+        os.utime(path, (time.time(), path.stat().st_mtime))
+        return value, age
+
+    def get(self, source, identifier, start=None, end=None):
+        """
+        Look up a cached response.
+        
+        Returns:
+            object: Cached value, or None if missing or expired (TTL is
+                    ignored in offline mode)
+        """
+        return self._lookup(source, identifier, start, end)[0]
+
+    def put(self, source, identifier, start, end, value):
+        """Store a response and evict old entries if the cache is over its size limit."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(self.key(source, identifier, start, end))
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def fetch(self, source, identifier, start, end, fetch_fn):
+        """
+        Return a cached response, calling fetch_fn() and caching its result on a miss.
+        
+        Parameters:
+            source (str): Data source name ('fred', 'yahoo', ...)
+            identifier (str): Series ID or ticker
+            start, end: Requested date range (None for open-ended)
+            fetch_fn (callable): Performs the actual network request
+        
+        Returns:
+            object: Response value
+        """
+        if not self.caches(source):
+            return fetch_fn()
+
+        value, age = self._lookup(source, identifier, start, end)
+        if value is not None:
+            self.hits += 1
+            print(f"    ↺ {source} {identifier}: cached response from {_format_age(age)} ago")
+            return value
+
+        self.misses += 1
+        if self.offline:
+            raise RuntimeError(f"Offline mode: no cached response for {source} {identifier} "
+                               f"({_normalize_date(start) or 'start'} to {_normalize_date(end) or 'latest'})")
+
+        value = fetch_fn()
+        if value is not None:
+            self.put(source, identifier, start, end, value)
+        return value
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob('*.pkl'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self):
+        """Remove every cache entry."""
+        for path in self.cache_dir.glob('*.pkl'):
+            path.unlink(missing_ok=True)
+
+
+_cache = None
+
+
+def get_cache():
+    """Return the process-wide cache, configured from environment variables on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(
+            ttl=float(os.getenv('FETCH_CACHE_TTL', DEFAULT_TTL)),
+            max_bytes=int(float(os.getenv('FETCH_CACHE_MAX_MB', DEFAULT_MAX_BYTES / 1024**2)) * 1024**2),
+            offline=_env_flag('FETCH_OFFLINE', False),
+            enabled=_env_flag('FETCH_CACHE', None),
+        )
+    return _cache
+
+
+def configure_cache(**options):
+    """
+    Override cache settings (e.g. from command-line options).
+    
+    Parameters:
+        **options: Any of ttl, max_bytes, offline, enabled; None values are ignored
+    
+    Returns:
+        ResponseCache: The process-wide cache
+    """
+    cache = get_cache()
+    for name, value in options.items():
+        if value is not None:
+            setattr(cache, name, value)
+    return cache
@@ -0,0 +1,374 @@
+"""
+Retry and Rate-Limit Policy for the Data Fetchers
+=================================================
+
+Shared by fetch_all_fred_economic_data.py and fetch_asset_prices.py so a
+transient 429, 5xx or network timeout doesn't silently drop a series.
+
+- RetryPolicy:   exponential backoff with full jitter, honouring Retry-After
+- TokenBucket:   thread-safe rate limiter shared by all worker threads
+- call_with_retry(): runs a request under both
+- deadline_at():     caps everything a worker thread does for one job
+                     (rate-limit waits, backoff and each request's timeout)
+
+FRED allows 120 requests per minute per API key. fred_rate_limiter() returns
+a process-wide bucket sized so that no 60-second window can exceed that,
+even when concurrent workers drain the initial burst at once.
+
+Usage:
+    from retry_policy import call_with_retry, fred_rate_limiter
+
+    data = call_with_retry(lambda: fred.get_series('DFF'),
+                           limiter=fred_rate_limiter(), description='DFF')
+"""
+
+import time
+import random
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import requests
+
+FRED_REQUESTS_PER_MINUTE = 120
+FRED_BURST = 10
+
+# A process's slice of the FRED budget must cover its one-request burst plus
+# at least this many refilled requests per minute
+MIN_FRED_REFILL_PER_MINUTE = 1
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# requests exceptions worth retrying: refused/reset connections, timeouts and
+# responses cut off mid-body. Every requests exception subclasses OSError, so
+# they have to be told apart before is_retryable's OSError fallback
+RETRYABLE_REQUESTS_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The calling thread's deadline (see deadline_at) has passed."""
+
+
+_local = threading.local()
+
+
+@contextmanager
+def deadline_at(when):
+    """
+    Give every request this thread makes inside the block until `when`.
+
+    Rate-limit waits and retry backoff stop at the deadline, and
+    request_timeout() shortens each request's timeout to the time left, so a
+    job that runs out of time raises DeadlineExceeded instead of carrying on
+    in the background.
+
+    Parameters:
+        when (float): time.monotonic() value, or None for no deadline
+    """
+    previous = getattr(_local, 'deadline', None)
+    _local.deadline = when
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def time_remaining():
+    """Seconds left before this thread's deadline, or None if it has none."""
+    when = getattr(_local, 'deadline', None)
+    if when is None:
+        return None
+    return when - time.monotonic()
+
+
+def check_deadline(description='request'):
+    """Raise DeadlineExceeded if this thread's deadline has passed."""
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"{description}: deadline exceeded")
+
+
+def request_timeout(timeout):
+    """A request's timeout, shortened to the time left before this thread's deadline."""
+    check_deadline()
+    remaining = time_remaining()
+    if remaining is None:
+        return timeout
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    Parameters:
+        max_attempts (int): Total attempts, including the first one
+        base_delay (float): Backoff before the first retry, in seconds
+        max_delay (float): Upper bound on any single backoff
+        jitter (bool): Randomise each backoff in [0, delay] to avoid retry storms
+    """
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=30.0, jitter=True):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retry number `attempt` (1-based).
+
+        A server-provided Retry-After is always respected, even above max_delay.
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        if retry_after is not None:
+            return max(retry_after, backoff)
+        return backoff
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Parameters:
+        rate (float): Tokens added per second
+        capacity (float): Maximum burst size
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Block until `tokens` are available, then take them.
+
+        Raises:
+            DeadlineExceeded: If this thread's deadline passes while waiting
+        """
+        while True:
+            check_deadline('rate limiter')
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = max(self._paused_until - now, (tokens - self._tokens) / self.rate)
+            remaining = time_remaining()
+            time.sleep(wait if remaining is None else max(0.0, min(wait, remaining)))
+
+    def pause(self, seconds):
+        """Hold back every caller for `seconds` (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+def http_status(exc):
+    """Extract an HTTP status code from urllib, requests or similar exceptions."""
+    for attr in ('code', 'status', 'status_code'):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, 'response', None)
+    if response is not None:
+        return getattr(response, 'status_code', None)
+    return None
+
+
+def retry_after_seconds(exc):
+    """
+    Read a Retry-After header (seconds or HTTP date) from an exception, if any.
+
+    Returns:
+        float: Seconds to wait, or None
+    """
+    headers = getattr(exc, 'headers', None)
+    if headers is None and getattr(exc, 'response', None) is not None:
+        headers = getattr(exc.response, 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(exc):
+    """
+    Decide whether a failed request is worth retrying.
+
+    Retries rate limiting, server errors (RETRYABLE_STATUS), timeouts and
+    connection failures. Client errors such as an unknown series ID, and
+    request errors such as an invalid URL or missing schema, are not retried.
+    """
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    # HTTP errors from data_sources (requests.HTTPError) carry the response
+    status = http_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+
+    # yfinance reports rate limiting without a status code
+    message = str(exc).lower()
+    if 'too many requests' in message or 'rate limit' in message:
+        return True
+    if type(exc).__name__ == 'YFRateLimitError':
+        return True
+
+    if isinstance(exc, requests.exceptions.SSLError):
+        return False
+    if isinstance(exc, RETRYABLE_REQUESTS_ERRORS):
+        return True
+    if isinstance(exc, requests.RequestException):
+        return False
+    if isinstance(exc, (FileNotFoundError, PermissionError)):
+        return False
+    # Timeouts, refused/reset connections and urllib's URLError
+    return isinstance(exc, (TimeoutError, ConnectionError, OSError))
+
+
+def is_rate_limited(exc):
+    """True if the server told us to slow down."""
+    return http_status(exc) == 429 or 'too many requests' in str(exc).lower()
+
+
+def call_with_retry(fn, policy=None, limiter=None, description='request'):
+    """
+    Call fn() with rate limiting and retries.
+
+    Parameters:
+        fn (callable): Performs one request
+        policy (RetryPolicy, optional): Backoff policy (default: get_retry_policy())
+        limiter (TokenBucket, optional): Rate limiter consulted before every attempt
+        description (str): Used in retry messages
+
+    Returns:
+        object: fn()'s return value
+
+    Raises:
+        The last exception once attempts are exhausted or the error isn't retryable
+        DeadlineExceeded: If this thread's deadline (see deadline_at) passes first
+    """
+    policy = policy or get_retry_policy()
+    for attempt in range(1, policy.max_attempts + 1):
+        check_deadline(description)
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == policy.max_attempts or not is_retryable(e):
+                raise
+            retry_after = retry_after_seconds(e)
+            delay = policy.delay(attempt, retry_after)
+            if limiter is not None and is_rate_limited(e):
+                # Back everyone off, not just this worker
+                limiter.pause(delay)
+            print(f"    ↻ {description}: {type(e).__name__}: {e} - retry {attempt}/{policy.max_attempts - 1} "
+                  f"in {delay:.1f}s")
+            remaining = time_remaining()
+            time.sleep(delay if remaining is None else max(0.0, min(delay, remaining)))
+
+
+_policy = RetryPolicy()
+_fred_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_retry_policy():
+    """Return the process-wide retry policy."""
+    return _policy
+
+
+def configure_retries(max_attempts=None, base_delay=None, max_delay=None):
+    """Override retry settings (e.g. from command-line options); None values are ignored."""
+    if max_attempts is not None:
+        _policy.max_attempts = max(1, max_attempts)
+    if base_delay is not None:
+        _policy.base_delay = base_delay
+    if max_delay is not None:
+        _policy.max_delay = max_delay
+    return _policy
+
+
+def _fred_refill_per_minute(share):
+    """Requests per minute left for refill once `share` of the FRED budget has paid for its burst."""
+    return FRED_REQUESTS_PER_MINUTE * share - max(1.0, FRED_BURST * share)
+
+
+def max_fred_shares():
+    """Most processes the FRED budget can be split across (each keeping MIN_FRED_REFILL_PER_MINUTE)."""
+    n = FRED_REQUESTS_PER_MINUTE
+    while n > 1 and _fred_refill_per_minute(1.0 / n) < MIN_FRED_REFILL_PER_MINUTE:
+        n -= 1
+    return n
+
+
+def _fred_bucket(share=1.0):
+    """
+    Token bucket for `share` of the FRED budget (burst + one minute of refill stays within it).
+
+    Raises:
+        ValueError: If the share is too small to refill at MIN_FRED_REFILL_PER_MINUTE
+    """
+    capacity = max(1.0, FRED_BURST * share)
+    refill = _fred_refill_per_minute(share)
+    if refill < MIN_FRED_REFILL_PER_MINUTE:
+        raise ValueError(f"A {share:.3g} share of FRED's {FRED_REQUESTS_PER_MINUTE} requests/minute is too small "
+                         f"to rate-limit; split the budget across at most {max_fred_shares()} processes")
+    return TokenBucket(rate=refill / 60.0, capacity=capacity)
+
+
+def fred_rate_limiter():
+    """
+    Return the process-wide FRED token bucket.
+
+    Refill rate leaves room for the initial burst, so burst + one minute of
+    refill stays within FRED_REQUESTS_PER_MINUTE.
+    """
+    global _fred_limiter
+    with _limiter_lock:
+        if _fred_limiter is None:
+            _fred_limiter = _fred_bucket()
+    return _fred_limiter
+
+
+def configure_fred_rate_limit(share=1.0):
+    """
+    Limit this process to a fraction of the FRED budget.
+
+    Used by sharded ingestion (ingest_sharded.py), where each worker process
+    gets 1/N of the per-key limit so the shards together stay within it.
+
+    Parameters:
+        share (float): Fraction of FRED_REQUESTS_PER_MINUTE for this process
+
+    Returns:
+        TokenBucket: The process-wide FRED token bucket
+    """
+    global _fred_limiter
+    with _limiter_lock:
+        _fred_limiter = _fred_bucket(share)
+    return _fred_limiter
@@ -0,0 +1,398 @@
+"""
+Run the Whole Pipeline in One Process
+=====================================
+
+Runs fetch → clean → model as one DAG of stages in a single Python process,
+instead of four scripts that each re-import pandas (and the modeling
+libraries) and re-read the previous stage's CSV:
+
+    fetch ──┬── clean:ME ───── models
+            └── native ──┬──── panel:W
+                         └──── panel:D
+
+- A stage starts as soon as the stages it depends on have finished, in a
+  thread pool, so independent stages overlap (the models fit while the
+  weekly and daily panels are built; clean:ME and the native-frequency load
+  read the raw files side by side)
+- A stage is skipped when the manifest shows its inputs and outputs are
+  unchanged since its last run (see manifest.py); stages that depend on it
+  then read its outputs from disk as usual
+- Frames are handed between stages in memory: the models fit on the merged
+  panel clean:ME just built rather than re-reading merged_analysis_panel.csv,
+  and the weekly and daily panels share one load of the native series
+- The modeling libraries are imported only when the models stage runs
+- Each stage's log is printed as one block when it finishes, followed by
+  a summary of every stage's status and wall time
+
+Stage failures (including a data-quality gate, see data_quality.py) stop
+only the stages that depend on the failed one.
+
+Usage:
+    python code/run_pipeline.py [--skip-fetch] [--skip-models] [--force] [--frequencies ME W D]
+                                [--jobs N] [--incremental] [--json summary.json] [--metrics metrics.prom]
+
+Options:
+    --skip-fetch    Use the raw files already in data/raw/
+    --skip-models   Stop after building the panels
+    --force         Run every stage even if its inputs are unchanged
+    --frequencies F Panels to build: ME (monthly, default), W and/or D (see
+                    clean_and_merge.py). The monthly panel is always built
+                    when the models run
+    --jobs N        Stages run at once (default: 4)
+    --clean-jobs N  Worker processes for cleaning the monthly datasets
+                    (clean_and_merge.py --jobs; default: 1, 0 = one per core)
+    --incremental   Fetch FRED series after the last saved date, and patch
+                    the monthly outputs from their first changed row
+    --stream, --out-of-core, --no-quality-gate
+                    As for clean_and_merge.py
+    --compact       As for capstone_models.py
+    --source NAME, --source-path P, --offline
+                    Data source options for the fetch (see ingest_all.py)
+    --json PATH     Also write the per-stage results as JSON
+    --metrics PATH  Write per-step timing, memory and row counts when the run
+                    ends (see metrics.py; same as PIPELINE_METRICS=PATH)
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# The models plot from a worker thread; keep matplotlib off any GUI backend
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from config_paths import CODE_DIR
+from manifest import get_manifest
+from metrics import configure_metrics, span
+from data_sources import SOURCE_NAMES
+from column_store import ColumnStore
+import clean_and_merge
+from clean_and_merge import PANEL_FREQUENCIES, MERGED_PANEL_FILE, panel_stage, stage_inputs
+
+DEFAULT_JOBS = 4
+
+MODELS_STAGE = 'capstone_models'
+
+
+class Stage:
+    """
+    One step of the pipeline DAG.
+
+    Parameters:
+        name (str): Stage name, used in the logs and summary
+        run (callable): run(upstream) does the work; `upstream` maps each
+            required stage's name to the value its run() returned (None if
+            that stage was skipped). The return value is handed to dependents.
+        requires (tuple): Names of the stages that must finish first
+        is_current (callable, optional): is_current() returns True when the
+            stage's outputs are up to date and it can be skipped. Stages
+            without one always run.
+    """
+
+    def __init__(self, name, run, requires=(), is_current=None):
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+        self.is_current = is_current
+
+
+class _StageOutput(io.TextIOBase):
+    """
+    Stand-in for sys.stdout/sys.stderr that sends each stage thread's output to its own buffer.
+
+    Output from any other thread (the scheduler, or threads a stage starts
+    itself) goes straight to the real stream.
+    """
+
+    def __init__(self, stream, buffers):
+        self.stream = stream
+        self.buffers = buffers
+
+    def write(self, text):
+        buffer = self.buffers.get(threading.get_ident())
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    @property
+    def encoding(self):
+        return self.stream.encoding
+
+
+def _run_stage(buffers, stage, upstream):
+    """Run one stage in a worker thread, capturing its output."""
+    log = io.StringIO()
+    buffers[threading.get_ident()] = log
+    start = time.perf_counter()
+    value, error = None, None
+    try:
+        with span(f"stage:{stage.name}"):
+            value = stage.run(upstream)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        traceback.print_exc(file=log)
+    finally:
+        del buffers[threading.get_ident()]
+    return value, error, log.getvalue(), time.perf_counter() - start
+
+
+def _print_stage_log(name, status, elapsed, log):
+    print("\n" + "-" * 70)
+    print(f"[{name}] {status} in {elapsed:.2f}s")
+    print("-" * 70)
+    print(log, end='' if log.endswith('\n') else '\n')
+
+
+def run_stages(stages, jobs=DEFAULT_JOBS, force=False):
+    """
+    Run a DAG of stages, each as soon as its dependencies have finished.
+
+    Parameters:
+        stages (list): Stage objects, each listed after the stages it requires
+        jobs (int): Stages run at once
+        force (bool): Run stages even when is_current() says they're up to date
+
+    Returns:
+        list: One result dict per stage, in `stages` order, with 'stage',
+            'status' ('ran', 'skipped', 'failed' or 'blocked'), 'elapsed_s'
+            and 'error'
+    """
+    names = set()
+    for stage in stages:
+        missing = [dep for dep in stage.requires if dep not in names]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' requires {', '.join(missing)}, "
+                             f"which must be listed before it")
+        names.add(stage.name)
+
+    pending = {stage.name: stage for stage in stages}
+    results = {}
+    values = {}
+    running = {}
+    buffers = {}
+
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = _StageOutput(stdout, buffers), _StageOutput(stderr, buffers)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if any(dep not in results for dep in stage.requires):
+                        continue
+                    del pending[name]
+                    failed = [dep for dep in stage.requires if results[dep]['status'] in ('failed', 'blocked')]
+                    if failed:
+                        results[name] = {'stage': name, 'status': 'blocked', 'elapsed_s': 0.0,
+                                         'error': f"Not run: {', '.join(failed)} failed"}
+                        print(f"  ✗ {name}: not run ({', '.join(failed)} failed)")
+                    elif not force and stage.is_current is not None and stage.is_current():
+                        results[name] = {'stage': name, 'status': 'skipped', 'elapsed_s': 0.0, 'error': None}
+                        values[name] = None
+                        print(f"  = {name}: inputs unchanged, skipped")
+                    else:
+                        print(f"  ▶ {name}: started")
+                        upstream = {dep: values.get(dep) for dep in stage.requires}
+                        running[executor.submit(_run_stage, buffers, stage, upstream)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    value, error, log, elapsed = future.result()
+                    status = 'failed' if error else 'ran'
+                    results[name] = {'stage': name, 'status': status, 'elapsed_s': round(elapsed, 3),
+                                     'error': error}
+                    values[name] = value
+                    _print_stage_log(name, 'FAILED' if error else 'finished', elapsed, log)
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+    return [results[stage.name] for stage in stages]
+
+
+# ------------------------------------------------------------------------------
+# Pipeline stages
+# ------------------------------------------------------------------------------
+
+def model_inputs():
+    """Files the models depend on: the merged panel and the modeling scripts."""
+    return [MERGED_PANEL_FILE, CODE_DIR / 'capstone_models.py', CODE_DIR / 'compact_panel.py']
+
+
+def build_stages(args):
+    """
+    The pipeline DAG for the given options.
+
+    Returns:
+        list: Stage objects in dependency order
+    """
+    manifest = get_manifest()
+    frequencies = list(dict.fromkeys(args.frequencies))
+    if not args.skip_models and 'ME' not in frequencies:
+        frequencies.insert(0, 'ME')
+    extra = [freq for freq in frequencies if freq != 'ME']
+    stages = []
+
+    def panel_is_current(freq):
+        return lambda: manifest.stage_is_current(panel_stage(freq), stage_inputs())
+
+    fetch = []
+    if not args.skip_fetch:
+        def run_fetch(upstream):
+            import ingest_all
+            argv = []
+            if args.incremental:
+                argv.append('--incremental')
+            if args.offline:
+                argv.append('--offline')
+            if args.source:
+                argv += ['--source', args.source]
+            if args.source_path:
+                argv += ['--source-path', args.source_path]
+            if ingest_all.main(argv) != 0:
+                raise RuntimeError("Some series or tickers could not be fetched")
+
+        stages.append(Stage('fetch', run_fetch))
+        fetch = ['fetch']
+
+    if 'ME' in frequencies:
+        def run_clean(upstream):
+            return clean_and_merge.build_monthly_panel(
+                manifest, stage_inputs(), incremental=args.incremental and not args.force, stream=args.stream,
+                jobs=args.clean_jobs or os.cpu_count() or 1, out_of_core=args.out_of_core,
+                quality_gate=not args.no_quality_gate)
+
+        stages.append(Stage('clean:ME', run_clean, fetch, panel_is_current('ME')))
+
+    if extra:
+        def run_native(upstream):
+            native_data = clean_and_merge.load_native_datasets()
+            print(f"  ✓ Loaded {len(native_data)} datasets at their native frequency")
+            return native_data
+
+        stages.append(Stage('native', run_native, fetch,
+                            lambda: all(panel_is_current(freq)() for freq in extra)))
+
+        for freq in extra:
+            def run_panel(upstream, freq=freq):
+                native_data = upstream['native'] or clean_and_merge.load_native_datasets()
+                panel = clean_and_merge.build_frequency_panel(freq, native_data, out_of_core=args.out_of_core,
+                                                              quality_gate=not args.no_quality_gate)
+                manifest.record_stage(panel_stage(freq), stage_inputs(), [PANEL_FREQUENCIES[freq][2]])
+                return panel
+
+            stages.append(Stage(f'panel:{freq}', run_panel, ['native'], panel_is_current(freq)))
+
+    if not args.skip_models:
+        def run_models(upstream):
+            import capstone_models
+            panel = upstream['clean:ME']
+            if isinstance(panel, ColumnStore):
+                panel = panel.to_frame()
+            capstone_models.run_models(capstone_models.load_data(panel), compact=args.compact)
+            manifest.record_stage(MODELS_STAGE, model_inputs(), capstone_models.OUTPUT_FILES)
+
+        stages.append(Stage('models', run_models, ['clean:ME'],
+                            lambda: manifest.stage_is_current(MODELS_STAGE, model_inputs())))
+
+    return stages
+
+
+def print_summary(results, elapsed):
+    """Print each stage's status and timing."""
+    labels = {'ran': '✓ ran', 'skipped': '= up to date', 'failed': '❌ failed', 'blocked': '✗ not run'}
+
+    print("\n" + "=" * 70)
+    print("PIPELINE SUMMARY")
+    print("=" * 70 + "\n")
+    for r in results:
+        timing = f"{r['elapsed_s']:8.2f}s" if r['status'] in ('ran', 'failed') else " " * 9
+        print(f"  {r['stage']:12s} {labels[r['status']]:14s} {timing}")
+        if r['status'] == 'failed':
+            print(f"      {r['error']}")
+
+    print(f"\nTotal wall time: {elapsed:.2f}s "
+          f"(sum of stage times: {sum(r['elapsed_s'] for r in results):.2f}s)")
+    print("=" * 70 + "\n")
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Run fetch → clean → models as one DAG in one process.")
+    parser.add_argument('--skip-fetch', action='store_true',
+                        help="use the raw files already in data/raw/")
+    parser.add_argument('--skip-models', action='store_true',
+                        help="stop after building the panels")
+    parser.add_argument('--force', action='store_true',
+                        help="run every stage even if its inputs are unchanged")
+    parser.add_argument('--frequencies', nargs='+', choices=list(PANEL_FREQUENCIES), default=['ME'],
+                        help="panels to build: ME (monthly), W (weekly), D (business-daily); default: ME")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS,
+                        help=f"stages run at once (default: {DEFAULT_JOBS})")
+    parser.add_argument('--clean-jobs', type=int, default=1,
+                        help="worker processes for cleaning the monthly datasets (0 = one per CPU core)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="fetch only new FRED observations and patch the monthly outputs")
+    parser.add_argument('--stream', action='store_true',
+                        help="resample each raw file while reading it in chunks")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="align the panels in memory-mapped column stores")
+    parser.add_argument('--no-quality-gate', action='store_true',
+                        help="write the panels even if data-quality checks fail")
+    parser.add_argument('--compact', action='store_true',
+                        help="hold the long asset panel in compact dtypes while fitting the models")
+    parser.add_argument('--offline', action='store_true',
+                        help="fetch: serve everything from the local response cache")
+    parser.add_argument('--source', choices=SOURCE_NAMES, default=None,
+                        help="fetch: data source backend (default: FETCH_SOURCE or live)")
+    parser.add_argument('--source-path', default=None,
+                        help="fetch: fixtures directory (local) or stand-in server URL (replay)")
+    parser.add_argument('--json', dest='json_path', default=None,
+                        help="write the per-stage results to this file")
+    parser.add_argument('--metrics', default=None,
+                        help="write per-step timing, memory and row counts here on exit "
+                             "(.prom: Prometheus text, .jsonl: append a JSON line, else JSON)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    print("\n" + "=" * 70)
+    print("PIPELINE RUN")
+    print("=" * 70 + "\n")
+
+    try:
+        if args.metrics:
+            configure_metrics(args.metrics)
+        stages = build_stages(args)
+        print(f"Stages: {', '.join(stage.name for stage in stages)} ({args.jobs} at a time)\n")
+
+        start = time.perf_counter()
+        results = run_stages(stages, jobs=args.jobs, force=args.force)
+        elapsed = time.perf_counter() - start
+
+        print_summary(results, elapsed)
+
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump({'elapsed_s': round(elapsed, 3), 'stages': results}, f, indent=2)
+
+        return 0 if all(r['status'] in ('ran', 'skipped') for r in results) else 1
+
+    except Exception as e:
+        print(f"\n❌ ERROR: {str(e)}\n", file=sys.stderr)
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+"""
+Series Registry
+===============
+
+Single definition of every series in the analysis panel. The fetch scripts
+and clean_and_merge.py all derive their configuration from REGISTRY, so
+adding a series means adding one entry here.
+
+Each entry has:
+    source        'fred' or 'yahoo'
+    id            FRED series ID or Yahoo Finance ticker
+    name          Human-readable description
+    filename      Raw data file in data/raw/ (see raw_storage.py for formats)
+    column        Value column in the raw file
+    frequency     Native frequency: 'D' (daily), 'W', 'M' or 'Q'
+    resample      How clean_and_merge reaches month-end: 'last', 'mean', 'sum',
+                  'ffill', or None for series already monthly
+    final_column  Column name in the processed files and merged panel
+    fill          How gaps are filled after aligning to the common date range:
+                  'ffill_bfill' (default) or 'ffill_from_start' (leave NaN
+                  before the series begins, e.g. Bitcoin)
+    upsample      How the series is spread over a finer panel grid (weekly or
+                  daily panels, see clean_and_merge.py --frequencies):
+                  'ffill' (default; each value holds until the next) or
+                  'interpolate' (linear in time). Series at least as frequent
+                  as the panel are downsampled with their resample method.
+    date_format   strftime format of the raw file's dates (default '%Y-%m-%d',
+                  what the fetch scripts write); clean_and_merge parses with
+                  it and only infers the format for dates that don't match
+    years         Yahoo only: years of history to download
+    vintages      FRED only: True for series that get revised after release;
+                  their full revision history is kept by vintages.py
+    quality       Overrides of the data-quality limits for this series (see
+                  data_quality.column_thresholds), e.g. {'max_stale_ratio': None}
+                  to allow long unchanged stretches
+
+Entries are listed in merged panel column order.
+
+Usage:
+    from series_registry import fred_series_config, asset_config, clean_datasets
+
+    python code/series_registry.py     # print the registry
+"""
+
+import sys
+
+SOURCES = ('fred', 'yahoo')
+FREQUENCIES = ('D', 'W', 'M', 'Q')
+RESAMPLE_METHODS = (None, 'last', 'mean', 'sum', 'ffill')
+FILL_POLICIES = ('ffill_bfill', 'ffill_from_start')
+UPSAMPLE_METHODS = ('ffill', 'interpolate')
+
+REGISTRY = [
+    # Monetary aggregates (monthly)
+    {
+        'source': 'fred', 'id': 'M1SL',
+        'name': 'M1 Money Stock',
+        'filename': 'M1.csv', 'column': 'm1_billions',
+        'frequency': 'M', 'resample': None,
+        'final_column': 'm1_billions',
+        'vintages': True,
+    },
+    {
+        'source': 'fred', 'id': 'M2SL',
+        'name': 'M2 Money Stock',
+        'filename': 'M2.csv', 'column': 'm2_billions',
+        'frequency': 'M', 'resample': None,
+        'final_column': 'm2_billions',
+        'vintages': True,
+    },
+
+    # Interest rates (daily → monthly last)
+    {
+        'source': 'fred', 'id': 'DFF',
+        'name': 'Federal Funds Rate',
+        'filename': 'federal_funds_rate.csv', 'column': 'rate_percent',
+        'frequency': 'D', 'resample': 'last',
+        'final_column': 'fed_funds_rate',
+        'quality': {'max_stale_ratio': None},  # The policy rate is held for long stretches
+    },
+    {
+        'source': 'fred', 'id': 'REAINTRATREARAT10Y',
+        'name': '10-Year Real Interest Rate',
+        'filename': 'real_interest_rate_10y.csv', 'column': 'real_rate_percent',
+        'frequency': 'M', 'resample': 'last',
+        'final_column': 'real_rate_10y',
+    },
+    {
+        'source': 'fred', 'id': 'T10Y2Y',
+        'name': '10Y-2Y Treasury Yield Spread',
+        'filename': 'yield_curve_slope.csv', 'column': 'spread_percent',
+        'frequency': 'D', 'resample': 'last',
+        'final_column': 'yield_curve_slope',
+    },
+    {
+        'source': 'fred', 'id': 'BAMLC0A4CBBB',
+        'name': 'ICE BofA BBB Corporate Bond Spread',
+        'filename': 'bbb_spread.csv', 'column': 'spread_percent',
+        'frequency': 'D', 'resample': 'last',
+        'final_column': 'bbb_spread',
+    },
+
+    # Inflation (monthly)
+    {
+        'source': 'fred', 'id': 'PCE',
+        'name': 'Personal Consumption Expenditures Price Index',
+        'filename': 'pce.csv', 'column': 'pce_index',
+        'frequency': 'M', 'resample': None,
+        'final_column': 'pce_index',
+        'vintages': True,
+    },
+    {
+        'source': 'fred', 'id': 'MEDCPIM158SFRBCLE',
+        'name': 'Median Consumer Price Index',
+        'filename': 'cpi.csv', 'column': 'cpi_index',
+        'frequency': 'M', 'resample': None,
+        'final_column': 'cpi_median',
+    },
+
+    # Real economy (quarterly → monthly forward fill, monthly)
+    {
+        'source': 'fred', 'id': 'GDP',
+        'name': 'Gross Domestic Product',
+        'filename': 'gdp.csv', 'column': 'gdp_billions',
+        'frequency': 'Q', 'resample': 'ffill',
+        'final_column': 'gdp_billions',
+        'vintages': True,
+    },
+    {
+        'source': 'fred', 'id': 'UNRATE',
+        'name': 'Unemployment Rate',
+        'filename': 'unemployment_rate.csv', 'column': 'rate_percent',
+        'frequency': 'M', 'resample': None,
+        'final_column': 'unemployment_rate',
+        'vintages': True,
+        # BLS never published October 2025: the household survey wasn't
+        # collected during the federal government shutdown
+        'quality': {'max_interior_gap': 1},
+    },
+
+    # Asset prices (daily/monthly → monthly last)
+    {
+        'source': 'fred', 'id': 'CSUSHPISA',
+        'name': 'Case-Shiller U.S. National Home Price Index',
+        'filename': 'home_price_index.csv', 'column': 'index_value',
+        'frequency': 'M', 'resample': None,
+        'final_column': 'home_price_index',
+        'vintages': True,
+    },
+    {
+        'source': 'yahoo', 'id': '^GSPC',
+        'name': 'S&P 500 Index',
+        'filename': 'sp500.csv', 'column': 'sp500_index',
+        'frequency': 'D', 'resample': 'last',
+        'final_column': 'sp500_index',
+        'years': 25,  # Fetch 25 years of history
+    },
+    {
+        'source': 'yahoo', 'id': 'GC=F',
+        'name': 'Gold Futures (Continuous Contract)',
+        'filename': 'gold_price.csv', 'column': 'gold_price_usd',
+        'frequency': 'D', 'resample': 'last',
+        'final_column': 'gold_price_usd',
+        'years': 25,  # Fetch 25 years of history
+    },
+    {
+        'source': 'yahoo', 'id': 'BTC-USD',
+        'name': 'Bitcoin Price',
+        'filename': 'bitcoin_price.csv', 'column': 'bitcoin_price_usd',
+        'frequency': 'D', 'resample': 'last',
+        'final_column': 'bitcoin_price_usd',
+        'fill': 'ffill_from_start',  # Bitcoin didn't exist before ~2014
+        'years': 25,  # Will get all available data (Bitcoin started ~2014)
+    },
+
+    # Market indicators (daily → monthly mean or last)
+    {
+        'source': 'fred', 'id': 'VIXCLS',
+        'name': 'CBOE Volatility Index (VIX)',
+        'filename': 'vix.csv', 'column': 'vix_index',
+        'frequency': 'D', 'resample': 'mean',
+        'final_column': 'vix_index',
+    },
+    {
+        'source': 'fred', 'id': 'USEPUINDXD',
+        'name': 'US Economic Policy Uncertainty Index',
+        'filename': 'epu_index.csv', 'column': 'epu_index',
+        'frequency': 'D', 'resample': 'mean',
+        'final_column': 'epu_index',
+    },
+    {
+        'source': 'fred', 'id': 'UMCSENT',
+        'name': 'University of Michigan Consumer Sentiment',
+        'filename': 'consumer_sentiment.csv', 'column': 'sentiment_index',
+        'frequency': 'M', 'resample': None,
+        'final_column': 'consumer_sentiment',
+        'vintages': True,
+    },
+]
+
+DEFAULT_FILL = 'ffill_bfill'
+DEFAULT_UPSAMPLE = 'ffill'
+DEFAULT_DATE_FORMAT = '%Y-%m-%d'
+DEFAULT_YEARS = 25
+
+
+def validate_registry(registry=REGISTRY):
+    """
+    Check every entry is complete and that IDs, files and columns are unique.
+
+    Raises:
+        ValueError: Describing the first problem found
+    """
+    required = ('source', 'id', 'name', 'filename', 'column', 'frequency', 'resample', 'final_column')
+    seen = {'id': set(), 'filename': set(), 'final_column': set()}
+
+    for entry in registry:
+        label = entry.get('id', entry)
+        missing = [key for key in required if key not in entry]
+        if missing:
+            raise ValueError(f"Registry entry {label} is missing: {', '.join(missing)}")
+        if entry['source'] not in SOURCES:
+            raise ValueError(f"Registry entry {label}: unknown source {entry['source']!r}")
+        if entry['frequency'] not in FREQUENCIES:
+            raise ValueError(f"Registry entry {label}: unknown frequency {entry['frequency']!r}")
+        if entry['resample'] not in RESAMPLE_METHODS:
+            raise ValueError(f"Registry entry {label}: unknown resample method {entry['resample']!r}")
+        if entry.get('vintages') and entry['source'] != 'fred':
+            raise ValueError(f"Registry entry {label}: vintages are only available for FRED series")
+        if entry.get('fill', DEFAULT_FILL) not in FILL_POLICIES:
+            raise ValueError(f"Registry entry {label}: unknown fill policy {entry['fill']!r}")
+        if entry.get('upsample', DEFAULT_UPSAMPLE) not in UPSAMPLE_METHODS:
+            raise ValueError(f"Registry entry {label}: unknown upsample method {entry['upsample']!r}")
+        if not isinstance(entry.get('quality', {}), dict):
+            raise ValueError(f"Registry entry {label}: quality must be a dict of threshold overrides")
+        for key, values in seen.items():
+            value = (entry['source'], entry[key]) if key == 'id' else entry[key]
+            if value in values:
+                raise ValueError(f"Registry entry {label}: duplicate {key} {entry[key]!r}")
+            values.add(value)
+
+
+def series_for(source, registry=REGISTRY):
+    """Registry entries for one source, in registry order."""
+    return [entry for entry in registry if entry['source'] == source]
+
+
+def fred_series_config(registry=REGISTRY):
+    """
+    FRED fetch configuration.
+
+    Returns:
+        dict: Series ID to {'name', 'filename', 'column'}
+    """
+    return {
+        entry['id']: {
+            'name': entry['name'],
+            'filename': entry['filename'],
+            'column': entry['column'],
+        }
+        for entry in series_for('fred', registry)
+    }
+
+
+def asset_config(registry=REGISTRY):
+    """
+    Yahoo Finance fetch configuration.
+
+    Returns:
+        dict: Ticker to {'name', 'filename', 'column', 'years'}
+    """
+    return {
+        entry['id']: {
+            'name': entry['name'],
+            'filename': entry['filename'],
+            'column': entry['column'],
+            'years': entry.get('years', DEFAULT_YEARS),
+        }
+        for entry in series_for('yahoo', registry)
+    }
+
+
+def clean_datasets(registry=REGISTRY):
+    """
+    Cleaning configuration for clean_and_merge.py.
+
+    Returns:
+        list: (filename, final_column_name, resampling_method) tuples in panel order
+    """
+    return [(entry['filename'], entry['final_column'], entry['resample']) for entry in registry]
+
+
+def vintage_series(registry=REGISTRY):
+    """Registry entries whose revision history is tracked (see vintages.py)."""
+    return [entry for entry in series_for('fred', registry) if entry.get('vintages')]
+
+
+def frequency_rules(registry=REGISTRY):
+    """
+    Resampling rules for panels at other frequencies (see clean_and_merge.py).
+
+    Returns:
+        dict: Final column name to {'frequency', 'resample', 'upsample'}
+    """
+    return {
+        entry['final_column']: {
+            'frequency': entry['frequency'],
+            'resample': entry['resample'],
+            'upsample': entry.get('upsample', DEFAULT_UPSAMPLE),
+        }
+        for entry in registry
+    }
+
+
+def entry_for(final_column, registry=REGISTRY):
+    """Registry entry of a merged panel column, or None if it has none."""
+    if registry is REGISTRY:
+        return BY_FINAL_COLUMN.get(final_column)
+    return next((entry for entry in registry if entry['final_column'] == final_column), None)
+
+
+def fill_policy(final_column, registry=REGISTRY):
+    """Gap-filling policy for a merged panel column (see module docstring)."""
+    return (entry_for(final_column, registry) or {}).get('fill', DEFAULT_FILL)
+
+
+def raw_date_format(final_column, registry=REGISTRY):
+    """Date format of a merged panel column's raw file (see module docstring)."""
+    return (entry_for(final_column, registry) or {}).get('date_format', DEFAULT_DATE_FORMAT)
+
+
+validate_registry()
+
+# REGISTRY entries by merged panel column and by raw file (both unique, as
+# validate_registry() checks), so per-column lookups don't scan the registry
+BY_FINAL_COLUMN = {entry['final_column']: entry for entry in REGISTRY}
+BY_FILENAME = {entry['filename']: entry for entry in REGISTRY}
+
+
+def main():
+    """Print the registry."""
+    print(f"\n{'Source':7s} {'ID':20s} {'Freq':5s} {'Resample':9s} {'Final column':20s} File")
+    print("-" * 90)
+    for entry in REGISTRY:
+        print(f"{entry['source']:7s} {entry['id']:20s} {entry['frequency']:5s} "
+              f"{str(entry['resample']):9s} {entry['final_column']:20s} {entry['filename']}")
+    print(f"\n✓ {len(REGISTRY)} series ({len(series_for('fred'))} FRED, {len(series_for('yahoo'))} Yahoo Finance)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
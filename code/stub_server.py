@@ -0,0 +1,299 @@
+"""
+Local Stand-In Server for FRED and Yahoo Finance
+================================================
+
+Replays recorded responses from a fixtures directory over HTTP with
+configurable latency, so the fetch layer can be tested and load-tested
+reproducibly on a box without internet access.
+
+Endpoints:
+    GET /fred/series/observations?series_id=ID[&observation_start=&observation_end=]
+        FRED-compatible JSON ({"observations": [{"date": ..., "value": ...}]})
+    GET /fred/series/observations?series_id=ID&output_type=1[&realtime_start=&realtime_end=&limit=&offset=]
+        Vintages by real-time period, paged like the real API
+    GET /yahoo/history?ticker=T[&start=&end=]
+        CSV with Date,Close columns
+
+Usage:
+    # Build fixtures from the current data/raw files (or record them live by
+    # passing --record to the fetch scripts)
+    python code/stub_server.py seed
+
+    # Serve them with 50 ms +/- 20 ms latency per request
+    python code/stub_server.py serve --port 8765 --latency 0.05 --jitter 0.02
+
+    # Point the fetchers at it
+    python code/fetch_all_fred_economic_data.py --source replay
+    python code/fetch_asset_prices.py --source replay
+
+    # Load-test fetch_all_series against 500 synthetic daily series
+    python code/stub_server.py bench --series 500 --workers 16
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+from raw_storage import read_raw, raw_exists
+from data_sources import (
+    DEFAULT_FIXTURES_DIR, LocalFileSource, ReplayHTTPSource,
+    write_fixture_series, write_fixture_history, generate_synthetic_fixtures,
+)
+
+
+def encode_fred_observations(data):
+    """Encode a pd.Series as a FRED series/observations JSON payload."""
+    dates = data.index.strftime('%Y-%m-%d')
+    values = np.where(np.isnan(data.values), '.', data.values.astype(str))
+    observations = [{'date': d, 'value': v} for d, v in zip(dates, values)]
+    return json.dumps({'observations': observations}).encode('utf-8')
+
+
+def encode_fred_vintages(vintages, offset=0, limit=None):
+    """Encode one page of a vintage table as a FRED output_type=1 JSON payload."""
+    page = vintages.iloc[offset:offset + limit if limit else None]
+    values = np.where(np.isnan(page['value'].values), '.', page['value'].values.astype(str))
+    observations = [
+        {'realtime_start': rt, 'realtime_end': '9999-12-31', 'date': d, 'value': v}
+        for d, rt, v in zip(page['date'].dt.strftime('%Y-%m-%d'),
+                            page['realtime_start'].dt.strftime('%Y-%m-%d'), values)
+    ]
+    payload = {'count': len(vintages), 'offset': offset, 'limit': limit, 'observations': observations}
+    return json.dumps(payload).encode('utf-8')
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves fixtures from server.source after sleeping for the configured latency.
+
+    Encoded responses are kept in server.payloads, so repeated requests only
+    cost the simulated latency.
+    """
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+
+    def do_GET(self):
+        server = self.server
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == '/fred/series/observations':
+                body, content_type = self._fred_observations(params)
+            elif url.path == '/yahoo/history':
+                body, content_type = self._yahoo_history(params)
+            else:
+                self._send(404, b'{"error_message": "Not Found"}', 'application/json')
+                return
+        except (KeyError, ValueError) as e:
+            payload = json.dumps({'error_code': 400, 'error_message': str(e)}).encode('utf-8')
+            self._send(400, payload, 'application/json')
+            return
+
+        self._send(200, body, content_type)
+
+    def _fred_observations(self, params):
+        if params.get('output_type') == '1':
+            return self._fred_vintages(params)
+        key = ('fred', params['series_id'], params.get('observation_start'), params.get('observation_end'))
+        if key not in self.server.payloads:
+            self.server.payloads[key] = encode_fred_observations(self.server.source.get_series(*key[1:]))
+        return self.server.payloads[key], 'application/json'
+
+    def _fred_vintages(self, params):
+        key = ('fred_vintages', params['series_id'], params.get('realtime_start'), params.get('realtime_end'))
+        if key not in self.server.payloads:
+            self.server.payloads[key] = self.server.source.get_vintages(*key[1:])
+        limit = int(params['limit']) if 'limit' in params else None
+        return encode_fred_vintages(self.server.payloads[key], int(params.get('offset', 0)), limit), \
+            'application/json'
+
+    def _yahoo_history(self, params):
+        key = ('yahoo', params['ticker'], params.get('start'), params.get('end'))
+        if key not in self.server.payloads:
+            history = self.server.source.get_history(*key[1:])
+            self.server.payloads[key] = history[['Close']].rename_axis('Date').to_csv().encode('utf-8')
+        return self.server.payloads[key], 'text/csv'
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_server(fixtures_dir=DEFAULT_FIXTURES_DIR, host='127.0.0.1', port=8765,
+                 latency=0.0, jitter=0.0, verbose=False):
+    """
+    Start the stand-in server on a background thread.
+
+    Parameters:
+        fixtures_dir (Path): Fixtures directory to replay
+        host (str): Interface to bind
+        port (int): Port to bind (0 picks a free port)
+        latency (float): Seconds added to every response
+        jitter (float): Random +/- seconds added to the latency
+        verbose (bool): Log every request
+
+    Returns:
+        ThreadingHTTPServer: Running server (call .shutdown() to stop it)
+    """
+    server = ThreadingHTTPServer((host, port), StubRequestHandler)
+    server.daemon_threads = True
+    server.source = LocalFileSource(Path(fixtures_dir))
+    server.payloads = {}
+    server.latency = latency
+    server.jitter = jitter
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def seed_from_raw(fixtures_dir=DEFAULT_FIXTURES_DIR):
+    """
+    Convert the CSVs in data/raw/ into the fixtures layout.
+
+    Returns:
+        int: Number of fixtures written
+    """
+    from fetch_all_fred_economic_data import SERIES_CONFIG
+    from fetch_asset_prices import ASSET_CONFIG
+
+    count = 0
+    for series_id, config in SERIES_CONFIG.items():
+        if raw_exists(config['filename']):
+            df = read_raw(config['filename'])
+            write_fixture_series(fixtures_dir, series_id,
+                                 pd.Series(df[config['column']].values, index=df['date']))
+            count += 1
+    for ticker, config in ASSET_CONFIG.items():
+        if raw_exists(config['filename']):
+            df = read_raw(config['filename'])
+            history = pd.DataFrame({'Close': df[config['column']].values}, index=df['date'])
+            write_fixture_history(fixtures_dir, ticker, history)
+            count += 1
+    return count
+
+
+def run_benchmark(n_series, workers, latency, jitter):
+    """
+    Time fetch_all_series against synthetic fixtures served by a local server.
+
+    Returns:
+        dict: Benchmark summary
+    """
+    from fetch_all_fred_economic_data import fetch_all_series
+    from response_cache import configure_cache
+    from http_session import configure_session, connection_stats
+
+    # Every request must reach the server to measure the fetch layer
+    configure_cache(enabled=False, offline=False)
+    session = configure_session(pool_size=workers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures_dir = Path(tmp)
+        series_ids = generate_synthetic_fixtures(fixtures_dir, n_series)
+        server = start_server(fixtures_dir, port=0, latency=latency, jitter=jitter)
+        # Encode payloads up front so the timing reflects the client side only
+        for sid in series_ids:
+            server.payloads[('fred', sid, None, None)] = encode_fred_observations(
+                server.source.get_series(sid))
+        try:
+            source = ReplayHTTPSource(f"http://127.0.0.1:{server.server_address[1]}")
+            config = {sid: {'name': f"Synthetic {sid}"} for sid in series_ids}
+            start = time.perf_counter()
+            results, errors = fetch_all_series(source, config, max_workers=workers, verbose=False)
+            elapsed = time.perf_counter() - start
+        finally:
+            server.shutdown()
+
+    return {
+        'series': n_series,
+        'workers': workers,
+        'latency_s': latency,
+        'succeeded': len(results),
+        'failed': len(errors),
+        'elapsed_s': round(elapsed, 3),
+        'series_per_s': round(n_series / elapsed, 1),
+        'connections': connection_stats(session),
+    }
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Local stand-in server for FRED and Yahoo Finance.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help="serve a fixtures directory over HTTP")
+    serve.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURES_DIR)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    serve.add_argument('--jitter', type=float, default=0.0, help="random +/- seconds added to the latency")
+    serve.add_argument('--verbose', action='store_true', help="log every request")
+
+    seed = sub.add_parser('seed', help="build fixtures from data/raw/")
+    seed.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURES_DIR)
+
+    synthetic = sub.add_parser('synthetic', help="generate random-walk FRED fixtures")
+    synthetic.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURES_DIR)
+    synthetic.add_argument('--series', type=int, default=500)
+
+    bench = sub.add_parser('bench', help="load-test fetch_all_series against synthetic fixtures")
+    bench.add_argument('--series', type=int, default=500)
+    bench.add_argument('--workers', type=int, default=16)
+    bench.add_argument('--latency', type=float, default=0.05)
+    bench.add_argument('--jitter', type=float, default=0.0)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    if args.command == 'seed':
+        count = seed_from_raw(args.fixtures)
+        print(f"✓ Wrote {count} fixtures to: {args.fixtures}")
+        return 0
+
+    if args.command == 'synthetic':
+        series_ids = generate_synthetic_fixtures(args.fixtures, args.series)
+        print(f"✓ Wrote {len(series_ids)} synthetic series to: {args.fixtures / 'fred'}")
+        return 0
+
+    if args.command == 'bench':
+        summary = run_benchmark(args.series, args.workers, args.latency, args.jitter)
+        print(json.dumps(summary, indent=2))
+        return 0 if summary['failed'] == 0 else 1
+
+    server = start_server(args.fixtures, args.host, args.port,
+                          args.latency, args.jitter, args.verbose)
+    print(f"✓ Serving {args.fixtures} at http://{args.host}:{server.server_address[1]} "
+          f"(latency {args.latency:g}s ± {args.jitter:g}s). Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""
+Vintage-Aware FRED Data (ALFRED Real-Time Periods)
+==================================================
+
+fetch_all_fred_economic_data.py keeps only the latest vintage of each series,
+so a backtest over GDP, PCE or M2 silently uses revised values that were not
+known at the time. This module keeps the full revision history of the series
+marked 'vintages' in series_registry.py and reconstructs the data as it
+looked on any date.
+
+Storage (data/raw/vintages/, any raw_storage.py format):
+    date, realtime_start, value
+One row per observation per real-time period in which it took a new value.
+Consecutive vintages that repeat an observation's previous value are dropped,
+so a series costs roughly (observations + revisions) rows rather than
+(observations × vintages).
+
+Usage:
+    # Fetch every vintage of the registry's revisable series
+    python code/vintages.py fetch [--series GDP PCE] [--incremental] [--source local]
+
+    # Panel as it was known on 2010-06-30 (monthly, like merged_analysis_panel.csv)
+    python code/vintages.py as-of 2010-06-30 --monthly --output panel_2010-06-30.csv
+
+    from vintages import as_of_panel, load_vintages
+    panel = as_of_panel('2010-06-30', monthly=True)
+    gdp = load_vintages('gdp.csv').as_of('2010-06-30')
+"""
+
+import sys
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from config_paths import VINTAGE_DATA_DIR
+from response_cache import get_cache, configure_cache
+from data_sources import SOURCE_NAMES, get_source, cache_namespace, RecordingSource
+from retry_policy import call_with_retry, fred_rate_limiter
+from raw_storage import RAW_FORMATS, configure_storage, read_raw, write_raw, raw_exists, find_raw
+from series_registry import REGISTRY, vintage_series
+from manifest import get_manifest
+
+
+def compact_vintages(vintages):
+    """
+    Drop vintage rows that repeat the observation's previous value.
+
+    Parameters:
+        vintages (pd.DataFrame): date, realtime_start, value
+
+    Returns:
+        pd.DataFrame: Sorted by (date, realtime_start), one row per value change
+            (missing values count as equal to each other)
+    """
+    df = (vintages[['date', 'realtime_start', 'value']]
+          .drop_duplicates(['date', 'realtime_start'], keep='last')
+          .sort_values(['date', 'realtime_start'], kind='stable')
+          .reset_index(drop=True))
+    if len(df) < 2:
+        return df
+
+    dates = df['date'].values
+    values = df['value'].values.astype(float)
+    same_date = dates[1:] == dates[:-1]
+    same_value = (values[1:] == values[:-1]) | (np.isnan(values[1:]) & np.isnan(values[:-1]))
+    keep = np.concatenate([[True], ~(same_date & same_value)])
+    return df[keep].reset_index(drop=True)
+
+
+class VintageTable:
+    """
+    In-memory revision history of one series with fast as-of lookups.
+
+    Rows are held as sorted numpy arrays, so as_of() is a single vectorised
+    pass with no groupby.
+
+    Parameters:
+        vintages (pd.DataFrame): date, realtime_start, value
+    """
+
+    def __init__(self, vintages):
+        df = compact_vintages(vintages)
+        self.dates = df['date'].values.astype('datetime64[ns]')
+        self.realtime_starts = df['realtime_start'].values.astype('datetime64[ns]')
+        self.values = df['value'].values.astype(float)
+
+    def __len__(self):
+        return len(self.values)
+
+    def as_of(self, when):
+        """
+        The series as published on `when`.
+
+        Parameters:
+            when (date-like): Real-time date
+
+        Returns:
+            pd.Series: Latest value known on `when` for every observation
+                published by then, indexed by date
+        """
+        known = np.flatnonzero(self.realtime_starts <= np.datetime64(pd.Timestamp(when), 'ns'))
+        if len(known) == 0:
+            return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+        dates = self.dates[known]
+        # Rows are sorted by (date, realtime_start): the last known row per date wins
+        last = np.concatenate([dates[1:] != dates[:-1], [True]])
+        rows = known[last]
+        data = pd.Series(self.values[rows], index=pd.DatetimeIndex(self.dates[rows]))
+        return data.dropna()
+
+    def first_release(self):
+        """Each observation's initially published value, indexed by date."""
+        first = np.concatenate([[True], self.dates[1:] != self.dates[:-1]])
+        return pd.Series(self.values[first], index=pd.DatetimeIndex(self.dates[first]))
+
+
+def fetch_vintages(source, series_id, series_name, realtime_start=None, verbose=True, raise_errors=False):
+    """
+    Fetch the revision history of a FRED series.
+
+    Goes through the response cache, retries and the FRED rate limiter like
+    fetch_all_fred_economic_data.fetch_series.
+
+    Parameters:
+        source: Data source (see data_sources.py)
+        series_id (str): FRED series ID
+        series_name (str): Human-readable name
+        realtime_start (str, optional): Only fetch vintages from this date on
+        verbose (bool): Print progress messages
+        raise_errors (bool): Re-raise fetch errors instead of returning None
+
+    Returns:
+        pd.DataFrame: date, realtime_start, value
+    """
+    if verbose:
+        print(f"  Fetching vintages of {series_name} ({series_id})...")
+    try:
+        limiter = fred_rate_limiter() if getattr(source, 'rate_limited', True) else None
+        vintages = get_cache().fetch(
+            cache_namespace(source, 'fred_vintages'), series_id, realtime_start, None,
+            lambda: call_with_retry(
+                lambda: source.get_vintages(series_id, realtime_start=realtime_start),
+                limiter=limiter, description=series_id))
+        if verbose:
+            print(f"    ✓ {len(vintages)} real-time periods")
+        return vintages
+    except Exception as e:
+        if raise_errors:
+            raise
+        if verbose:
+            print(f"    ❌ Error: {str(e)}")
+        return None
+
+
+def save_vintages(vintages, filename, append=False):
+    """
+    Store a revision history compactly.
+
+    Parameters:
+        vintages (pd.DataFrame): date, realtime_start, value
+        filename (str): Logical file name (the series' registry filename)
+        append (bool): Merge into the stored history; fetched rows replace
+            stored ones with the same (date, realtime_start)
+
+    Returns:
+        int: Rows stored
+    """
+    df = vintages[['date', 'realtime_start', 'value']]
+    if append and raw_exists(filename, VINTAGE_DATA_DIR):
+        df = pd.concat([read_raw(filename, raw_dir=VINTAGE_DATA_DIR), df], ignore_index=True)
+    df = compact_vintages(df)
+    VINTAGE_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    write_raw(df, filename, raw_dir=VINTAGE_DATA_DIR)
+    return len(df)
+
+
+def last_realtime_start(filename):
+    """Latest vintage date already stored, or None."""
+    if not raw_exists(filename, VINTAGE_DATA_DIR):
+        return None
+    starts = read_raw(filename, columns=['realtime_start'], raw_dir=VINTAGE_DATA_DIR)['realtime_start']
+    return starts.max() if len(starts) else None
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def load_vintages(filename):
+    """
+    Load a stored revision history as a VintageTable.
+
+    Tables are cached per process and reloaded when the file changes, so
+    repeated as-of queries don't re-read the file.
+
+    Raises:
+        FileNotFoundError: If no history is stored for the series
+    """
+    path, _ = find_raw(filename, VINTAGE_DATA_DIR)
+    if path is None:
+        raise FileNotFoundError(f"No vintage data for {filename} in {VINTAGE_DATA_DIR} "
+                                f"(run: python code/vintages.py fetch)")
+    key = (str(path), path.stat().st_mtime_ns)
+    with _tables_lock:
+        if key not in _tables:
+            _tables[key] = VintageTable(read_raw(filename, raw_dir=VINTAGE_DATA_DIR))
+        return _tables[key]
+
+
+def as_of_panel(as_of_date, registry=REGISTRY, monthly=False):
+    """
+    The panel as it could have been built on `as_of_date`.
+
+    Series with stored vintages use the values published by that date. The
+    other series are not revised after release, so their current data is
+    truncated at `as_of_date`.
+
+    Parameters:
+        as_of_date (date-like): Real-time date
+        registry (list): Series to include (default: the whole registry)
+        monthly (bool): Resample each series to month-end with its registry
+            rule, like clean_and_merge.py (alignment and gap filling are not
+            applied)
+
+    Returns:
+        pd.DataFrame: One column per series (registry final_column), indexed by date
+    """
+    from clean_and_merge import load_and_clean_dataset, resample_to_monthly
+    import io
+    import contextlib
+
+    as_of_date = pd.Timestamp(as_of_date)
+    columns = {}
+    for entry in registry:
+        if entry.get('vintages') and raw_exists(entry['filename'], VINTAGE_DATA_DIR):
+            data = load_vintages(entry['filename']).as_of(as_of_date).to_frame(entry['final_column'])
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                data, value_col = load_and_clean_dataset(entry['filename'])
+            data = data.loc[:as_of_date].rename(columns={value_col: entry['final_column']})
+
+        if monthly and len(data) > 0:
+            if entry['resample'] is not None:
+                data = resample_to_monthly(data, entry['final_column'], entry['resample'])
+            else:
+                data = data.resample('ME').last()
+        columns[entry['final_column']] = data[entry['final_column']]
+
+    panel = pd.concat(columns, axis=1, sort=True)
+    panel.index.name = 'date'
+    return panel
+
+
+def fetch_all_vintages(source, entries, incremental=False, verbose=True):
+    """
+    Fetch and store the revision history of each registry entry.
+
+    Parameters:
+        source: Data source (see data_sources.py)
+        entries (list): Registry entries (see series_registry.vintage_series)
+        incremental (bool): Only fetch vintages from the latest stored one on
+
+    Returns:
+        tuple: (dict, dict) - Series ID to rows stored, and series ID to error message
+    """
+    stored = {}
+    errors = {}
+    for entry in entries:
+        realtime_start = last_realtime_start(entry['filename']) if incremental else None
+        try:
+            vintages = fetch_vintages(source, entry['id'], entry['name'], realtime_start,
+                                      verbose=verbose, raise_errors=True)
+            stored[entry['id']] = save_vintages(vintages, entry['filename'],
+                                                append=realtime_start is not None)
+        except Exception as e:
+            errors[entry['id']] = str(e)
+    return stored, errors
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Fetch and query FRED revision histories (ALFRED).")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    fetch = sub.add_parser('fetch', help="fetch vintages for the registry's revisable series")
+    fetch.add_argument('--series', nargs='+', default=None,
+                       help="FRED series IDs (default: every registry entry with vintages)")
+    fetch.add_argument('--incremental', action='store_true',
+                       help="only fetch vintages from the latest stored one on")
+    fetch.add_argument('--offline', action='store_true', default=None,
+                       help="serve every request from the local response cache")
+    fetch.add_argument('--cache', dest='cache', action='store_true', default=None,
+                       help="cache live responses too (default: only local/replay sources)")
+    fetch.add_argument('--no-cache', dest='cache', action='store_false', default=None,
+                       help="bypass the local response cache")
+    fetch.add_argument('--source', choices=SOURCE_NAMES, default=None,
+                       help="data source backend (default: FETCH_SOURCE or live)")
+    fetch.add_argument('--source-path', default=None,
+                       help="fixtures directory (local) or stand-in server URL (replay)")
+    fetch.add_argument('--record', action='store_true',
+                       help="save every response to data/fixtures/ for later replay")
+    fetch.add_argument('--raw-format', choices=list(RAW_FORMATS), default=None,
+                       help="storage format (default: RAW_FORMAT or csv)")
+
+    as_of = sub.add_parser('as-of', help="print or save the panel as known on a date")
+    as_of.add_argument('date', help="real-time date (YYYY-MM-DD)")
+    as_of.add_argument('--monthly', action='store_true',
+                       help="resample to month-end with each series' registry rule")
+    as_of.add_argument('--output', default=None, help="write the panel to this CSV file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    if args.command == 'as-of':
+        panel = as_of_panel(args.date, monthly=args.monthly)
+        if args.output:
+            panel.to_csv(args.output)
+            print(f"✓ Panel as of {args.date} saved to: {args.output} "
+                  f"({panel.shape[0]} rows, {panel.shape[1]} columns)")
+        else:
+            print(panel.dropna(how='all').tail(12).to_string())
+        return 0
+
+    print("\n" + "=" * 70)
+    print("FRED VINTAGE (ALFRED) FETCHER")
+    print("=" * 70 + "\n")
+
+    try:
+        from fetch_all_fred_economic_data import get_api_key
+
+        cache = configure_cache(offline=args.offline, enabled=args.cache)
+        configure_storage(args.raw_format)
+        source = get_source(args.source, args.source_path)
+        if source.name == 'live' and not cache.offline:
+            source.api_key = get_api_key()
+        if args.record:
+            source = RecordingSource(source)
+
+        entries = vintage_series()
+        if args.series:
+            by_id = {entry['id']: entry for entry in REGISTRY if entry['source'] == 'fred'}
+            unknown = [sid for sid in args.series if sid not in by_id]
+            if unknown:
+                raise ValueError(f"Not FRED series in the registry: {', '.join(unknown)}")
+            entries = [by_id[sid] for sid in args.series]
+
+        stored, errors = fetch_all_vintages(source, entries, incremental=args.incremental)
+        get_manifest().flush()
+
+        print("\nStored revision histories:")
+        for entry in entries:
+            if entry['id'] in stored:
+                print(f"  ✓ {entry['filename']}: {stored[entry['id']]:,} rows")
+        if errors:
+            print("\n❌ Failed series:")
+            for series_id, error in errors.items():
+                print(f"  • {series_id}: {error}")
+
+        print("\n" + "=" * 70)
+        print(f"✓ SUCCESS! {len(stored)}/{len(entries)} vintage histories saved to: {VINTAGE_DATA_DIR}")
+        print("=" * 70 + "\n")
+        return 0 if not errors else 1
+
+    except Exception as e:
+        print(f"\n❌ ERROR: {str(e)}\n", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_quality import DataQualityError, check_panel, run_quality_checks
+
+
+def _monthly_panel():
+    """A monthly series (M2) with three months missing, and the panel alignment builds from it."""
+    dates = pd.date_range('2010-01-31', periods=48, freq='ME')
+    series = pd.DataFrame({'m2_billions': np.linspace(8000.0, 9000.0, len(dates))}, index=dates)
+    series.iloc[20:23] = np.nan
+    return series.ffill(), series
+
+
+def test_gap_hidden_by_alignment_fails_the_gate(tmp_path):
+    panel, series = _monthly_panel()
+    with pytest.raises(DataQualityError, match='m2_billions interior_gap=3'):
+        run_quality_checks(panel, tmp_path / 'report', series={'m2_billions': series})
+
+
+def test_gap_is_measured_on_the_series_not_the_panel():
+    panel, series = _monthly_panel()
+    panel_only, _ = check_panel(panel)
+    report, failures = check_panel(panel, series={'m2_billions': series})
+
+    assert panel_only.loc['m2_billions', 'interior_gap'] == 0
+    assert report.loc['m2_billions', 'interior_gap'] == 3
+    assert report.loc['m2_billions', 'runs_checked_on'] == 'series'
+    assert [f['check'] for f in failures] == ['interior_gap']
+
+
+def test_stale_limit_follows_native_frequency():
+    dates = pd.date_range('2010-01-31', periods=48, freq='ME')
+    values = np.linspace(8000.0, 9000.0, len(dates))
+    values[10:18] = values[10]  # unchanged for 8 monthly releases
+    panel = pd.DataFrame({'m2_billions': values}, index=dates)
+
+    _, failures = check_panel(panel, series={'m2_billions': panel})
+    assert [(f['check'], f['limit']) for f in failures] == [('stale_ratio', 6.0)]
+
+
+def test_report_records_each_columns_effective_limits(tmp_path):
+    dates = pd.date_range('2010-01-31', periods=48, freq='ME')
+    panel = pd.DataFrame({'unemployment_rate': np.linspace(4.0, 6.0, len(dates)),
+                          'fed_funds_rate': np.linspace(0.1, 2.0, len(dates)),
+                          'm2_billions': np.linspace(8000.0, 9000.0, len(dates))}, index=dates)
+    run_quality_checks(panel, tmp_path / 'report')
+
+    report = pd.read_parquet(tmp_path / 'report.parquet').set_index('column')
+    assert report.loc['unemployment_rate', 'max_interior_gap'] == 1  # registry override
+    assert report.loc['m2_billions', 'max_interior_gap'] == 0
+    assert report.loc['m2_billions', 'max_stale_ratio'] == 6  # monthly native limit
+    assert np.isnan(report.loc['fed_funds_rate', 'max_stale_ratio'])  # registry override: not checked
+
+    metrics = {row['column']: row for row in json.loads((tmp_path / 'report.json').read_text())['metrics']}
+    assert metrics['unemployment_rate']['max_interior_gap'] == 1
+    assert metrics['fed_funds_rate']['max_stale_ratio'] is None
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from data_sources import LocalFileSource, RecordingSource
+
+
+class SliceSource:
+    """Returns whatever slice it was last given, like an incremental fetch."""
+
+    name = 'live'
+    rate_limited = False
+
+    def __init__(self, series, history):
+        self.series = series
+        self.history = history
+
+    def get_series(self, series_id, observation_start=None, observation_end=None):
+        return self.series
+
+    def get_history(self, ticker, start=None, end=None):
+        return self.history
+
+
+def test_recording_an_incremental_fetch_keeps_the_recorded_history(tmp_path):
+    dates = pd.bdate_range('2024-01-01', periods=10)
+    full = pd.Series(range(10), index=dates, dtype=float)
+    history = pd.DataFrame({'Close': full.to_numpy()}, index=dates)
+    source = SliceSource(full, history)
+    recorder = RecordingSource(source, tmp_path)
+    recorder.get_series('DFF')
+    recorder.get_history('GC=F')
+
+    # The incremental refresh overlaps the last three days and revises one
+    source.series = pd.Series([7.0, 8.5, 9.0, 10.0], index=pd.bdate_range(dates[7], periods=4))
+    source.history = pd.DataFrame({'Close': source.series.to_numpy()}, index=source.series.index)
+    recorder.get_series('DFF')
+    recorder.get_history('GC=F')
+
+    local = LocalFileSource(tmp_path)
+    recorded = local.get_series('DFF')
+    assert len(recorded) == 11
+    assert recorded.iloc[0] == 0.0
+    assert recorded.iloc[8] == 8.5
+    assert len(local.get_history('GC=F')) == 11
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import fetch_asset_prices
+from response_cache import ResponseCache
+
+
+class FakeSource:
+    name = 'live'
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_history(self, ticker, start=None, end=None):
+        self.calls += 1
+        dates = pd.bdate_range('2024-01-01', periods=5)
+        return pd.DataFrame({'Close': [1.0, 2.0, 3.0, 4.0, 5.0]}, index=dates)
+
+
+class Tomorrow(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz) + timedelta(days=3)
+
+
+@pytest.mark.parametrize('start_date', [None, datetime(2024, 1, 1)])
+def test_offline_run_on_a_later_day_finds_the_live_entry(tmp_path, monkeypatch, start_date):
+    cache = ResponseCache(cache_dir=tmp_path, enabled=True)
+    monkeypatch.setattr(fetch_asset_prices, 'get_cache', lambda: cache)
+    source = FakeSource()
+    live = fetch_asset_prices.fetch_asset_data('GC=F', start_date=start_date, source=source, verbose=False)
+
+    monkeypatch.setattr(fetch_asset_prices, 'datetime', Tomorrow)
+    cache.offline = True
+    offline = fetch_asset_prices.fetch_asset_data('GC=F', start_date=start_date, source=source, verbose=False)
+
+    assert source.calls == 1
+    pd.testing.assert_frame_equal(live, offline)
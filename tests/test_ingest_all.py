@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from ingest_all import _run_job
+from retry_policy import RetryPolicy, call_with_retry
+
+CONFIG = {'name': 'Test series', 'filename': 'test.csv'}
+
+
+def _run(timeout, job, *args):
+    async def main():
+        return await _run_job(asyncio.Semaphore(1), timeout, 'fred', 'TEST', CONFIG, job, *args)
+    return asyncio.run(main())
+
+
+def _refused():
+    raise ConnectionError("connection refused")
+
+
+def test_timed_out_job_stops_retrying(tmp_path):
+    saved = []
+
+    def job(control):
+        # Without a deadline this would back off for 5 + 10 + 20 + ... seconds
+        call_with_retry(_refused, policy=RetryPolicy(max_attempts=10, base_delay=5.0, jitter=False))
+        control.start_save()
+        saved.append(True)
+
+    start = time.monotonic()
+    result = _run(0.3, job)
+    # asyncio.run waits for the worker thread, so this also bounds how long it ran
+    assert time.monotonic() - start < 2.0
+    assert not result['success']
+    assert result['error'] == "Timed out after 0.3s"
+    assert saved == []
+
+
+def test_timed_out_job_does_not_save():
+    saved = []
+
+    def job(control):
+        time.sleep(0.5)  # a blocking call that ignores the deadline
+        control.start_save()
+        saved.append(True)
+
+    result = _run(0.2, job)
+    assert not result['success']
+    assert saved == []
+
+
+def test_job_within_timeout_saves():
+    def job(control):
+        control.start_save()
+        return 42
+
+    result = _run(5.0, job)
+    assert result['success']
+    assert result['rows'] == 42
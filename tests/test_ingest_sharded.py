@@ -0,0 +1,37 @@
+from ingest_sharded import _append_record, read_checkpoint, partition
+
+
+def _record(series_id, shard, success, finished_at):
+    return {'id': series_id, 'shard': shard, 'filename': f"{series_id}.csv", 'success': success,
+            'rows': 10 if success else 0, 'error': None if success else 'Not found',
+            'elapsed_s': 0.1, 'finished_at': finished_at}
+
+
+def test_resumed_success_in_lower_shard_beats_earlier_failure(tmp_path):
+    # First run: the series fails in shard 3 of 4
+    _append_record(tmp_path / 'shard-3.jsonl', _record('REAINTRATREARAT10Y', 3, False, 100.0))
+    _append_record(tmp_path / 'shard-0.jsonl', _record('DFF', 0, True, 100.5))
+
+    # --resume partitions only the failed series, so it lands in shard 0
+    assert partition(['REAINTRATREARAT10Y'], 4) == [['REAINTRATREARAT10Y']]
+    _append_record(tmp_path / 'shard-0.jsonl', _record('REAINTRATREARAT10Y', 0, True, 200.0))
+
+    records = read_checkpoint(tmp_path)
+    assert records['REAINTRATREARAT10Y']['success']
+    assert records['REAINTRATREARAT10Y']['shard'] == 0
+    assert records['DFF']['success']
+
+
+def test_newer_failure_replaces_older_success(tmp_path):
+    _append_record(tmp_path / 'shard-0.jsonl', _record('GDP', 0, False, 300.0))
+    _append_record(tmp_path / 'shard-2.jsonl', _record('GDP', 2, True, 200.0))
+
+    assert not read_checkpoint(tmp_path)['GDP']['success']
+
+
+def test_torn_line_is_ignored(tmp_path):
+    _append_record(tmp_path / 'shard-1.jsonl', _record('UNRATE', 1, True, 50.0))
+    with open(tmp_path / 'shard-1.jsonl', 'a', encoding='utf-8') as f:
+        f.write('{"id": "UNRATE", "succ')
+
+    assert read_checkpoint(tmp_path)['UNRATE']['success']
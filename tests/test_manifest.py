@@ -0,0 +1,35 @@
+import json
+
+from manifest import Manifest
+
+
+def test_file_records_are_saved_once_per_flush(tmp_path, monkeypatch):
+    manifest = Manifest(tmp_path / 'manifest.json')
+    saves = []
+    save = manifest._save
+    monkeypatch.setattr(manifest, '_save', lambda: (saves.append(True), save()))
+
+    for i in range(50):
+        path = tmp_path / f"series_{i}.csv"
+        path.write_text(f"date,value\n2024-01-01,{i}\n")
+        manifest.record_file(path)
+    assert saves == []
+    assert not (tmp_path / 'manifest.json').exists()
+
+    assert manifest.flush()
+    assert len(saves) == 1
+    assert not manifest.flush()
+    assert len(json.loads((tmp_path / 'manifest.json').read_text())['files']) == 50
+
+
+def test_record_stage_writes_pending_file_records(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.json')
+    output = tmp_path / 'panel.csv'
+    output.write_text("date,value\n2024-01-01,1\n")
+    manifest.record_file(output)
+    manifest.record_stage('build_panel', [], [output])
+
+    reloaded = Manifest(tmp_path / 'manifest.json')
+    assert reloaded._data['files'] == manifest._data['files']
+    assert reloaded.stage_is_current('build_panel', [])
+    assert not manifest.flush()
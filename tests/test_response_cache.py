@@ -0,0 +1,35 @@
+import pytest
+
+from response_cache import ResponseCache
+
+
+def _fetcher(calls):
+    def fetch():
+        calls.append(True)
+        return [len(calls)]
+    return fetch
+
+
+def test_live_requests_skip_the_cache_by_default(tmp_path):
+    cache = ResponseCache(cache_dir=tmp_path)
+    calls = []
+    assert cache.fetch('fred', 'DFF', None, None, _fetcher(calls)) == [1]
+    assert cache.fetch('fred', 'DFF', None, None, _fetcher(calls)) == [2]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_recorded_backends_are_cached_by_default(tmp_path, capsys):
+    cache = ResponseCache(cache_dir=tmp_path)
+    calls = []
+    assert cache.fetch('local:fred', 'DFF', None, None, _fetcher(calls)) == [1]
+    assert cache.fetch('local:fred', 'DFF', None, None, _fetcher(calls)) == [1]
+    assert len(calls) == 1
+    assert 'local:fred DFF: cached response' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('enabled, expected', [(True, [1]), (False, [2])])
+def test_live_caching_is_opt_in(tmp_path, enabled, expected):
+    cache = ResponseCache(cache_dir=tmp_path, enabled=enabled)
+    calls = []
+    cache.fetch('yahoo', 'GC=F', None, None, _fetcher(calls))
+    assert cache.fetch('yahoo', 'GC=F', None, None, _fetcher(calls)) == expected
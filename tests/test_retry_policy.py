@@ -0,0 +1,76 @@
+import time
+
+import pytest
+import requests
+
+from retry_policy import (FRED_REQUESTS_PER_MINUTE, MIN_FRED_REFILL_PER_MINUTE, DeadlineExceeded,
+                          TokenBucket, _fred_bucket, configure_fred_rate_limit, deadline_at,
+                          is_retryable, max_fred_shares, request_timeout)
+
+
+def _response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+@pytest.mark.parametrize('n_shards', [1, 4, 16, max_fred_shares()])
+def test_fred_share_refills_and_fits_the_budget(n_shards):
+    bucket = _fred_bucket(1.0 / n_shards)
+    assert bucket.rate * 60 >= MIN_FRED_REFILL_PER_MINUTE
+    assert bucket.capacity >= 1
+    # All shards' bursts plus a minute of refill stay within the per-key limit
+    assert (bucket.capacity + bucket.rate * 60) * n_shards <= FRED_REQUESTS_PER_MINUTE + 1e-9
+
+
+@pytest.mark.parametrize('n_shards', [max_fred_shares() + 1, 120, 500])
+def test_too_many_shards_is_rejected(n_shards):
+    with pytest.raises(ValueError, match='at most'):
+        configure_fred_rate_limit(share=1.0 / n_shards)
+
+
+def test_request_timeout_is_cut_to_the_deadline():
+    assert request_timeout(30) == 30
+    with deadline_at(time.monotonic() + 2.0):
+        assert 1.0 < request_timeout(30) <= 2.0
+        assert request_timeout(0.5) == 0.5
+    with deadline_at(time.monotonic() - 1.0):
+        with pytest.raises(DeadlineExceeded):
+            request_timeout(30)
+
+
+def test_deadline_stops_rate_limit_wait():
+    bucket = TokenBucket(rate=0.01, capacity=1)
+    bucket.acquire()
+    start = time.monotonic()
+    with deadline_at(time.monotonic() + 0.2):
+        with pytest.raises(DeadlineExceeded):
+            bucket.acquire()
+    assert time.monotonic() - start < 1.0
+    assert not is_retryable(DeadlineExceeded("deadline exceeded"))
+
+
+@pytest.mark.parametrize('exc', [
+    requests.ConnectionError("connection refused"),
+    requests.Timeout("read timed out"),
+    requests.exceptions.ChunkedEncodingError("connection broken"),
+    requests.HTTPError("503 Service Unavailable", response=_response(503)),
+    requests.HTTPError("429 Too Many Requests", response=_response(429)),
+    TimeoutError(),
+    ConnectionResetError(),
+])
+def test_transient_errors_are_retried(exc):
+    assert is_retryable(exc)
+
+
+@pytest.mark.parametrize('exc', [
+    requests.exceptions.InvalidURL("invalid URL"),
+    requests.exceptions.MissingSchema("no schema supplied"),
+    requests.exceptions.InvalidSchema("no connection adapters"),
+    requests.exceptions.SSLError("certificate verify failed"),
+    requests.HTTPError("400 Bad Request", response=_response(400)),
+    FileNotFoundError(),
+    ValueError("Bad Request. The series does not exist."),
+])
+def test_permanent_errors_are_not_retried(exc):
+    assert not is_retryable(exc)
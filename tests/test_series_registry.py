@@ -0,0 +1,16 @@
+from series_registry import BY_FILENAME, REGISTRY, DEFAULT_FILL, entry_for, fill_policy, raw_date_format
+
+
+def test_lookups_use_the_index_for_the_default_registry():
+    unrate = next(entry for entry in REGISTRY if entry['final_column'] == 'unemployment_rate')
+    assert entry_for('unemployment_rate') is unrate
+    assert BY_FILENAME[unrate['filename']] is unrate
+    assert entry_for('not_a_column') is None
+    assert fill_policy('not_a_column') == DEFAULT_FILL
+
+
+def test_lookups_honour_a_custom_registry():
+    registry = [{'final_column': 'x', 'filename': 'x.csv', 'fill': 'ffill_from_start', 'date_format': '%d/%m/%Y'}]
+    assert fill_policy('x', registry) == 'ffill_from_start'
+    assert raw_date_format('x', registry) == '%d/%m/%Y'
+    assert entry_for('unemployment_rate', registry) is None